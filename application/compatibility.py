@@ -0,0 +1,168 @@
+import logging
+
+from domain import error
+
+log = logging.getLogger(__name__)
+
+BACKWARD = "BACKWARD"  # a versão nova lê dados escritos com a anterior
+FORWARD = "FORWARD"  # a versão anterior lê dados escritos com a nova
+FULL = "FULL"  # as duas direções
+NONE = "NONE"  # sem verificação, apenas registra o diff
+
+MODES = (BACKWARD, FORWARD, FULL, NONE)
+
+# promoções de tipo permitidas pela resolução de schemas do Avro (escrita -> leitura)
+_PROMOTIONS = {
+    "int": {"int", "long", "float", "double"},
+    "long": {"long", "float", "double"},
+    "float": {"float", "double"},
+    "string": {"string", "bytes"},
+    "bytes": {"bytes", "string"},
+}
+
+
+def parse_mode(mode: str | None) -> str:
+    normalized = (mode or BACKWARD).upper()
+    if normalized not in MODES:
+        raise error.SchemaValidationError(
+            f"Modo de compatibilidade inválido: {mode}. Use um de {', '.join(MODES)}"
+        )
+    return normalized
+
+
+def _fields_map(schema: dict) -> dict[str, dict]:
+    return {field["name"]: field for field in schema.get("fields") or []}
+
+
+def _is_optional(field: dict) -> bool:
+    # mesma regra usada pelo validador para campos ausentes
+    field_type = field["type"]
+    return "default" in field or (isinstance(field_type, list) and "null" in field_type)
+
+
+def _normalize(avro_type: object) -> object:
+    # {"type": "int"} equivale a "int"
+    if isinstance(avro_type, dict) and isinstance(avro_type.get("type"), str):
+        if avro_type["type"] not in ("record", "enum", "fixed", "array", "map"):
+            return avro_type["type"]
+    return avro_type
+
+
+def _can_read(writer: object, reader: object) -> bool:
+    writer, reader = _normalize(writer), _normalize(reader)
+
+    if isinstance(writer, list):
+        return all(_can_read(branch, reader) for branch in writer)
+    if isinstance(reader, list):
+        return any(_can_read(writer, branch) for branch in reader)
+
+    if isinstance(writer, str) and isinstance(reader, str):
+        return reader in _PROMOTIONS.get(writer, {writer})
+
+    if isinstance(writer, dict) and isinstance(reader, dict):
+        kind = writer.get("type")
+        if kind != reader.get("type"):
+            return False
+        if kind == "array":
+            return _can_read(writer.get("items"), reader.get("items"))
+        if kind == "map":
+            return _can_read(writer.get("values"), reader.get("values"))
+        if writer.get("name") != reader.get("name"):
+            return False
+        if kind == "record":
+            return not _reader_problems(_fields_map(writer), _fields_map(reader))
+        if kind == "enum":
+            return set(writer.get("symbols", [])) <= set(reader.get("symbols", []))
+        return writer == reader
+
+    return False
+
+
+def _reader_problems(
+    writer_fields: dict[str, dict], reader_fields: dict[str, dict]
+) -> list[str]:
+    """Motivos pelos quais o schema leitor não consegue ler dados do escritor."""
+    problems = []
+    for name, field in reader_fields.items():
+        if name not in writer_fields:
+            if not _is_optional(field):
+                problems.append(f"campo '{name}' ausente no escritor e sem default")
+            continue
+        if not _can_read(writer_fields[name]["type"], field["type"]):
+            problems.append(
+                f"campo '{name}': {writer_fields[name]['type']} não pode ser lido como {field['type']}"
+            )
+    return problems
+
+
+def check_compatibility(previous: dict, candidate: dict, mode: str) -> dict:
+    """
+    Verifica a nova versão contra a anterior e devolve o diff por campo.
+
+    O diff traz os campos adicionados, removidos e com tipo alterado, além
+    das flags 'backward'/'forward' avaliadas independentemente do modo,
+    para que o validador saiba até onde o histórico é legível.
+
+    Raises:
+        error.SchemaCompatibilityError: quando o modo exigido é violado.
+    """
+    mode = parse_mode(mode)
+    old_fields, new_fields = _fields_map(previous), _fields_map(candidate)
+
+    backward_problems = _reader_problems(old_fields, new_fields)
+    forward_problems = _reader_problems(new_fields, old_fields)
+
+    problems = []
+    if mode in (BACKWARD, FULL):
+        problems += [f"BACKWARD: {p}" for p in backward_problems]
+    if mode in (FORWARD, FULL):
+        problems += [f"FORWARD: {p}" for p in forward_problems]
+    if problems:
+        raise error.SchemaCompatibilityError("; ".join(problems))
+
+    return {
+        "added": [
+            {"name": name, "type": field["type"], "optional": _is_optional(field)}
+            for name, field in new_fields.items()
+            if name not in old_fields
+        ],
+        "removed": [
+            {"name": name, "type": field["type"], "optional": _is_optional(field)}
+            for name, field in old_fields.items()
+            if name not in new_fields
+        ],
+        "changed": [
+            {
+                "name": name,
+                "old_type": old_fields[name]["type"],
+                "new_type": field["type"],
+            }
+            for name, field in new_fields.items()
+            if name in old_fields and old_fields[name]["type"] != field["type"]
+        ],
+        "backward": not backward_problems,
+        "forward": not forward_problems,
+    }
+
+
+def legacy_fields(diffs: list[dict]) -> dict[str, list[object]]:
+    """
+    Tipos antigos ainda aceitáveis por campo, a partir dos diffs pré-computados.
+
+    Percorre os diffs da versão corrente para trás enquanto cada passo for
+    compatível para trás. Dados escritos com essas versões podem trazer campos
+    removidos depois ou tipos que foram promovidos; o validador aceita esses
+    valores sem revalidar contra cada schema histórico.
+
+    Args:
+        diffs: Diffs ordenados da versão mais recente para a mais antiga.
+    """
+    legacy: dict[str, list[object]] = {}
+    for diff in diffs:
+        if not diff.get("backward"):
+            break
+        for field in diff.get("removed", []):
+            legacy.setdefault(field["name"], []).append(field["type"])
+        for field in diff.get("changed", []):
+            legacy.setdefault(field["name"], []).append(field["old_type"])
+    return legacy
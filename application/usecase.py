@@ -1,9 +1,13 @@
 from domain import dto
 from domain.port import IBrokerAdapter, IBucketAdapter, IStorageConnectionAdapter
-from domain import error
-from infrastructure import repository
+from domain import error, fingerprint
+from domain.namespace_trie import NamespaceTrie
+from infrastructure import repository, tracing
+from infrastructure.serializer import get_serializer
 import logging
-from application import validator
+from typing import Callable, Iterator
+from pydantic import ValidationError
+from application import compatibility, validator
 
 log = logging.getLogger(__name__)
 
@@ -12,20 +16,154 @@ def setup_schema_infrastructure(rm: IBrokerAdapter) -> str:
 
 
 def schedule_schema_validation(bucket_name: str, rm: IBrokerAdapter) -> str:
-    import json
-
     namepsace = bucket_name.replace("/", ".")
-    message_str = json.dumps({"namespace": namepsace}, ensure_ascii=False)
-    rm.publish_message(routing_key="app.mauler", message=message_str)
+    message_str = get_serializer().dumps_str({"namespace": namepsace})
+    # o trace do job nasce aqui e segue nos headers até o worker
+    with tracing.get_tracer().start_trace("schedule", namespace=namepsace):
+        rm.publish_message(
+            routing_key="app.mauler",
+            message=message_str,
+            headers=tracing.propagation_headers(),
+        )
     return f"Schema validation scheduled for bucket: {bucket_name}"
 
 
+def schedule_schema_validation_by_pattern(
+    pattern: str, namespaces: NamespaceTrie, rm: IBrokerAdapter
+) -> list[str]:
+    matched = namespaces.match(pattern)
+    if not matched:
+        raise error.SchemaNotFound(f"Nenhum namespace corresponde a {pattern}")
+
+    serializer = get_serializer()
+    tracer = tracing.get_tracer()
+    for namespace in matched:
+        message_str = serializer.dumps_str({"namespace": namespace})
+        with tracer.start_trace("schedule", namespace=namespace, pattern=pattern):
+            rm.publish_message(
+                routing_key="app.mauler",
+                message=message_str,
+                headers=tracing.propagation_headers(),
+            )
+    return matched
+
+
+def load_namespace_index(
+    dm: IStorageConnectionAdapter, ds: repository.SchemaRegistry
+) -> NamespaceTrie:
+    with dm.connect() as conn:
+        return NamespaceTrie(ds.get_namespaces(conn))
+
+
+def _comparable(schema_data: dict) -> dict:
+    # a versão gravada está na forma canônica (nomes aninhados qualificados);
+    # o candidato precisa estar na mesma forma para a comparação
+    return get_serializer().loads(fingerprint.canonical_form(schema_data))
+
+
 def create_schema(
-    schema: dto.SchemaCreateDto, dm: IStorageConnectionAdapter, ds: repository.SchemaRegistry
-) -> str:
+    schema: dto.SchemaCreateDto,
+    dm: IStorageConnectionAdapter,
+    ds: repository.SchemaRegistry,
+    mode: str = compatibility.BACKWARD,
+) -> dict[str, object]:
+    mode = compatibility.parse_mode(mode)
     schema_data = schema.model_dump(exclude_unset=True)
-    with dm.connect() as conn:
-        return ds.insert_schema(conn, schema_data)
+    namespace = schema_data["namespace"]
+    with dm.create_transaction() as conn:
+        current = ds.get_current_schema(conn, namespace)
+        if current is None:
+            created = ds.insert_schema(conn, schema_data, 1)
+            return {**created, "version": 1}
+
+        # levanta SchemaCompatibilityError se o modo exigido for violado
+        diff = compatibility.check_compatibility(
+            get_serializer().loads(current["canonical"]), _comparable(schema_data), mode
+        )
+        version = current["version"] + 1
+        created = ds.insert_schema(conn, schema_data, version)
+        ds.insert_schema_diff(conn, namespace, current["version"], version, mode, diff)
+        return {**created, "version": version}
+
+
+def create_schemas(
+    items: list[object],
+    dm: IStorageConnectionAdapter,
+    ds: repository.SchemaRegistry,
+    mode: str = compatibility.BACKWARD,
+) -> list[dict[str, object]]:
+    """
+    Valida e grava um lote de schemas numa única transação.
+
+    Cada item é validado (DTO e compatibilidade contra a versão corrente ou
+    contra o item anterior do mesmo namespace no lote) e recebe seu próprio
+    resultado; itens rejeitados não impedem a gravação dos demais.
+    """
+    mode = compatibility.parse_mode(mode)
+    results: list[dict[str, object]] = []
+    accepted: list[tuple[int, dict]] = []
+    for index, item in enumerate(items):
+        try:
+            schema = dto.SchemaCreateDto.model_validate(item)
+        except ValidationError as err:
+            reason = "; ".join(
+                f"{'.'.join(map(str, detail['loc']))}: {detail['msg']}"
+                for detail in err.errors()
+            )
+            results.append({"index": index, "status": "invalid", "error": reason})
+            continue
+        results.append({"index": index, "namespace": schema.namespace})
+        accepted.append((index, schema.model_dump(exclude_unset=True)))
+
+    with dm.create_transaction() as conn:
+        stored = ds.get_current_schemas(
+            conn, list({schema["namespace"] for _, schema in accepted})
+        )
+        serializer = get_serializer()
+        current = {
+            namespace: (serializer.loads(row["canonical"]), row["version"])
+            for namespace, row in stored.items()
+        }
+
+        to_insert: list[tuple[dict, int]] = []
+        diffs: list[dict[str, object]] = []
+        inserted_indexes: list[int] = []
+        for index, schema_data in accepted:
+            namespace = schema_data["namespace"]
+            previous = current.get(namespace)
+            try:
+                candidate = _comparable(schema_data)
+            except error.SchemaValidationError as err:
+                results[index].update({"status": "invalid", "error": str(err)})
+                continue
+            version = 1
+            if previous is not None:
+                try:
+                    diff = compatibility.check_compatibility(previous[0], candidate, mode)
+                except error.SchemaCompatibilityError as err:
+                    results[index].update({"status": "incompatible", "error": str(err)})
+                    continue
+                version = previous[1] + 1
+                diffs.append(
+                    {
+                        "namespace": namespace,
+                        "from_version": previous[1],
+                        "to_version": version,
+                        "compatibility": mode,
+                        "diff": diff,
+                    }
+                )
+            current[namespace] = (candidate, version)
+            to_insert.append((schema_data, version))
+            inserted_indexes.append(index)
+            results[index].update({"status": "created", "version": version})
+
+        created = ds.insert_schemas(conn, to_insert)
+        ds.insert_schema_diffs(conn, diffs)
+
+    for index, row in zip(inserted_indexes, created):
+        results[index].update(row)
+    return results
 
 
 def delete_all_schema(dm: IStorageConnectionAdapter, ds: repository.SchemaRegistry) -> str:
@@ -36,16 +174,31 @@ def delete_all_schema(dm: IStorageConnectionAdapter, ds: repository.SchemaRegist
 def delete_some_schema(
     dm: IStorageConnectionAdapter, ds: repository.SchemaRegistry, namespace: str
 ) -> str:
-    with dm.connect() as conn:
+    with dm.create_transaction() as conn:
         return ds.delete_schema(conn, namespace)
 
 
 # namespace
 def get_all_schemas(
-    dm: IStorageConnectionAdapter, ds: repository.SchemaRegistry
-) -> list[dict[str, object]]:
+    dm: IStorageConnectionAdapter,
+    ds: repository.SchemaRegistry,
+    fields: list[str] | None = None,
+    after: tuple[str, str] | None = None,
+    limit: int | None = None,
+) -> tuple[list[dict[str, object]], tuple[str, str] | None]:
     with dm.connect() as conn:
-        return ds.get_all(conn=conn)
+        return ds.get_all(conn=conn, fields=fields, after=after, limit=limit)
+
+
+def iter_all_schemas(
+    dm: IStorageConnectionAdapter,
+    ds: repository.SchemaRegistry,
+    fields: list[str] | None = None,
+    after: tuple[str, str] | None = None,
+) -> Iterator[dict[str, object]]:
+    # a conexão fica aberta enquanto o consumidor percorre o gerador
+    with dm.connect() as conn:
+        yield from ds.iter_all(conn=conn, fields=fields, after=after)
 
 
 def get_schemas_by_namespace(
@@ -67,40 +220,146 @@ def avaliate_data(
     bm: IBucketAdapter,
     ic: validator.ValidatorFactory,
     mr: repository.MoveRegistry,
-) -> bool:
+    should_stop: Callable[[], bool] | None = None,
+    metric_batch_size: int = 1,
+) -> list[str]:
+    """
+    Valida os objetos do namespace, ou só data["object"] numa retentativa.
+
+    A falha de um objeto (leitura, conversão ou movimentação) não
+    interrompe o job: o nome dele volta na lista, para nova tentativa
+    individual (schedule_object_retries). Sem schema registrado, ou se as
+    métricas não puderem ser gravadas, o job inteiro falha com InternalError.
+
+    As métricas são gravadas a cada metric_batch_size objetos, numa
+    transação, e sempre antes de sair. Se should_stop() for verdadeiro entre
+    dois objetos, o job para com ConsumerShutdownError; o que ficou no
+    bucket de origem é encontrado na reentrega.
+    """
     namespace = data["namespace"]
     path = namespace.replace(".", "/")
-    for filename, blob in bm.iter_bucket_by_prefix_key("gold", path):
+    avro = None
+    failed: list[str] = []
+    metrics: list[tuple] = []
+    if "object" in data:
+        objects = _read_single(bm, path, data["object"], failed)
+    else:
+        objects = bm.iter_bucket_by_prefix_key("gold", path, failed)
+    try:
+        # bucket.fetch: espera pelo próximo objeto (LIST + GET, ou o download adiantado)
+        for filename, blob in tracing.traced_iter(objects, "bucket.fetch"):
+            if should_stop is not None and should_stop():
+                raise error.ConsumerShutdownError(
+                    f"Job de {namespace} interrompido antes de {filename}"
+                )
+            with tracing.span("object", file=filename, bytes=len(blob)) as span:
+                if avro is None:
+                    # schema corrente e diffs são resolvidos uma vez por job
+                    try:
+                        with tracing.span("storage.get_schema"), dm.connect() as conn:
+                            avro = ds.get_current_schema(conn, namespace)
+                            if avro is None:
+                                raise error.SchemaNotFound()
+                            legacy = compatibility.legacy_fields(
+                                ds.get_schema_diffs(conn, namespace)
+                            )
+                        schema_dump = ic.load_schema(avro["fingerprint"], avro["canonical"])
+                    except Exception as err:
+                        log.error(err)
+                        raise error.InternalError(err)
+
+                try:
+                    final_bucket, summary = _avaliate_object(
+                        filename, blob, path, schema_dump, legacy, bm, ic
+                    )
+                except Exception as err:
+                    log.error("Falha no objeto %s/%s, segue para o próximo: %s", path, filename, err)
+                    if span is not None:
+                        span.attrs["error"] = type(err).__name__
+                    failed.append(filename)
+                    continue
+                metrics.append(
+                    (
+                        avro["id"],
+                        "gold",
+                        final_bucket,
+                        namespace,
+                        get_serializer().dumps_str(summary),
+                    )
+                )
+            if len(metrics) >= metric_batch_size:
+                _flush_metrics(dm, mr, metrics)
+    finally:
+        # objetos já movidos têm a métrica gravada mesmo se o job parar
+        _flush_metrics(dm, mr, metrics)
+    return failed
+
+
+def _read_single(
+    bm: IBucketAdapter, path: str, filename: str, failed: list[str]
+) -> Iterator[tuple[str, bytes]]:
+    try:
+        blob = bm.read_object("gold", f"{path}/{filename}")
+    except Exception as err:
+        log.error("Falha ao ler %s/%s: %s", path, filename, err)
+        failed.append(filename)
+        return
+    if blob:
+        yield filename, blob
+
+
+def _avaliate_object(
+    filename: str,
+    blob: bytes,
+    path: str,
+    schema_dump: dict,
+    legacy: dict[str, list[object]],
+    bm: IBucketAdapter,
+    ic: validator.ValidatorFactory,
+) -> tuple[str, list[object]]:
+    with tracing.span("parse"):
+        validator = ic.from_file_name(filename)
+        data_as_dict = validator.convert(blob)
+
+    with tracing.span("validate"):
+        summary: list[object] = validator.validate_data_against_avro(
+            data_as_dict, schema_dump, legacy
+        )
+    final_bucket = "validated" if not summary else "quarantine"
+
+    bm.move_object("gold", f"{path}/{filename}", final_bucket, f"{path}/{filename}")
+    return final_bucket, summary
+
+
+def _flush_metrics(
+    dm: IStorageConnectionAdapter, mr: repository.MoveRegistry, metrics: list[tuple]
+) -> None:
+    if not metrics:
+        return
+    rows = list(metrics)
+    metrics.clear()
+    with tracing.span("storage.insert_metric", rows=len(rows)):
         try:
-            validator = ic.from_file_name(filename)
-            data_as_dict = validator.convert(blob)
-            with dm.connect() as conn:
-                avro = ds.get_avro_schema_by_namespace(conn, namespace)
-                if len(avro) == 0:
-                    raise error.SchemaNotFound()
+            with dm.create_transaction() as conn:
+                mr.insert_metrics(conn, rows)
         except Exception as err:
-            log.error(err)
+            log.error("Falha ao gravar %s métricas de movimentação: %s", len(rows), err)
             raise error.InternalError(err)
-        import json
 
-        schema_dump = json.loads(avro[0]["schema_avro"])
-        summary: list[object] = validator.validate_data_against_avro(
-            data_as_dict, schema_dump
-        )
-        final_bucket = "validated" if not summary else "quarantine"
 
-        bm.put_object(
-            final_bucket, f"{path}/{filename}", blob, content_type="application/json"
+def schedule_object_retries(
+    namespace: str,
+    objects: list[str],
+    rm: IBrokerAdapter,
+    count: int,
+    headers: dict | None = None,
+) -> int:
+    """Uma mensagem de retry por objeto que falhou, no degrau de count + 1."""
+    serializer = get_serializer()
+    for filename in objects:
+        rm.retry_message(
+            serializer.dumps_str({"namespace": namespace, "object": filename}),
+            count,
+            headers,
         )
-        bm.delete_object("gold", f"{path}/{filename}")
-        with dm.connect() as conn:
-            mr.insert_metric(
-                conn,
-                avro[0]["id"],
-                "gold",
-                final_bucket,
-                namespace,
-                json.dumps(summary, ensure_ascii=False),
-            )
-        pass
-    pass
+    return len(objects)
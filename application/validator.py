@@ -1,14 +1,14 @@
 from abc import ABC, abstractmethod
-import json
 from typing import Dict
 
+from etc.config import log_setup
+from infrastructure.serializer import get_serializer
+
 
 import logging
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 log = logging.getLogger(__name__)
+# cache hits acontecem uma vez por objeto validado
+object_log = log_setup.rate_limited_logger(f"{__name__}.objects")
 
 
 def from_file(filename: str) -> 'IChecker':
@@ -27,8 +27,17 @@ class IChecker(ABC):
     def validate_data_against_avro(
         self,
         data: dict[str, any], 
-        schema: dict[str, any]
+        schema: dict[str, any],
+        legacy: dict[str, list[any]] | None = None,
     ) -> list[dict[str, any]] | None:
+        """
+        Valida um registro contra o schema corrente.
+
+        'legacy' mapeia campo -> tipos de versões anteriores compatíveis
+        (ver compatibility.legacy_fields); valores que casam com esses tipos
+        são aceitos, pois foram escritos com uma versão ainda legível.
+        """
+        legacy = legacy or {}
         errors_report = []
         try:
             schema_fields = schema.get("fields", [])
@@ -49,6 +58,8 @@ class IChecker(ABC):
         
         extra_fields = data_field_names - schema_field_names
         for field_name in extra_fields:
+            if self._matches_legacy(data.get(field_name), legacy.get(field_name)):
+                continue # Campo removido numa versão compatível
             errors_report.append({
                 "field": field_name,
                 "message": "Campo extra não definido no schema",
@@ -78,35 +89,9 @@ class IChecker(ABC):
             if value is None and is_optional:
                 continue # Próximo campo
 
-            types_to_check = field_type if isinstance(field_type, list) else [field_type]
-            
-            is_valid_type = False
-            
-            for avro_type in types_to_check:
-                if avro_type == "null" and value is None:
-                    is_valid_type = True
-                    break
-                if avro_type == "string" and isinstance(value, str):
-                    is_valid_type = True
-                    break
-                if avro_type == "int" and isinstance(value, int):
-                    is_valid_type = True
-                    break
-                # Avro 'double' aceita float ou int do Python
-                if avro_type == "double" and isinstance(value, (int, float)):
-                    is_valid_type = True
-                    break
-                # Validação simples de array
-                if isinstance(avro_type, dict) and avro_type.get("type") == "array":
-                    if not isinstance(value, list):
-                        continue # O tipo não é lista, tenta o próximo tipo na união
-                    
-                    # Verifica os itens do array
-                    item_type = avro_type.get("items")
-                    if all(isinstance(item, str) for item in value) and item_type == "string":
-                        is_valid_type = True
-                        break
-                    # (Adicionar mais validações de 'items' aqui se necessário)
+            is_valid_type = self._matches_type(value, field_type) or (
+                self._matches_legacy(value, legacy.get(field_name))
+            )
 
             # Se nenhum tipo na união foi compatível
             if not is_valid_type:
@@ -117,6 +102,38 @@ class IChecker(ABC):
                     "received": f"{str(value)[:50]} (tipo: {type(value).__name__})"
                 })
         return errors_report
+
+    def _matches_type(self, value: any, field_type: any) -> bool:
+        types_to_check = field_type if isinstance(field_type, list) else [field_type]
+
+        for avro_type in types_to_check:
+            if avro_type == "null" and value is None:
+                return True
+            if avro_type == "string" and isinstance(value, str):
+                return True
+            if avro_type == "int" and isinstance(value, int):
+                return True
+            # Avro 'double' aceita float ou int do Python
+            if avro_type == "double" and isinstance(value, (int, float)):
+                return True
+            # Validação simples de array
+            if isinstance(avro_type, dict) and avro_type.get("type") == "array":
+                if not isinstance(value, list):
+                    continue # O tipo não é lista, tenta o próximo tipo na união
+                
+                # Verifica os itens do array
+                item_type = avro_type.get("items")
+                if all(isinstance(item, str) for item in value) and item_type == "string":
+                    return True
+                # (Adicionar mais validações de 'items' aqui se necessário)
+        return False
+
+    def _matches_legacy(self, value: any, legacy_types: list[any] | None) -> bool:
+        if not legacy_types:
+            return False
+        return value is None or any(
+            self._matches_type(value, legacy_type) for legacy_type in legacy_types
+        )
         
 
 
@@ -126,6 +143,7 @@ class IChecker(ABC):
 class ValidatorFactory:
     def __init__(self):
         self._cache: Dict[str, IChecker] = {}
+        self._schemas: Dict[str, dict] = {}
     
     def from_file_name(self, filename: str) -> IChecker:
         # Extrai a extensão para usar como chave do cache
@@ -133,7 +151,7 @@ class ValidatorFactory:
         
         # Verifica se já existe no cache
         if file_extension in self._cache:
-            log.info(f"♻️  Retornando {file_extension.upper()}Validator do cache")
+            object_log.debug("♻️  Retornando %sValidator do cache", file_extension)
             return self._cache[file_extension]
         
         # Cria nova instância se não estiver em cache
@@ -153,13 +171,25 @@ class ValidatorFactory:
         
         # Armazena no cache
         self._cache[file_extension] = validator
-        log.info(f"🆕 Criando novo {file_extension.upper()}Validator e armazenando no cache")
+        log.info(
+            "🆕 Criando novo %sValidator e armazenando no cache",
+            file_extension.upper(),
+        )
         
         return validator
     
+    def load_schema(self, fingerprint: str, schema_avro: str) -> dict:
+        """Schema parseado, reaproveitado entre jobs pelo fingerprint canônico"""
+        schema = self._schemas.get(fingerprint)
+        if schema is None:
+            schema = get_serializer().loads(schema_avro)
+            self._schemas[fingerprint] = schema
+        return schema
+
     def clear_cache(self):
         """Limpa o cache (útil para testes)"""
         self._cache.clear()
+        self._schemas.clear()
         log.info("🧹 Cache limpo")
     
     def cache_size(self) -> int:
@@ -169,6 +199,5 @@ class ValidatorFactory:
 class JsonValidator(IChecker):
 
     def convert(self, data: bytes) -> dict | list[dict]:
-        import json
-        return json.loads(data)
+        return get_serializer().loads(data)
         
\ No newline at end of file
@@ -1,12 +1,18 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
+# atributos além dos validados (doc, aliases, order...) são mantidos: o
+# registry devolve o schema como foi enviado
 class schemaFields(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
     name: str
     type: object
     default: Optional[object] = None
 
 class SchemaCreateDto(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
     type: str   
     namespace: str
     name: str
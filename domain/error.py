@@ -78,6 +78,10 @@ class RetryExhaustedError(Exception):
     """Tentativas de retry esgotadas"""
     pass
 
+class ConsumerShutdownError(Exception):
+    """Job interrompido pelo desligamento do consumer"""
+    pass
+
 
 # Bucket/Storage Específicos
 
@@ -0,0 +1,110 @@
+import json
+
+from domain import error
+
+# Parsing Canonical Form do Avro:
+# https://avro.apache.org/docs/current/specification/#parsing-canonical-form-for-schemas
+PRIMITIVES = {"null", "boolean", "int", "long", "float", "double", "bytes", "string"}
+NAMED = {"record", "enum", "fixed"}
+COMPLEX = NAMED | {"array", "map"}
+
+# ordem de atributos da especificação; 'default' é mantido (ao final) porque
+# o validador decide a obrigatoriedade de um campo por ele
+_ATTRIBUTE_ORDER = ("name", "type", "fields", "symbols", "items", "values", "size", "default")
+
+# CRC-64-AVRO (Rabin), conforme a especificação
+EMPTY = 0xC15D213AA4D7A795
+_MASK = 0xFFFFFFFFFFFFFFFF
+
+
+def _build_table() -> list[int]:
+    table = []
+    for i in range(256):
+        fp = i
+        for _ in range(8):
+            fp = (fp >> 1) ^ (EMPTY & (-(fp & 1) & _MASK))
+        table.append(fp)
+    return table
+
+
+_FP_TABLE = _build_table()
+
+
+def rabin64(data: bytes) -> int:
+    fp = EMPTY
+    for byte in data:
+        fp = (fp >> 8) ^ _FP_TABLE[(fp ^ byte) & 0xFF]
+    return fp
+
+
+def _fullname(name: str, namespace: str | None) -> str:
+    if "." in name or not namespace:
+        return name
+    return f"{namespace}.{name}"
+
+
+def _canonical(node: object, namespace: str | None) -> object:
+    if isinstance(node, str):
+        # primitivo ou referência a um tipo nomeado
+        return node if node in PRIMITIVES else _fullname(node, namespace)
+
+    if isinstance(node, list):
+        return [_canonical(branch, namespace) for branch in node]
+
+    if not isinstance(node, dict):
+        return node
+
+    kind = node.get("type")
+    if isinstance(kind, str) and kind in PRIMITIVES and "name" not in node:
+        return kind
+
+    result: dict[str, object] = {}
+    if kind in NAMED:
+        name = node.get("name")
+        if not isinstance(name, str) or not name:
+            raise error.SchemaValidationError(f"Tipo {kind} sem 'name'")
+        namespace = node.get("namespace", namespace)
+        fullname = _fullname(name, namespace)
+        # tipos aninhados herdam o namespace do nome completo
+        namespace = fullname.rpartition(".")[0] or None
+        result["name"] = fullname
+
+    for attribute in _ATTRIBUTE_ORDER[1:]:
+        if attribute not in node:
+            continue
+        value = node[attribute]
+        if attribute == "type":
+            # palavra-chave do tipo complexo não é referência a tipo nomeado
+            if not (isinstance(value, str) and value in COMPLEX):
+                value = _canonical(value, namespace)
+        elif attribute == "fields":
+            value = [
+                {
+                    key: _canonical(field[key], namespace) if key == "type" else field[key]
+                    for key in ("name", "type", "default")
+                    if key in field
+                }
+                for field in value
+            ]
+        elif attribute in ("items", "values"):
+            value = _canonical(value, namespace)
+        result[attribute] = value
+    return result
+
+
+def canonical_form(schema: dict) -> str:
+    """
+    Forma canônica de parsing do schema (sem espaços, atributos ordenados).
+
+    O 'namespace' de topo é a chave do registry e não faz parte do corpo:
+    o mesmo schema publicado em namespaces diferentes gera o mesmo texto.
+    """
+    body = {key: value for key, value in schema.items() if key != "namespace"}
+    return json.dumps(
+        _canonical(body, None), ensure_ascii=False, separators=(",", ":")
+    )
+
+
+def fingerprint(canonical: str) -> str:
+    """Fingerprint Rabin de 64 bits da forma canônica, em 16 dígitos hexadecimais."""
+    return f"{rabin64(canonical.encode('utf-8')):016x}"
@@ -0,0 +1,105 @@
+from typing import Iterable, Iterator
+
+SEPARATOR = "."
+ONE_SEGMENT = "*"  # exatamente um segmento: rfb.2025.05.*
+ANY_SEGMENTS = "**"  # zero ou mais segmentos: rfb.2025.**
+
+
+def is_pattern(namespace: str) -> bool:
+    return ONE_SEGMENT in namespace
+
+
+class _Node:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self):
+        self.children: dict[str, "_Node"] = {}
+        self.terminal = False
+
+
+class NamespaceTrie:
+    """
+    Índice em memória dos namespaces registrados, por segmento.
+
+    Um segmento literal do padrão é uma busca em dicionário; o custo de
+    resolver um padrão cresce com o número de namespaces que casam, não com
+    o tamanho do registry.
+    """
+
+    def __init__(self, namespaces: Iterable[str] = ()):
+        self._root = _Node()
+        self._size = 0
+        for namespace in namespaces:
+            self.add(namespace)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, namespace: str) -> bool:
+        node = self._find(namespace.split(SEPARATOR))
+        return node is not None and node.terminal
+
+    def add(self, namespace: str) -> None:
+        node = self._root
+        for segment in namespace.split(SEPARATOR):
+            node = node.children.setdefault(segment, _Node())
+        if not node.terminal:
+            node.terminal = True
+            self._size += 1
+
+    def discard(self, namespace: str) -> None:
+        segments = namespace.split(SEPARATOR)
+        path = [self._root]
+        for segment in segments:
+            child = path[-1].children.get(segment)
+            if child is None:
+                return
+            path.append(child)
+
+        if not path[-1].terminal:
+            return
+        path[-1].terminal = False
+        self._size -= 1
+
+        # poda os nós que ficaram sem namespace abaixo
+        for depth in range(len(segments), 0, -1):
+            node = path[depth]
+            if node.terminal or node.children:
+                break
+            del path[depth - 1].children[segments[depth - 1]]
+
+    def match(self, pattern: str) -> list[str]:
+        """Namespaces que casam com o padrão, em ordem alfabética."""
+        segments = pattern.split(SEPARATOR)
+        return sorted(set(self._match(self._root, segments, 0, [])))
+
+    def _find(self, segments: list[str]) -> _Node | None:
+        node = self._root
+        for segment in segments:
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def _match(
+        self, node: _Node, segments: list[str], index: int, prefix: list[str]
+    ) -> Iterator[str]:
+        if index == len(segments):
+            if node.terminal:
+                yield SEPARATOR.join(prefix)
+            return
+
+        segment = segments[index]
+        if segment == ANY_SEGMENTS:
+            # zero segmentos consumidos
+            yield from self._match(node, segments, index + 1, prefix)
+            # um ou mais: desce mantendo o '**' ativo
+            for name, child in node.children.items():
+                yield from self._match(child, segments, index, prefix + [name])
+        elif segment == ONE_SEGMENT:
+            for name, child in node.children.items():
+                yield from self._match(child, segments, index + 1, prefix + [name])
+        else:
+            child = node.children.get(segment)
+            if child is not None:
+                yield from self._match(child, segments, index + 1, prefix + [segment])
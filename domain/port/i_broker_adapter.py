@@ -13,7 +13,7 @@ class IBrokerAdapter(ABC):
         ...
 
     @abstractmethod
-    def publish_message(self, routing_key: str, message: str, count: int=0) -> None:
+    def publish_message(self, routing_key: str, message: str, count: int=0, headers: object=None) -> None:
         ...
 
     @abstractmethod
@@ -25,11 +25,27 @@ class IBrokerAdapter(ABC):
         ...
 
     @abstractmethod
-    def acknowledge_message(self, delivery_tag: int):
+    def stop_consuming(self) -> None:
         ...
 
     @abstractmethod
-    def reject_message(self, delivery_tag: int, count: int, message: str, routing_key: str):
+    def consume_batch(self, max_messages: int, wait_seconds: float=0.5) -> list['AmqpDelivery']:
+        ...
+
+    @abstractmethod
+    def acknowledge_message(self, delivery_tag: int, multiple: bool=False):
+        ...
+
+    @abstractmethod
+    def nack_message(self, delivery_tag: int, requeue: bool=False) -> None:
+        ...
+
+    @abstractmethod
+    def reject_message(self, delivery_tag: int, count: int, message: str, routing_key: str, headers: object=None):
+        ...
+
+    @abstractmethod
+    def retry_message(self, message: object, count: int, headers: object=None) -> None:
         ...
 
     @abstractmethod
@@ -5,7 +5,7 @@ from datetime import datetime, timedelta
 
 class IBucketAdapter(ABC):
     @abstractmethod
-    def __init__(self, client: object):
+    def __init__(self, client, http_client: object=None, download_workers: int=1, part_size: int=None, upload_workers: int=3):
         ...
 
     @classmethod
@@ -13,6 +13,10 @@ class IBucketAdapter(ABC):
     def from_minio_client(cls, env: dict):
         ...
 
+    @abstractmethod
+    def pool_stats(self) -> dict[object]:
+        ...
+
     @abstractmethod
     def delete_object(self, bucket_name: str, object_name: str) -> bool:
         ...
@@ -22,11 +26,15 @@ class IBucketAdapter(ABC):
         ...
 
     @abstractmethod
-    def put_object(self, bucket_name: str, object_name: str, data: object, content_type: str):
+    def put_object(self, bucket_name: str, object_name: str, data: object, content_type: str, length: int=None):
+        ...
+
+    @abstractmethod
+    def move_object(self, src_bucket: str, src_name: str, dst_bucket: str, dst_name: str) -> bool:
         ...
 
     @abstractmethod
-    def iter_bucket_by_prefix_key(self, bucket_name: str, prefix: str) -> Iterator[tuple[object]]:
+    def iter_bucket_by_prefix_key(self, bucket_name: str, prefix: str, failed: object=None) -> Iterator[tuple[object]]:
         ...
 
     @abstractmethod
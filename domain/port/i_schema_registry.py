@@ -12,12 +12,40 @@ class ISchemaRegistry(ABC):
     def get_avro_schema_by_namespace(self, conn: object, namespace: str):
         ...
 
+    @abstractmethod
+    def get_current_schema(self, conn: object, namespace: str):
+        ...
+
+    @abstractmethod
+    def get_current_schemas(self, conn: object, namespaces: list[str]) -> dict[object]:
+        ...
+
+    @abstractmethod
+    def get_namespaces(self, conn: object) -> list[str]:
+        ...
+
     @abstractmethod
     def initialize_schema(self, conn: object):
         ...
 
     @abstractmethod
-    def insert_schema(self, conn: object, schema: str) -> str:
+    def insert_schema(self, conn: object, schema: dict, version: int=1) -> dict:
+        ...
+
+    @abstractmethod
+    def insert_schemas(self, conn: object, schemas: list[tuple[object]]) -> list[dict]:
+        ...
+
+    @abstractmethod
+    def insert_schema_diff(self, conn: object, namespace: str, from_version: int, to_version: int, compatibility: str, diff: dict):
+        ...
+
+    @abstractmethod
+    def insert_schema_diffs(self, conn: object, diffs: list[dict]):
+        ...
+
+    @abstractmethod
+    def get_schema_diffs(self, conn: object, namespace: str):
         ...
 
     @abstractmethod
@@ -25,5 +53,9 @@ class ISchemaRegistry(ABC):
         ...
 
     @abstractmethod
-    def get_all(self, conn: object):
+    def get_all(self, conn: object, fields: object=None, after: object=None, limit: object=None) -> tuple[object]:
+        ...
+
+    @abstractmethod
+    def iter_all(self, conn: object, fields: object=None, after: object=None, batch_size: int=1000) -> Iterator[dict]:
         ...
@@ -1,12 +1,15 @@
 import logging
 import os
+import threading
+from collections.abc import Iterator, Mapping
+from typing import Any
+
 import yaml
 
+DEFAULT_CONFIG_FILES = ["./etc/config/root.local.yml"]
+
 def get_logger() -> logging.Logger:
-    # Configuração de logging para vermos o que está acontecendo
-    logging.basicConfig(
-        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
-    )
+    # handlers e nível ficam a cargo dos pontos de entrada (etc.config.log_setup)
     log = logging.getLogger(__name__)
     return log
 
@@ -70,12 +73,12 @@ def load_env(file_paths: list[str]) -> dict:
                 data = yaml.safe_load(f)
 
             if data and isinstance(data, dict):
-                log.info(f"Carregando e mesclando configuração de: {path}")
+                log.debug(f"Carregando e mesclando configuração de: {path}")
                 # A mágica está aqui:
                 # O config atual é a 'base' e o novo 'data' é o 'overlay'
                 merged_config = deep_merge_dicts(merged_config, data)
             elif not data:
-                log.info(f"Arquivo de configuração está vazio, pulando: {path}")
+                log.debug(f"Arquivo de configuração está vazio, pulando: {path}")
             else:
                 log.warning(
                     f"Arquivo de configuração não é um dicionário, pulando: {path}"
@@ -86,14 +89,14 @@ def load_env(file_paths: list[str]) -> dict:
         except IOError as e:
             log.error(f"Erro ao ler o arquivo {path}: {e}")
 
-    log.info("Mesclagem de configuração YAML concluída.")
+    log.debug("Mesclagem de configuração YAML concluída.")
 
     # --- BLOCO CORRIGIDO: SOBRESCREVER COM VARIÁVEIS DE AMBIENTE ---
     #
     # Lógica atualizada para corresponder ao seu 'root.local.yml'
     #
 
-    log.info("Verificando e mesclando com variáveis de ambiente...")
+    log.debug("Verificando e mesclando com variáveis de ambiente...")
 
     # --- BROKER (RabbitMQ) ---
     # Alvo: merged_config['broker']['host']
@@ -140,3 +143,58 @@ def load_env(file_paths: list[str]) -> dict:
 
     log.info("Mesclagem de configuração final concluída.")
     return merged_config
+
+
+class LazyConfig(Mapping):
+    """
+    Configuração memorizada, resolvida no primeiro acesso.
+
+    Os arquivos YAML e as variáveis de ambiente são lidos uma única vez por
+    processo, no primeiro acesso a uma chave, e não na importação dos
+    módulos; 'reload' relê tudo (ex.: depois de alterar o ambiente em testes).
+    """
+
+    def __init__(self, file_paths: list[str]):
+        self._file_paths = list(file_paths)
+        self._data: dict | None = None
+        self._lock = threading.Lock()
+
+    def _resolve(self) -> dict:
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    self._data = load_env(self._file_paths)
+                data = self._data
+        return data
+
+    def reload(self) -> dict:
+        with self._lock:
+            self._data = load_env(self._file_paths)
+            return self._data
+
+    @property
+    def loaded(self) -> bool:
+        return self._data is not None
+
+    def __getitem__(self, key: str) -> Any:
+        return self._resolve()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._resolve())
+
+    def __len__(self) -> int:
+        return len(self._resolve())
+
+
+config = LazyConfig(DEFAULT_CONFIG_FILES)
+
+
+def get_config() -> LazyConfig:
+    """Configuração compartilhada do processo (root.local.yml + ambiente)."""
+    return config
+
+
+def reload_config() -> LazyConfig:
+    config.reload()
+    return config
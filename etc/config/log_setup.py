@@ -0,0 +1,171 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from typing import Callable
+
+FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# limites padrão das mensagens por objeto, ajustáveis em configure_logging
+OBJECT_LOG_RATE = 5.0  # mensagens por segundo, por template
+OBJECT_LOG_BURST = 20
+
+_lock = threading.Lock()
+_listener: logging.handlers.QueueListener | None = None
+_rate_filters: list["RateLimitFilter"] = []
+_object_limits = {"rate": OBJECT_LOG_RATE, "burst": OBJECT_LOG_BURST}
+# argumentos que podem ser formatados depois, na thread do QueueListener
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes)
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enfileira o registro sem formatá-lo quando os argumentos são imutáveis.
+
+    O QueueHandler padrão formata a mensagem em 'prepare', ainda na thread
+    que logou; aqui, se msg é str e todos os args são primitivos imutáveis
+    (strings, números, None), msg e args seguem intactos e a formatação
+    acontece na thread do QueueListener. Com dicts, listas ou outros objetos
+    a formatação adiada leria um valor que a thread de origem ainda pode
+    alterar, então o registro é formatado já na chamada.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if isinstance(record.msg, str) and isinstance(record.args, tuple) and all(
+            arg is None or type(arg) in _IMMUTABLE_ARGS for arg in record.args
+        ):
+            return record
+        return super().prepare(record)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Limita cada template de mensagem a 'rate' registros por segundo.
+
+    Balde de fichas por (logger, template): até 'burst' registros passam de
+    uma vez e depois 'rate' por segundo. O próximo registro que passar
+    informa quantos foram descartados no intervalo.
+    """
+
+    def __init__(
+        self,
+        rate: float = OBJECT_LOG_RATE,
+        burst: int = OBJECT_LOG_BURST,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._buckets: dict[tuple[str, object], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.msg)
+        now = self._clock()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                # [fichas, último instante, descartados]
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            tokens = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1
+            suppressed, bucket[2] = bucket[2], 0
+
+        if suppressed and isinstance(record.args, tuple):
+            record.msg = f"{record.msg} (+%d semelhantes suprimidas)"
+            record.args = record.args + (suppressed,)
+        return True
+
+
+def rate_limited_logger(name: str) -> logging.Logger:
+    """
+    Logger para mensagens por objeto (leituras, remoções, cache hits).
+
+    O filtro fica no próprio logger, então só afeta os registros emitidos
+    por ele; os limites seguem o último configure_logging.
+    """
+    logger = logging.getLogger(name)
+    with _lock:
+        if not any(isinstance(f, RateLimitFilter) for f in logger.filters):
+            rate_filter = RateLimitFilter(**_object_limits)
+            logger.addFilter(rate_filter)
+            _rate_filters.append(rate_filter)
+    return logger
+
+
+def configure_logging(
+    level: int | str = logging.INFO,
+    object_log_rate: float | None = None,
+    object_log_burst: int | None = None,
+) -> None:
+    """
+    Configura o logging do processo uma única vez.
+
+    O root recebe um QueueHandler e um QueueListener escreve no stderr em
+    sua própria thread: quem loga só paga um put na fila. Chamadas
+    seguintes só ajustam o nível e os limites por objeto. Como o
+    basicConfig, não instala nada se o root já tiver handlers (pytest).
+    """
+    global _listener
+    with _lock:
+        if object_log_rate is not None:
+            _object_limits["rate"] = object_log_rate
+        if object_log_burst is not None:
+            _object_limits["burst"] = object_log_burst
+        for rate_filter in _rate_filters:
+            rate_filter.rate = _object_limits["rate"]
+            rate_filter.burst = _object_limits["burst"]
+
+        root = logging.getLogger()
+        if _listener is not None:
+            root.setLevel(level)
+            return
+        if root.handlers:
+            return
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        stream = logging.StreamHandler()
+        stream.setFormatter(logging.Formatter(FORMAT))
+        root.addHandler(_DeferredQueueHandler(log_queue))
+        root.setLevel(level)
+
+        _listener = logging.handlers.QueueListener(
+            log_queue, stream, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(stop_logging)
+
+
+def stop_logging() -> None:
+    """Esvazia a fila e encerra a thread do listener (chamado no atexit)."""
+    global _listener
+    with _lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+def _reinit_in_child() -> None:
+    # a thread do listener não sobrevive ao fork (interfaces.supervisor): o
+    # filho troca o QueueHandler herdado por fila e listener próprios
+    global _listener, _lock
+    _lock = threading.Lock()
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for handler in [h for h in root.handlers if isinstance(h, _DeferredQueueHandler)]:
+        root.removeHandler(handler)
+    _listener = None
+    configure_logging(root.level)
+
+
+os.register_at_fork(after_in_child=_reinit_in_child)
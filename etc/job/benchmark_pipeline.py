@@ -0,0 +1,334 @@
+# Mede a vazão de ponta a ponta de usecase.avaliate_data: mensagens no broker
+# em memória, objetos no bucket local (memory ou filesystem) e DuckDB num
+# arquivo temporário. Cada cenário da grade roda num interpretador novo, para
+# que o pico de RSS seja só dele; o resultado sai em JSON (--output) para
+# comparar execuções.
+#
+#   python -m etc.job.benchmark_pipeline --objects 1000 10000 --size 1024 \
+#       --error-rate 0 0.1 --concurrency 1 4 --output bench.json
+
+import argparse
+import copy
+import itertools
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+SCHEMA = {
+    "type": "record",
+    "name": "Bench",
+    "fields": [
+        {"name": "name", "type": "string"},
+        {"name": "age", "type": "int"},
+        {"name": "salary", "type": "double"},
+        {"name": "tags", "type": {"type": "array", "items": "string"}},
+        {"name": "payload", "type": "string"},
+    ],
+}
+
+
+class _FlushTimer:
+    """
+    Tempo gasto na gravação em lote das métricas, por thread.
+
+    O flush acontece a cada storage.metric_batch_size objetos, dentro do
+    intervalo de um deles; _TimedBucket desconta esse tempo da latência do
+    objeto e ele é reportado à parte.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.durations: list[float] = []
+
+    def pending(self) -> float:
+        return getattr(self._local, "pending", 0.0)
+
+    def take_pending(self) -> float:
+        pending = self.pending()
+        self._local.pending = 0.0
+        return pending
+
+    @contextmanager
+    def timed(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self._local.pending = self.pending() + elapsed
+            with self._lock:
+                self.durations.append(elapsed)
+
+
+class _TimedStorage:
+    """Envolve o adaptador de storage e cronometra as transações (flush das métricas)."""
+
+    def __init__(self, adapter, timer: _FlushTimer):
+        self._adapter = adapter
+        self._timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self._adapter, name)
+
+    @contextmanager
+    def create_transaction(self):
+        with self._timer.timed(), self._adapter.create_transaction() as conn:
+            yield conn
+
+
+class _TimedBucket:
+    """
+    Envolve o adaptador de bucket e mede o tempo de cada objeto.
+
+    A latência de um objeto soma a leitura (o GET feito pelo iterador) e o
+    intervalo até o pedido do próximo: validação, move_object e registro da
+    métrica, sem o flush em lote das métricas (medido por _FlushTimer).
+    """
+
+    def __init__(self, adapter, latencies: list[float], flushes: _FlushTimer):
+        self._adapter = adapter
+        self._latencies = latencies
+        self._flushes = flushes
+        self._lock = threading.Lock()
+        self.bytes_read = 0
+
+    def __getattr__(self, name):
+        return getattr(self._adapter, name)
+
+    def iter_bucket_by_prefix_key(self, bucket_name: str, prefix: str, failed=None):
+        local: list[float] = []
+        size = 0
+        objects = self._adapter.iter_bucket_by_prefix_key(bucket_name, prefix, failed)
+        try:
+            while True:
+                started = time.perf_counter()
+                try:
+                    filename, blob = next(objects)
+                except StopIteration:
+                    break
+                size += len(blob)
+                self._flushes.take_pending()
+                yield filename, blob
+                elapsed = time.perf_counter() - started
+                local.append(elapsed - self._flushes.take_pending())
+        finally:
+            with self._lock:
+                self._latencies.extend(local)
+                self.bytes_read += size
+
+
+def _record(index: int, size: int, invalid: bool) -> bytes:
+    record = {
+        "name": f"registro-{index}",
+        "age": "quarenta" if invalid else index % 90,
+        "salary": index * 1.5,
+        "tags": ["a", "b"],
+        "payload": "",
+    }
+    padding = max(0, size - len(json.dumps(record)))
+    record["payload"] = "x" * padding
+    return json.dumps(record).encode("utf-8")
+
+
+def _percentile(values: list[float], pct: int) -> float:
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[pct - 1]
+
+
+def run_scenario(scenario: dict) -> dict:
+    """Executa um cenário neste processo e devolve as métricas."""
+    from application import usecase
+    from domain import dto
+    from etc.config import loader, log_setup
+    from infrastructure import repository
+    from interfaces import rabbitmq
+
+    log_setup.configure_logging(level="WARNING")
+    objects = scenario["objects"]
+    concurrency = scenario["concurrency"]
+    workdir = tempfile.mkdtemp(prefix="bench-")
+
+    env = copy.deepcopy(dict(loader.get_config()))
+    env["storage"] = {
+        **env["storage"],
+        "db_file": os.path.join(workdir, "bench.duckdb"),
+        "metric_batch_size": scenario["metric_batch_size"],
+    }
+    env["bucket"] = {
+        "backend": scenario["bucket_backend"],
+        "root": os.path.join(workdir, "buckets"),
+    }
+    env["broker"] = {**env["broker"], "backend": "memory", "prefetch": 1}
+
+    consumer = rabbitmq.Consumer(env)
+    with consumer.storage_connection.connect() as conn:
+        repository.QueryWriter.run_sql_in_file(conn, env["app"]["migration"], [])
+
+    bm = consumer.bucket_adapter
+    for bucket_name in ("gold", "validated", "quarantine"):
+        bm.create_bucket(bucket_name)
+
+    # um namespace por worker, objetos distribuídos em rodízio
+    namespaces = [f"bench.ns{i}" for i in range(concurrency)]
+    for namespace in namespaces:
+        usecase.create_schema(
+            dto.SchemaCreateDto(**SCHEMA, namespace=namespace),
+            consumer.storage_connection,
+            consumer.schema_repository,
+        )
+    invalid_every = (
+        round(1 / scenario["error_rate"]) if scenario["error_rate"] > 0 else 0
+    )
+    for index in range(objects):
+        namespace = namespaces[index % concurrency]
+        invalid = bool(invalid_every) and index % invalid_every == 0
+        bm.put_object(
+            "gold",
+            f"{namespace.replace('.', '/')}/{index:09d}.json",
+            _record(index, scenario["size"], invalid),
+            "application/json",
+        )
+
+    latencies: list[float] = []
+    flushes = _FlushTimer()
+    timed = consumer.bucket_adapter = _TimedBucket(bm, latencies, flushes)
+    consumer.storage_connection = _TimedStorage(consumer.storage_connection, flushes)
+    rm = consumer.broker_adapter
+    for namespace in namespaces:
+        usecase.schedule_schema_validation(namespace, rm)
+
+    workers = [
+        threading.Thread(
+            target=rm.consume_blocking,
+            args=(consumer.on_data_received, consumer.on_max_retry_reached),
+        )
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    validated = sum(1 for _ in bm.iter_bucket_by_prefix_key("validated", "bench"))
+    quarantined = sum(1 for _ in bm.iter_bucket_by_prefix_key("quarantine", "bench"))
+    return {
+        **scenario,
+        "processed": len(latencies),
+        "validated": validated,
+        "quarantined": quarantined,
+        "seconds": round(elapsed, 4),
+        "objects_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mb_per_s": round(timed.bytes_read / elapsed / 1e6, 3) if elapsed else 0.0,
+        "latency_ms": {
+            f"p{pct}": round(_percentile(latencies, pct) * 1000, 3)
+            for pct in (50, 95, 99)
+        },
+        # gravação em lote das métricas, fora da latência por objeto
+        "metric_flush": {
+            "count": len(flushes.durations),
+            "total_ms": round(sum(flushes.durations) * 1000, 3),
+            "p99_ms": round(_percentile(flushes.durations, 99) * 1000, 3),
+        },
+        # ru_maxrss vem em KiB no Linux
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+        "broker": rm.stats(),
+    }
+
+
+def measure(scenario: dict) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-m", "etc.job.benchmark_pipeline", "--scenario", json.dumps(scenario)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Vazão de ponta a ponta do pipeline")
+    parser.add_argument("--objects", type=int, nargs="+", default=[1000])
+    parser.add_argument("--size", type=int, nargs="+", default=[1024])
+    parser.add_argument("--error-rate", type=float, nargs="+", default=[0.0, 0.1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    parser.add_argument(
+        "--metric-batch-size",
+        type=int,
+        nargs="+",
+        default=None,
+        help="storage.metric_batch_size por cenário (padrão: o da configuração)",
+    )
+    parser.add_argument(
+        "--bucket-backend", choices=["memory", "filesystem"], default="memory"
+    )
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--scenario", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        # modo interno: um cenário por subprocesso
+        print(json.dumps(run_scenario(json.loads(args.scenario))))
+        return
+
+    metric_batch_sizes = args.metric_batch_size
+    if metric_batch_sizes is None:
+        from etc.config import loader
+
+        metric_batch_sizes = [loader.get_config()["storage"].get("metric_batch_size", 1)]
+
+    results = []
+    for objects, size, error_rate, concurrency, metric_batch_size in itertools.product(
+        args.objects, args.size, args.error_rate, args.concurrency, metric_batch_sizes
+    ):
+        scenario = {
+            "objects": objects,
+            "size": size,
+            "error_rate": error_rate,
+            "concurrency": concurrency,
+            "metric_batch_size": metric_batch_size,
+            "bucket_backend": args.bucket_backend,
+        }
+        result = measure(scenario)
+        print(
+            f"objects={objects} size={size} error_rate={error_rate} "
+            f"concurrency={concurrency} metric_batch_size={metric_batch_size}: "
+            f"{result['objects_per_s']} obj/s, {result['mb_per_s']} MB/s, "
+            f"p99={result['latency_ms']['p99']} ms, "
+            f"flush={result['metric_flush']['total_ms']} ms",
+            file=sys.stderr,
+        )
+        results.append(result)
+
+    report = json.dumps(
+        {
+            "environment": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+            },
+            "results": results,
+        },
+        indent=2,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+# Microbenchmarks dos caminhos quentes do validador: validate_data_against_avro
+# por engine e formato de schema (registros largos, uniões profundas, arrays
+# longos), JsonValidator.convert e ValidatorFactory.from_file_name.
+#
+# Os tempos são divididos pelo de uma carga de calibração medida junto de cada
+# benchmark, o que torna a comparação com o baseline versionado
+# (etc/benchmark/validator_baseline.json) menos dependente da máquina.
+#
+#   python -m etc.job.benchmark_validator                 # só mede
+#   python -m etc.job.benchmark_validator --check         # falha se regredir
+#   python -m etc.job.benchmark_validator --update-baseline
+#
+# A calibração não acompanha todos os caminhos (decodificação de JSON e arrays
+# longos dependem de alocador e cache da CPU): um benchmark do baseline pode
+# ter 'threshold' próprio, mais largo que o --threshold. Sozinho, --check só
+# falha quando o ambiente é o do baseline (Python, arquitetura e CPUs); fora
+# dele as regressões são avisos, a menos que se passe --strict (o padrão de
+# make benchmark_validator).
+
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+from typing import Callable
+
+from application import validator
+
+BASELINE_PATH = "etc/benchmark/validator_baseline.json"
+DEFAULT_THRESHOLD = 0.25  # 25% acima do baseline calibrado conta como regressão
+
+# engines de validação; cada nova implementação de IChecker entra aqui
+ENGINES: dict[str, Callable[[], validator.IChecker]] = {
+    "row": validator.JsonValidator,
+}
+
+_PRIMITIVES = [
+    ("string", "texto"),
+    ("int", 42),
+    ("double", 3.14),
+    ({"type": "array", "items": "string"}, ["a", "b"]),
+]
+
+
+def _wide(fields: int = 200) -> tuple[dict, dict]:
+    schema = {"type": "record", "name": "Wide", "fields": []}
+    record = {}
+    for i in range(fields):
+        avro_type, value = _PRIMITIVES[i % len(_PRIMITIVES)]
+        schema["fields"].append({"name": f"f{i}", "type": avro_type})
+        record[f"f{i}"] = value
+    return schema, record
+
+
+def _deep_unions(fields: int = 100) -> tuple[dict, dict]:
+    # o valor casa com o último membro da união: pior caso da busca
+    union = ["null", "int", "double", "string", {"type": "array", "items": "string"}]
+    schema = {
+        "type": "record",
+        "name": "Unions",
+        "fields": [{"name": f"u{i}", "type": union} for i in range(fields)],
+    }
+    return schema, {f"u{i}": ["x", "y", "z"] for i in range(fields)}
+
+
+def _long_arrays(fields: int = 4, items: int = 10000) -> tuple[dict, dict]:
+    schema = {
+        "type": "record",
+        "name": "Arrays",
+        "fields": [
+            {"name": f"a{i}", "type": {"type": "array", "items": "string"}}
+            for i in range(fields)
+        ],
+    }
+    return schema, {f"a{i}": [f"item-{j}" for j in range(items)] for i in range(fields)}
+
+
+SHAPES = {
+    "wide": _wide,
+    "deep_unions": _deep_unions,
+    "long_arrays": _long_arrays,
+}
+
+
+def _calibration() -> None:
+    # carga Python pura e estável: laços, dicts e isinstance, como o validador
+    data = {str(i): i for i in range(200)}
+    for key, value in data.items():
+        isinstance(value, (int, float)) and key in data
+
+
+def measure(func: Callable[[], object], repeat: int = 7) -> dict[str, float]:
+    """
+    ns por chamada e custo relativo à calibração.
+
+    Cada rodada mede a calibração logo antes da função, então variações de
+    frequência da CPU ao longo da execução afetam as duas; vale a menor
+    razão entre as rodadas.
+    """
+    timer = timeit.Timer(func)
+    calibration = timeit.Timer(_calibration)
+    number, _ = timer.autorange()
+    calibration_number, _ = calibration.autorange()
+    best_ns = best_relative = float("inf")
+    for _ in range(repeat):
+        calibration_ns = calibration.timeit(calibration_number) / calibration_number
+        ns = timer.timeit(number) / number
+        best_ns = min(best_ns, ns * 1e9)
+        best_relative = min(best_relative, ns / calibration_ns)
+    return {"ns_per_op": round(best_ns, 1), "relative": round(best_relative, 4)}
+
+
+def collect(only: set[str] | None = None) -> dict[str, dict[str, float]]:
+    """Resultado de cada benchmark (todos, ou só os nomes em 'only')."""
+    benchmarks: dict[str, Callable[[], object]] = {}
+    for shape_name, build in SHAPES.items():
+        schema, record = build()
+        for engine_name, engine in ENGINES.items():
+            checker = engine()
+            assert not checker.validate_data_against_avro(record, schema)
+            benchmarks[f"validate.{engine_name}.{shape_name}"] = (
+                lambda c=checker, r=record, s=schema: c.validate_data_against_avro(r, s)
+            )
+        encoded = json.dumps(record).encode("utf-8")
+        json_validator = validator.JsonValidator()
+        benchmarks[f"convert.json.{shape_name}"] = (
+            lambda v=json_validator, e=encoded: v.convert(e)
+        )
+
+    factory = validator.ValidatorFactory()
+    factory.from_file_name("warm.json")
+    benchmarks["from_file_name.cached"] = lambda: factory.from_file_name(
+        "rfb/json/sample.json"
+    )
+    return {
+        name: measure(func)
+        for name, func in benchmarks.items()
+        if only is None or name in only
+    }
+
+
+def run() -> dict:
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+        },
+        "benchmarks": collect(),
+    }
+
+
+def same_environment(current: dict, baseline: dict) -> bool:
+    """Mesma versão menor do Python, arquitetura e número de CPUs."""
+
+    def key(environment: dict) -> tuple:
+        python = ".".join(str(environment.get("python", "")).split(".")[:2])
+        return python, environment.get("machine"), environment.get("cpus")
+
+    return key(current) == key(baseline)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Benchmarks do baseline cujo custo relativo subiu mais que 'threshold'."""
+    regressions = []
+    for name, expected in baseline["benchmarks"].items():
+        measured = current["benchmarks"].get(name)
+        if measured is None:
+            regressions.append(f"{name}: ausente na execução atual")
+            continue
+        ratio = measured["relative"] / expected["relative"]
+        if ratio > 1 + expected.get("threshold", threshold):
+            regressions.append(
+                f"{name}: {ratio:.2f}x o baseline "
+                f"({measured['ns_per_op']:.0f} ns/op, antes {expected['ns_per_op']:.0f})"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Microbenchmarks do validador")
+    parser.add_argument("--check", action="store_true", help="compara com o baseline")
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="falha mesmo com ambiente diferente do baseline",
+    )
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    current = run()
+    report = json.dumps(current, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+    if args.update_baseline:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        if os.path.exists(args.baseline):
+            # as tolerâncias por benchmark são escolhidas à mão: sobrevivem
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                previous = json.load(f)["benchmarks"]
+            for name, result in current["benchmarks"].items():
+                if "threshold" in previous.get(name, {}):
+                    result["threshold"] = previous[name]["threshold"]
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            f.write(json.dumps(current, indent=2) + "\n")
+        print(f"Baseline atualizado em {args.baseline}", file=sys.stderr)
+        return
+
+    if args.check:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(current, baseline, args.threshold)
+        if regressions:
+            # confirma as suspeitas antes de falhar: ruído raramente se repete
+            suspects = {
+                name
+                for name in baseline["benchmarks"]
+                if name in current["benchmarks"]
+                and compare(
+                    {"benchmarks": {name: current["benchmarks"][name]}},
+                    {"benchmarks": {name: baseline["benchmarks"][name]}},
+                    args.threshold,
+                )
+            }
+            for name, result in collect(suspects).items():
+                if result["relative"] < current["benchmarks"][name]["relative"]:
+                    current["benchmarks"][name] = result
+            regressions = compare(current, baseline, args.threshold)
+        enforced = args.strict or same_environment(
+            current["environment"], baseline["environment"]
+        )
+        for line in regressions:
+            print(f"{'REGRESSÃO' if enforced else 'AVISO'} {line}", file=sys.stderr)
+        if regressions and enforced:
+            sys.exit(1)
+        if regressions:
+            print(
+                f"Ambiente diferente do baseline ({baseline['environment']}): "
+                "regressões só informativas; use --strict para falhar",
+                file=sys.stderr,
+            )
+            return
+        print(
+            f"{len(baseline['benchmarks'])} benchmarks dentro de "
+            f"{args.threshold:.0%} do baseline",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
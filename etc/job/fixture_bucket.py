@@ -7,8 +7,8 @@ from etc.config import loader
 from infrastructure import bucket, storage
 
 # Inicializa o BucketManager
-env = loader.load_env(["./etc/config/root.local.yml"])
-bm = bucket.BucketAdapter.from_minio_client(env["bucket"])
+env = loader.get_config()
+bm = bucket.from_config(env["bucket"])
 
 
 # Reinicia os buckets para garantir um ambiente limpo
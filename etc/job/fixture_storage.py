@@ -2,7 +2,7 @@
 from etc.config import loader
 from infrastructure.storage import StorageConnectionAdapter
 from infrastructure import repository
-env = loader.load_env(['./etc/config/root.local.yml'])
+env = loader.get_config()
 storage_connection = StorageConnectionAdapter.from_duckdb_memory(env['storage'])
 
 with storage_connection.connect() as conn:
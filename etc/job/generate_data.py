@@ -0,0 +1,331 @@
+# Gera registros sintéticos (Faker) a partir do schema Avro corrente de um
+# namespace e os envia ao bucket de origem em paralelo, com uma fração de
+# registros inválidos. Reproduz localmente namespaces do tamanho dos de
+# produção; etc/job/populate_bucket.py continua com as amostras fixas usadas
+# pelo teste de fluxo completo.
+#
+#   python -m etc.job.generate_data --namespace rfb.json --records 1000000 \
+#       --invalid-ratio 0.05 --format ndjson --object-size 1048576 --workers 8
+
+import argparse
+import csv
+import io
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator
+
+from faker import Faker
+
+log = logging.getLogger(__name__)
+
+CORRUPTIONS = ("type", "missing", "null", "extra")
+CONTENT_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "application/csv",
+}
+
+# campos string reconhecidos pelo nome recebem valores plausíveis
+_STRING_PROVIDERS: dict[str, Callable[[Faker], str]] = {
+    "name": lambda f: f.name(),
+    "nome": lambda f: f.name(),
+    "email": lambda f: f.email(),
+    "city": lambda f: f.city(),
+    "municipio": lambda f: f.city(),
+    "cep": lambda f: f.postcode(),
+    "uf": lambda f: f.estado_sigla() if hasattr(f, "estado_sigla") else f.state_abbr(),
+    "cnpj": lambda f: f.cnpj() if hasattr(f, "cnpj") else f.bothify("##.###.###/####-##"),
+    "data": lambda f: f.date(),
+    "date": lambda f: f.date(),
+    "hora": lambda f: f.time(),
+    "time": lambda f: f.time(),
+}
+
+
+def _string_for(field_name: str, fake: Faker) -> str:
+    lowered = field_name.lower()
+    for key, provider in _STRING_PROVIDERS.items():
+        if key in lowered:
+            return provider(fake)
+    return fake.word()
+
+
+class RecordFactory:
+    """Registros que seguem o schema Avro (tipos primitivos, arrays, maps, enums, uniões e records)."""
+
+    def __init__(self, schema: dict, seed: int | None = None, locale: str = "pt_BR"):
+        self.schema = schema
+        self.rng = random.Random(seed)
+        self.fake = Faker(locale)
+        self.fake.seed_instance(seed)
+
+    def record(self) -> dict[str, Any]:
+        return self._record(self.schema)
+
+    def _record(self, schema: dict) -> dict[str, Any]:
+        return {
+            field["name"]: self._value(field["type"], field["name"])
+            for field in schema.get("fields", [])
+        }
+
+    def _value(self, avro_type: Any, field_name: str) -> Any:
+        if isinstance(avro_type, list):
+            # união: null em ~10% dos casos quando permitido
+            options = [t for t in avro_type if t != "null"]
+            if not options or ("null" in avro_type and self.rng.random() < 0.1):
+                return None
+            return self._value(self.rng.choice(options), field_name)
+        if isinstance(avro_type, dict):
+            kind = avro_type.get("type")
+            if kind == "record":
+                return self._record(avro_type)
+            if kind == "array":
+                return [
+                    self._value(avro_type["items"], field_name)
+                    for _ in range(self.rng.randint(0, 5))
+                ]
+            if kind == "map":
+                return {
+                    self.fake.word(): self._value(avro_type["values"], field_name)
+                    for _ in range(self.rng.randint(0, 3))
+                }
+            if kind == "enum":
+                return self.rng.choice(avro_type["symbols"])
+            if kind == "fixed":
+                return self.fake.pystr(
+                    min_chars=avro_type["size"], max_chars=avro_type["size"]
+                )
+            return self._value(kind, field_name)
+        if avro_type == "null":
+            return None
+        if avro_type == "boolean":
+            return self.rng.random() < 0.5
+        if avro_type == "int":
+            return self.rng.randint(0, 2**31 - 1) if field_name != "age" else self.rng.randint(18, 90)
+        if avro_type == "long":
+            return self.rng.randint(0, 2**63 - 1)
+        if avro_type in ("float", "double"):
+            return round(self.rng.uniform(0, 100000), 2)
+        if avro_type in ("string", "bytes"):
+            return _string_for(field_name, self.fake)
+        raise ValueError(f"Tipo Avro não suportado: {avro_type}")
+
+    def corrupt(self, record: dict[str, Any], kinds: tuple[str, ...]) -> dict[str, Any]:
+        """Aplica uma corrupção de campo sorteada entre 'kinds'."""
+        fields = self.schema.get("fields", [])
+        required = [
+            field
+            for field in fields
+            if "default" not in field
+            and not (isinstance(field["type"], list) and "null" in field["type"])
+        ]
+        kind = self.rng.choice(kinds)
+        if kind != "extra" and not required:
+            kind = "extra"  # nada obrigatório para quebrar
+        if kind == "extra":
+            record[f"extra_{self.fake.word()}"] = self.fake.word()
+            return record
+
+        field = self.rng.choice(required)
+        if kind == "missing":
+            record.pop(field["name"], None)
+        elif kind == "null":
+            record[field["name"]] = None
+        else:
+            record[field["name"]] = _wrong_type(field["type"])
+        return record
+
+
+def _wrong_type(avro_type: Any) -> Any:
+    # valor de outro tipo, que o validador deve recusar
+    if avro_type in ("string", "bytes", "enum") or (
+        isinstance(avro_type, dict) and avro_type.get("type") in ("enum", "fixed")
+    ):
+        return 12345
+    if isinstance(avro_type, dict) and avro_type.get("type") in ("array", "map", "record"):
+        return "não é coleção"
+    return "não é número"
+
+
+def generate_records(
+    factory: RecordFactory,
+    count: int,
+    invalid_ratio: float,
+    corruptions: tuple[str, ...],
+) -> Iterator[tuple[dict[str, Any], bool]]:
+    for _ in range(count):
+        record = factory.record()
+        invalid = factory.rng.random() < invalid_ratio
+        if invalid:
+            record = factory.corrupt(record, corruptions)
+        yield record, invalid
+
+
+def encode_objects(
+    records: Iterator[dict[str, Any]],
+    fmt: str,
+    object_size: int,
+    field_names: list[str],
+) -> Iterator[bytes]:
+    """
+    Agrupa os registros em objetos de até object_size bytes.
+
+    json gera um objeto por registro (o formato lido pelo JsonValidator);
+    ndjson e csv acumulam linhas até o tamanho pedido.
+    """
+    if fmt == "json":
+        for record in records:
+            yield json.dumps(record, ensure_ascii=False).encode("utf-8")
+        return
+
+    buffer = io.StringIO()
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(buffer, fieldnames=field_names, extrasaction="ignore")
+        writer.writeheader()
+    header_size = buffer.tell()
+
+    for record in records:
+        if fmt == "ndjson":
+            buffer.write(json.dumps(record, ensure_ascii=False))
+            buffer.write("\n")
+        else:
+            writer.writerow(
+                {
+                    key: json.dumps(value, ensure_ascii=False)
+                    if isinstance(value, (list, dict))
+                    else value
+                    for key, value in record.items()
+                }
+            )
+        if buffer.tell() >= object_size:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            if writer is not None:
+                writer.writeheader()
+
+    if buffer.tell() > header_size:
+        yield buffer.getvalue().encode("utf-8")
+
+
+def load_schema(namespace: str | None, schema_file: str | None) -> dict:
+    if schema_file:
+        with open(schema_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    from etc.config import loader
+    from infrastructure import repository, storage
+
+    env = loader.get_config()
+    dm = storage.StorageConnectionAdapter.from_duckdb_memory(env["storage"])
+    with dm.connect() as conn:
+        current = repository.SchemaRegistry().get_current_schema(conn, namespace)
+    if current is None:
+        raise SystemExit(f"Namespace sem schema registrado: {namespace}")
+    return json.loads(current["canonical"])
+
+
+def upload(
+    bm,
+    bucket_name: str,
+    prefix: str,
+    objects: Iterator[bytes],
+    fmt: str,
+    workers: int,
+) -> tuple[int, int]:
+    # uploads em paralelo; a janela limita os objetos gerados e ainda não enviados
+    window = workers * 2
+    pending: deque = deque()
+    sent = total_bytes = 0
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="generate") as executor:
+        for blob in objects:
+            name = f"{prefix}/synthetic_{uuid.uuid4().hex}.{fmt}"
+            pending.append(
+                executor.submit(bm.put_object, bucket_name, name, blob, CONTENT_TYPES[fmt])
+            )
+            sent += 1
+            total_bytes += len(blob)
+            if len(pending) >= window:
+                pending.popleft().result()
+        while pending:
+            pending.popleft().result()
+    return sent, total_bytes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gerador de dados sintéticos")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--namespace", help="namespace com schema registrado")
+    source.add_argument("--schema-file", help="schema Avro em JSON (sem storage)")
+    parser.add_argument("--records", type=int, default=1000)
+    parser.add_argument("--invalid-ratio", type=float, default=0.0)
+    parser.add_argument(
+        "--corruptions", nargs="+", choices=CORRUPTIONS, default=list(CORRUPTIONS)
+    )
+    parser.add_argument("--format", choices=sorted(CONTENT_TYPES), default="json")
+    parser.add_argument("--object-size", type=int, default=1024 * 1024)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--bucket", default=None, help="padrão: app.source_bucket")
+    parser.add_argument("--prefix", default=None, help="padrão: namespace com '/'")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    from etc.config import loader, log_setup
+    from infrastructure import bucket
+
+    env = loader.get_config()
+    log_setup.configure_logging(**env.get("logging", {}))
+
+    schema = load_schema(args.namespace, args.schema_file)
+    namespace = args.namespace or schema.get("namespace", "synthetic")
+    prefix = args.prefix or namespace.replace(".", "/")
+    bucket_name = args.bucket or env["app"]["source_bucket"]
+
+    factory = RecordFactory(schema, seed=args.seed)
+    counts = {"records": 0, "invalid": 0}
+
+    def records() -> Iterator[dict[str, Any]]:
+        for record, invalid in generate_records(
+            factory, args.records, args.invalid_ratio, tuple(args.corruptions)
+        ):
+            counts["records"] += 1
+            counts["invalid"] += invalid
+            yield record
+
+    field_names = [field["name"] for field in schema.get("fields", [])]
+    started = time.perf_counter()
+    bm = bucket.from_config(env["bucket"])
+    bm.create_bucket(bucket_name)
+    objects, total_bytes = upload(
+        bm,
+        bucket_name,
+        prefix,
+        encode_objects(records(), args.format, args.object_size, field_names),
+        args.format,
+        args.workers,
+    )
+    elapsed = time.perf_counter() - started
+
+    summary = {
+        **counts,
+        "objects": objects,
+        "bytes": total_bytes,
+        "seconds": round(elapsed, 3),
+        "records_per_s": round(counts["records"] / elapsed, 1) if elapsed else 0.0,
+        "bucket": bucket_name,
+        "prefix": prefix,
+    }
+    log.info("Geração concluída: %s", summary)
+    json.dump(summary, sys.stdout)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,10 @@ from infrastructure import broker
 from etc.config import loader
 from infrastructure import bucket, storage
 # Inicializa o BucketManager
-env = loader.load_env(['./etc/config/root.local.yml'])
+env = loader.get_config()
 
 
-bm = bucket.BucketAdapter.from_minio_client(env['bucket'])
+bm = bucket.from_config(env['bucket'])
 dm = storage.StorageConnectionAdapter.from_duckdb_memory(env['storage'])
 ds = repository.SchemaRegistry()
 br = broker.BrokerAdapter(env['broker'])
@@ -11,15 +11,13 @@ import glob
 from etc.config import loader
 from infrastructure import bucket, storage
 # Inicializa o BucketManager
-env = loader.load_env(['./etc/config/root.local.yml'])
+env = loader.get_config()
 json_files = glob.glob("./etc/mock/*.json")
-bm = bucket.BucketAdapter.from_minio_client(env['bucket'])
+bm = bucket.from_config(env['bucket'])
 
 import logging
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+from etc.config import log_setup
+log_setup.configure_logging(**env.get("logging", {}))
 log = logging.getLogger(__name__)
 
 log.info(f"Encontrados {len(json_files)} arquivos JSON.")
@@ -48,16 +46,13 @@ csv_files = glob.glob("./etc/mock/*.csv")
 log.info(f"Encontrados {len(csv_files)} arquivos CSV.")
 
 for file_path in csv_files:
-    with open(file_path, "r", encoding="utf-8") as f:
-        # DictReader converte cada linha do CSV em um dicionário Python
-        # usando a primeira linha (header) como chaves
-        reader = f.read()
-        # Convertemos a linha do CSV para JSON para manter o padrão no bucket
+    with open(file_path, "rb") as f:
+        # o arquivo vai em streaming, sem ser carregado inteiro na memória
         # (Ajuste o caminho 'rfb/csv/' se preferir separar dos jsons originais)
         bm.put_object(
             env['app']['source_bucket'],
             f"rfb/csv/sample_{uuid.uuid4()}.csv",
-            reader,
+            f,
             content_type="application/csv"
         )
 
@@ -1,6 +1,6 @@
 
 from etc.config import loader
-env = loader.load_env(['./etc/config/root.local.yml'])
+env = loader.get_config()
 
 from infrastructure import storage
 from infrastructure import repository
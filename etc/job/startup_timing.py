@@ -0,0 +1,54 @@
+# Mede a partida a frio da API num interpretador novo: importação, montagem do
+# router e a primeira resposta de /health/ready. Imprime um JSON por execução
+# (ou grava em --output) para acompanhar a latência de partida no CI.
+#
+#   python -m etc.job.startup_timing --runs 5 --output startup.json
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+from fastapi.testclient import TestClient
+from interfaces import fastapi as fa
+api = fa.setup_fastapi()
+response = TestClient(api).get("/health/ready")
+response.raise_for_status()
+timings = response.json()["timings"]
+timings["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+print(json.dumps(timings))
+"""
+
+
+def measure() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Partida a frio da API")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+
+    runs = [measure() for _ in range(args.runs)]
+    summary = {
+        key: statistics.median(run[key] for run in runs)
+        for key in runs[0]
+        if all(key in run for run in runs)
+    }
+    report = json.dumps({"median": summary, "runs": runs}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(report)
+    print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# Lê os spans exportados pelo tracing (tracing.exporter: file) e mostra, por
+# job, onde o tempo foi gasto: total e tempo próprio por tipo de span e a
+# contribuição de cada um para o caminho crítico.
+#
+#   python -m etc.job.trace_report                    # últimos 5 jobs
+#   python -m etc.job.trace_report --trace 3f2a9c... --json
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+
+QUEUE_WAIT = "(espera na fila)"
+
+
+def load_spans(path: str) -> dict[str, list[dict]]:
+    """Spans agrupados por trace, na ordem do arquivo."""
+    traces: dict[str, list[dict]] = defaultdict(list)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                span = json.loads(line)
+                traces[span["t"]].append(span)
+    return traces
+
+
+def _end(span: dict) -> int:
+    return span["ts"] + span["d"]
+
+
+def critical_path(spans: list[dict]) -> dict[str, int]:
+    """
+    Microssegundos de cada tipo de span no caminho crítico.
+
+    Partindo do fim de cada span, o filho que termina por último antes do
+    cursor está no caminho; o intervalo sem filho conta como tempo próprio
+    do pai. Filhos que terminam depois do pai (o job consumido depois do
+    agendamento) estendem o caminho, e o intervalo entre o fim do pai e o
+    início deles conta como espera na fila.
+    """
+    ids = {span["s"] for span in spans}
+    children: dict[str | None, list[dict]] = defaultdict(list)
+    for span in spans:
+        parent = span["p"] if span["p"] in ids else None
+        children[parent].append(span)
+
+    effective_end: dict[str, int] = {}
+
+    def extend(span: dict) -> int:
+        end = max([_end(span)] + [extend(child) for child in children[span["s"]]])
+        effective_end[span["s"]] = end
+        return end
+
+    for root in children[None]:
+        extend(root)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: effective_end[span["s"]], reverse=True)
+
+    contributions: dict[str, int] = defaultdict(int)
+
+    def gap(span: dict, start: int, end: int) -> None:
+        own_end = _end(span)
+        contributions[span["n"]] += max(0, min(end, own_end) - start)
+        contributions[QUEUE_WAIT] += max(0, end - max(start, own_end))
+
+    def walk(span: dict, end: int) -> None:
+        cursor = end
+        for child in children[span["s"]]:
+            if child["ts"] >= cursor:
+                continue
+            child_end = min(effective_end[child["s"]], cursor)
+            gap(span, child_end, cursor)
+            walk(child, child_end)
+            cursor = child["ts"]
+        gap(span, span["ts"], cursor)
+
+    roots = children[None]
+    if roots:
+        root = min(roots, key=lambda span: span["ts"])
+        walk(root, effective_end[root["s"]])
+    return {name: us for name, us in contributions.items() if us}
+
+
+def summarize(trace_id: str, spans: list[dict]) -> dict:
+    child_time: dict[str, int] = defaultdict(int)
+    for span in spans:
+        if span["p"]:
+            child_time[span["p"]] += span["d"]
+
+    by_name: dict[str, dict] = {}
+    for span in spans:
+        entry = by_name.setdefault(
+            span["n"], {"count": 0, "total_us": 0, "self_us": 0, "errors": 0}
+        )
+        entry["count"] += 1
+        entry["total_us"] += span["d"]
+        entry["self_us"] += max(0, span["d"] - child_time[span["s"]])
+        entry["errors"] += "error" in span.get("a", {})
+
+    start = min(span["ts"] for span in spans)
+    wall = max(_end(span) for span in spans) - start
+    attrs = {}
+    for span in sorted(spans, key=lambda s: s["ts"]):
+        if span["p"] is None or span["n"] == "consumer.job":
+            attrs.update(span.get("a", {}))
+    return {
+        "trace_id": trace_id,
+        "start_us": start,
+        "wall_us": wall,
+        "spans": len(spans),
+        "attrs": attrs,
+        "by_name": by_name,
+        "critical_path_us": critical_path(spans),
+    }
+
+
+def render(summary: dict) -> str:
+    wall = summary["wall_us"] or 1
+    attrs = " ".join(f"{k}={v}" for k, v in summary["attrs"].items())
+    lines = [
+        f"trace {summary['trace_id']} {attrs}",
+        f"  duração {wall / 1000:.1f} ms, {summary['spans']} spans",
+        f"  {'span':<24}{'qtd':>8}{'total ms':>12}{'próprio ms':>12}"
+        f"{'crítico ms':>12}{'crítico %':>11}",
+    ]
+    critical = summary["critical_path_us"]
+    names = sorted(
+        set(summary["by_name"]) | set(critical),
+        key=lambda name: critical.get(name, 0),
+        reverse=True,
+    )
+    for name in names:
+        entry = summary["by_name"].get(name, {"count": 0, "total_us": 0, "self_us": 0})
+        on_path = critical.get(name, 0)
+        lines.append(
+            f"  {name:<24}{entry['count']:>8}{entry['total_us'] / 1000:>12.1f}"
+            f"{entry['self_us'] / 1000:>12.1f}{on_path / 1000:>12.1f}"
+            f"{on_path / wall:>11.1%}"
+        )
+    dominant = ", ".join(
+        f"{name} {critical[name] / wall:.0%}"
+        for name in names
+        if critical.get(name, 0) / wall >= 0.01
+    )
+    lines.append(f"  caminho crítico dominado por: {dominant}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Relatório de latência por job")
+    parser.add_argument("--path", default=None, help="padrão: tracing.path")
+    parser.add_argument("--trace", default=None)
+    parser.add_argument("--last", type=int, default=5)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    path = args.path
+    if path is None:
+        from etc.config import loader
+
+        path = loader.get_config().get("tracing", {}).get("path", "data/traces.ndjson")
+
+    traces = load_spans(path)
+    if args.trace:
+        if args.trace not in traces:
+            sys.exit(f"Trace não encontrado: {args.trace}")
+        selected = {args.trace: traces[args.trace]}
+    else:
+        recent = sorted(
+            traces, key=lambda t: min(span["ts"] for span in traces[t])
+        )[-args.last :]
+        selected = {trace_id: traces[trace_id] for trace_id in recent}
+
+    summaries = [summarize(trace_id, spans) for trace_id, spans in selected.items()]
+    if args.json:
+        print(json.dumps(summaries, indent=2))
+        return
+    print("\n\n".join(render(summary) for summary in summaries))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,74 @@
-import json
+from collections import deque
 from typing import Callable
 import pika
 from domain import port
+from infrastructure import tracing
+from infrastructure.serializer import get_serializer
+import random
 import time
 
 import logging
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
 log = logging.getLogger(__name__)
 
 
 from etc.config import loader
-env_g = loader.load_env(['./etc/config/root.local.yml'])
+env_g = loader.get_config()
+
+# a partir deste count a entrega vai ao callback de DLQ
+MAX_DELIVERY_COUNT = 5
+
+
+def retry_tiers(env: dict) -> list[list[tuple[str, int]]]:
+    """
+    Filas de retry (nome, atraso em ms) de cada degrau, da menor espera à maior.
+
+    broker.retry_tiers_ms define os degraus; sem ele fica a fila única
+    queue_retry com queue_ttl_milliseconds. Com broker.retry_jitter, cada
+    degrau se divide em broker.retry_jitter_queues filas de TTL fixo
+    espaçado em [(1 - retry_jitter) * degrau, degrau]: o RabbitMQ só expira
+    a mensagem da cabeça da fila, então um TTL por mensagem (expiration)
+    numa fila compartilhada ficaria preso atrás dos mais longos.
+    """
+    delays = env.get("retry_tiers_ms")
+    if not delays:
+        return [[(env["queue_retry"], env["queue_ttl_milliseconds"])]]
+
+    jitter = env.get("retry_jitter", 0.0)
+    slots = env.get("retry_jitter_queues", 4) if jitter else 1
+    tiers = []
+    for tier in delays:
+        spread = sorted(
+            {round(tier * (1 - jitter * i / max(slots - 1, 1))) for i in range(slots)},
+            reverse=True,
+        )
+        tiers.append([(f"{env['queue_retry']}.{_delay_label(ms)}", ms) for ms in spread])
+    return tiers
+
+
+def retry_queues(tiers: list[list[tuple[str, int]]]) -> list[tuple[str, int]]:
+    """Todas as filas de retry, sem repetir as compartilhadas entre degraus."""
+    return list(dict.fromkeys(queue for tier in tiers for queue in tier))
+
+
+def _delay_label(ms: int) -> str:
+    if ms % 60000 == 0:
+        return f"{ms // 60000}m"
+    if ms % 1000 == 0:
+        return f"{ms // 1000}s"
+    return f"{ms}ms"
+
+
+def retry_delay(
+    tiers: list[list[tuple[str, int]]], count: int, rng=random
+) -> tuple[str, int]:
+    """
+    Fila de retry da tentativa 'count' (1 = primeira falha) e seu atraso.
+
+    A fila é sorteada entre as do degrau, para que as falhas de um mesmo
+    instante não voltem juntas.
+    """
+    return rng.choice(tiers[min(max(count, 1), len(tiers)) - 1])
+
 
 class BrokerAdapter(port.IBrokerAdapter):
     def __init__(self, env: dict):
@@ -24,8 +79,16 @@ class BrokerAdapter(port.IBrokerAdapter):
             # port=env['port'],
             credentials=credentials,
         )
+        self.serializer = get_serializer()
         self.connection = pika.BlockingConnection(parameters)
         self.channel = self.connection.channel()
+        # consume_batch: consumidor registrado uma vez e entregas já recebidas
+        self._batch_consumer: str | None = None
+        self._batch_buffer: deque = deque()
+        self._prefetch = 0
+        self._stop_requested = False
+        # limite de entregas sem ack em consume_blocking (0 = sem limite)
+        self.prefetch = env.get("prefetch", 0)
 
         self.setup_infrastructure(env)
 
@@ -47,6 +110,7 @@ class BrokerAdapter(port.IBrokerAdapter):
         self.main_queue = env["queue_name"]
         self.retry_queue = env["queue_retry"]
         self.dlq_queue = env["queue_dlq"]
+        self.retry_tiers = retry_tiers(env)
 
         # Arguments para fila principal com DLQ
         queue_args = {
@@ -59,15 +123,17 @@ class BrokerAdapter(port.IBrokerAdapter):
             queue=self.main_queue, durable=True, arguments=queue_args
         )
 
-        self.channel.queue_declare(
-            queue=self.retry_queue,
-            durable=True,
-            arguments={
-                "x-dead-letter-exchange": self.exchange_name,
-                "x-dead-letter-routing-key": self.main_queue,
-                "x-message-ttl": env["queue_ttl_milliseconds"],
-            },
-        )
+        # uma fila por atraso, com TTL fixo; ao expirar, volta à fila principal
+        for tier_queue, delay in retry_queues(self.retry_tiers):
+            self.channel.queue_declare(
+                queue=tier_queue,
+                durable=True,
+                arguments={
+                    "x-dead-letter-exchange": self.exchange_name,
+                    "x-dead-letter-routing-key": self.main_queue,
+                    "x-message-ttl": delay,
+                },
+            )
 
         self.channel.queue_declare(queue=self.dlq_queue, durable=True)
 
@@ -76,19 +142,34 @@ class BrokerAdapter(port.IBrokerAdapter):
             queue=self.main_queue, exchange=self.exchange_name, routing_key="app.*"
         )
 
+        # o retorno do retry usa o nome da fila, que 'app.*' não casa
         self.channel.queue_bind(
-            queue=self.retry_queue,
-            exchange=self.dlq_exchange_name,
-            routing_key=self.retry_queue,
+            queue=self.main_queue,
+            exchange=self.exchange_name,
+            routing_key=self.main_queue,
         )
 
+        for tier_queue, _ in retry_queues(self.retry_tiers):
+            self.channel.queue_bind(
+                queue=tier_queue,
+                exchange=self.dlq_exchange_name,
+                routing_key=tier_queue,
+            )
+
         self.channel.queue_bind(
             queue=self.dlq_queue,
             exchange=self.dlq_exchange_name,
             routing_key=self.dlq_queue,
         )
 
-    def publish_message(self, routing_key: str, message: str, count: int = 0) -> None:
+    @tracing.traced("broker.publish")
+    def publish_message(
+        self,
+        routing_key: str,
+        message: str,
+        count: int = 0,
+        headers: dict | None = None,
+    ) -> None:
         if not isinstance(message, str):
             raise ValueError("incorrect type ", type(message))
 
@@ -100,11 +181,11 @@ class BrokerAdapter(port.IBrokerAdapter):
                 properties=pika.BasicProperties(
                     delivery_mode=2,  # Mensagem persistente
                     content_type="application/json",
-                    headers={"count": count},  # Adiciona header count
+                    headers={**(headers or {}), "count": count},  # Adiciona header count
                 ),
             )
         except Exception as e:
-            log.info(f"Erro ao publicar no RabbitMQ: {e}")
+            log.info("Erro ao publicar no RabbitMQ: %s", e)
             raise e
 
     def consume_sync(self, qtd: int) -> list:
@@ -116,7 +197,7 @@ class BrokerAdapter(port.IBrokerAdapter):
             )
 
             if method_frame:
-                message = json.loads(body)
+                message = self.serializer.loads(body)
                 count = (
                     header_frame.headers.get("count", 0) if header_frame.headers else 0
                 )
@@ -140,8 +221,13 @@ class BrokerAdapter(port.IBrokerAdapter):
         duration: int | None = None,
     ):
         def message_handler(ch, method, properties, body):
+            # process_data_events despacha tudo o que o pika já recebeu; depois
+            # de stop_consuming essas entregas voltam à fila sem começar
+            if self._stop_requested:
+                ch.basic_nack(delivery_tag=method.delivery_tag, requeue=True)
+                return
             try:
-                message = json.loads(body)
+                message = self.serializer.loads(body)
                 count = properties.headers.get("count", 0) if properties.headers else 0
 
                 # Criar objeto de mensagem com métodos de acknowledge, Visitor Pattern
@@ -151,39 +237,153 @@ class BrokerAdapter(port.IBrokerAdapter):
                     delivery_tag=method.delivery_tag,
                     channel=ch,
                     broker_adapter=self,
+                    headers=properties.headers,
                 )
 
                 # Verificar se deve ir para DLQ
-                if count >= 5:
+                if count >= MAX_DELIVERY_COUNT:
                     callback_dlq(message_wrapper)
                 else:
                     callback_default(message_wrapper)
 
             except Exception as e:
-                log.info(f"Erro no processamento da mensagem: {e}")
+                log.info("Erro no processamento da mensagem: %s", e)
                 ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
 
-        self.channel.basic_consume(
+        if self.prefetch and self._prefetch != self.prefetch:
+            self.channel.basic_qos(prefetch_count=self.prefetch)
+            self._prefetch = self.prefetch
+        consumer_tag = self.channel.basic_consume(
             queue=self.main_queue, on_message_callback=message_handler, auto_ack=False
         )
 
+        # os callbacks rodam dentro de process_data_events; entre eles o laço
+        # confere o prazo e o pedido de parada (stop_consuming)
         log.info("Iniciando consumo assíncrono...")
-        self.channel.start_consuming()
+        deadline = None if duration is None else time.monotonic() + duration
+        while not self._stop_requested:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            self.connection.process_data_events(
+                time_limit=1 if remaining is None else min(1, remaining)
+            )
+        self.channel.basic_cancel(consumer_tag)
+        log.info("Consumo encerrado")
+
+    def stop_consuming(self) -> None:
+        """
+        Pede o fim de consume_blocking após o callback em curso.
+
+        Só marca o pedido, então pode ser chamado de um handler de sinal.
+        """
+        self._stop_requested = True
+
+    def consume_batch(
+        self, max_messages: int, wait_seconds: float = 0.5
+    ) -> list["AmqpDelivery"]:
+        """
+        Até max_messages entregas da fila principal, esperando no máximo
+        wait_seconds para completar o lote.
+
+        Com basic_qos(prefetch_count=max_messages) o próximo lote já vem a
+        caminho enquanto o atual é processado; ele é confirmado de uma vez
+        com acknowledge_message(maior delivery_tag, multiple=True), depois
+        de resolvidas individualmente as entregas com falha. Corpos
+        ilegíveis vão direto para a DLQ.
+        """
+        if self._prefetch != max_messages:
+            self.channel.basic_qos(prefetch_count=max_messages)
+            self._prefetch = max_messages
+        if self._batch_consumer is None:
+            self._batch_consumer = self.channel.basic_consume(
+                queue=self.main_queue,
+                on_message_callback=lambda ch, method, properties, body: (
+                    self._batch_buffer.append((method, properties, body))
+                ),
+                auto_ack=False,
+            )
 
-    def acknowledge_message(self, delivery_tag: int):
-        self.channel.basic_ack(delivery_tag=delivery_tag)
+        deadline = time.monotonic() + wait_seconds
+        while len(self._batch_buffer) < max_messages:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self.connection.process_data_events(time_limit=remaining)
+
+        deliveries = []
+        while self._batch_buffer and len(deliveries) < max_messages:
+            method, properties, body = self._batch_buffer.popleft()
+            try:
+                message = self.serializer.loads(body)
+            except Exception as e:
+                log.info("Erro no processamento da mensagem: %s", e)
+                self.nack_message(method.delivery_tag)
+                continue
+            deliveries.append(
+                AmqpDelivery(
+                    message=message,
+                    count=(properties.headers or {}).get("count", 0),
+                    delivery_tag=method.delivery_tag,
+                    channel=self.channel,
+                    broker_adapter=self,
+                    headers=properties.headers,
+                )
+            )
+        return deliveries
+
+    def acknowledge_message(self, delivery_tag: int, multiple: bool = False):
+        # multiple confirma também todas as entregas anteriores ainda pendentes
+        self.channel.basic_ack(delivery_tag=delivery_tag, multiple=multiple)
+
+    def nack_message(self, delivery_tag: int, requeue: bool = False) -> None:
+        """basic_nack: sem requeue, a fila principal encaminha à DLQ."""
+        self.channel.basic_nack(delivery_tag=delivery_tag, requeue=requeue)
 
     def reject_message(
-        self, delivery_tag: int, count: int, message: str, routing_key: str
+        self,
+        delivery_tag: int,
+        count: int,
+        message: str,
+        routing_key: str,
+        headers: dict | None = None,
     ):
-        """Rejeita mensagem e envia para retry com count incrementado"""
-        # Incrementa count e publica na fila de retry
-        self.publish_message(
-            routing_key=self.retry_queue, message=message, count=count + 1
-        )
+        """
+        Rejeita mensagem e envia para retry com count incrementado.
+
+        O retorno à fila principal usa o nome dela, então routing_key não é
+        usado.
+        """
+        self.retry_message(message, count, headers)
         # Confirma a mensagem original para removê-la da fila principal
         self.channel.basic_ack(delivery_tag=delivery_tag)
 
+    @tracing.traced("broker.retry")
+    def retry_message(
+        self, message: str | dict, count: int, headers: dict | None = None
+    ) -> None:
+        """
+        Agenda uma nova tentativa de 'message' com count + 1, sem ack.
+
+        A mensagem vai pela exchange .dlx a uma das filas do degrau do novo
+        count, sorteada; o atraso é o x-message-ttl dessa fila.
+        """
+        if not isinstance(message, str):
+            message = self.serializer.dumps(message).decode("utf-8")
+        count += 1
+        tier_queue, delay = retry_delay(self.retry_tiers, count)
+        self.channel.basic_publish(
+            exchange=self.dlq_exchange_name,
+            routing_key=tier_queue,
+            body=message,
+            properties=pika.BasicProperties(
+                delivery_mode=2,
+                content_type="application/json",
+                headers={**(headers or {}), "count": count},
+            ),
+        )
+        log.debug("Retry %s agendado em %s (%s ms)", count, tier_queue, delay)
+
     def close(self):
         if self.connection and not self.connection.is_closed:
             self.connection.close()
@@ -197,12 +397,22 @@ class AmqpDelivery:
         delivery_tag: int,
         channel,
         broker_adapter: BrokerAdapter,
+        headers: dict | None = None,
     ):
         self.message = message
         self.count = count
         self.delivery_tag = delivery_tag
         self.channel = channel
         self.broker_adapter = broker_adapter
+        self.headers = headers or {}
+
+    def trace_headers(self) -> dict:
+        """Contexto de tracing recebido, repassado nas republicações."""
+        return {
+            key: self.headers[key]
+            for key in (tracing.TRACE_HEADER, tracing.PARENT_HEADER)
+            if key in self.headers
+        }
 
     def body(self) -> bytes:
         return self.message
@@ -210,10 +420,36 @@ class AmqpDelivery:
     def success(self):
         self.broker_adapter.acknowledge_message(self.delivery_tag)
 
+    def requeue(self):
+        """Devolve a mensagem à fila sem contar tentativa (desligamento)."""
+        self.broker_adapter.nack_message(self.delivery_tag, requeue=True)
+
+    def dead_letter(self):
+        """Desiste da mensagem: vai para a DLQ pela dead-letter da fila principal."""
+        self.broker_adapter.nack_message(self.delivery_tag, requeue=False)
+
     def failure(self):
         self.broker_adapter.reject_message(
             delivery_tag=self.delivery_tag,
             count=self.count,
             message=self.message,
             routing_key=env_g['app']['retry_router'],
+            headers=self.trace_headers(),
         )
+
+
+def from_config(env: dict) -> port.IBrokerAdapter:
+    """
+    Adaptador de broker escolhido em broker.backend.
+
+    rabbitmq (padrão) conecta no servidor AMQP; memory emula a mesma
+    topologia no processo, para benchmarks e testes sem broker.
+    """
+    backend = env.get("backend", "rabbitmq")
+    if backend == "rabbitmq":
+        return BrokerAdapter(env)
+    if backend == "memory":
+        from infrastructure.local_broker import InMemoryBrokerAdapter
+
+        return InMemoryBrokerAdapter(env)
+    raise ValueError(f"Backend de broker desconhecido: {backend}")
@@ -1,50 +1,220 @@
+import io
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterator
+from typing import IO, Iterable, Iterator
+import urllib3
 from minio.error import S3Error
 from domain import error, port
+from infrastructure import tracing
+
+from etc.config import loader, log_setup
 
 log = logging.getLogger(__name__)
+# uma mensagem por objeto lido/removido: limitada por segundo (logging.object_log_rate)
+object_log = log_setup.rate_limited_logger(f"{__name__}.objects")
+env_g = loader.get_config()
+
+MIN_PART_SIZE = 5 * 1024 * 1024  # mínimo do S3 para partes de multipart
+
+
+class _BufferReader(io.RawIOBase):
+    """Leitura sequencial sobre bytes/memoryview sem copiar o buffer inteiro."""
+
+    def __init__(self, data: bytes | bytearray | memoryview):
+        self._view = memoryview(data).cast("B")
+        self._offset = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = min(len(buffer), len(self._view) - self._offset)
+        buffer[:size] = self._view[self._offset : self._offset + size]
+        self._offset += size
+        return size
+
+
+class _IterReader(io.RawIOBase):
+    """Arquivo somente leitura sobre um iterável de blocos de bytes/str."""
+
+    def __init__(self, chunks: Iterable[bytes | str]):
+        self._chunks = iter(chunks)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            self._pending = memoryview(chunk).cast("B")
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def as_stream(data, length: int = -1) -> tuple[IO[bytes], int]:
+    """Normaliza os dados aceitos por put_object em (arquivo binário, tamanho)."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return _BufferReader(data), memoryview(data).nbytes
+    if hasattr(data, "read"):
+        return data, length
+    return _IterReader(data), length
+
 
-from etc.config import loader
-env_g = loader.load_env(['./etc/config/root.local.yml'])
+class _PoolStatsMixin:
+    """Conta as vezes em que o pool estava vazio ou cheio (HTTPConnectionPool)."""
+
+    exhausted = 0  # pedidos que encontraram o pool sem conexão livre
+    discarded = 0  # conexões fechadas na devolução por excederem maxsize
+
+    def _get_conn(self, timeout=None):
+        if self.pool is not None and self.pool.empty():
+            self.exhausted += 1
+        return super()._get_conn(timeout=timeout)
+
+    def _put_conn(self, conn):
+        if self.pool is not None and self.pool.full():
+            self.discarded += 1
+        super()._put_conn(conn)
+
+
+class _HTTPPool(_PoolStatsMixin, urllib3.HTTPConnectionPool):
+    pass
+
+
+class _HTTPSPool(_PoolStatsMixin, urllib3.HTTPSConnectionPool):
+    pass
+
+
+def build_pool_manager(env: dict) -> urllib3.PoolManager:
+    """
+    PoolManager do cliente MinIO, configurado em bucket.pool.
+
+    maxsize deve acompanhar a concorrência (download_workers e
+    upload_workers): com menos conexões que threads, cada pedido excedente
+    abre e descarta uma conexão nova em vez de reaproveitar o keep-alive.
+    """
+    pool = env.get("pool", {})
+    workers = max(env.get("download_workers", 1), env.get("upload_workers", 1))
+    manager = urllib3.PoolManager(
+        num_pools=pool.get("num_pools", 4),
+        maxsize=pool.get("maxsize") or max(10, workers),
+        block=pool.get("block", False),
+        timeout=urllib3.Timeout(
+            connect=pool.get("connect_timeout", 5),
+            read=pool.get("read_timeout", 60),
+        ),
+        retries=urllib3.Retry(
+            total=pool.get("retries", 5),
+            backoff_factor=pool.get("backoff_factor", 0.2),
+            status_forcelist=[500, 502, 503, 504],
+        ),
+    )
+    manager.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+    return manager
 
 
 class BucketAdapter(port.IBucketAdapter):
-    def __init__(self, client):
+    def __init__(
+        self,
+        client,
+        http_client: urllib3.PoolManager | None = None,
+        download_workers: int = 1,
+        part_size: int = 16 * 1024 * 1024,
+        upload_workers: int = 3,
+    ):
         super().__init__(client)
         self.client = client
+        self.http_client = http_client
+        self.download_workers = download_workers
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.upload_workers = upload_workers
 
     @classmethod
     def from_minio_client(cls, env: dict):
         from minio import Minio
 
+        http_client = build_pool_manager(env)
         minio = Minio(
             endpoint=env["endpoint"],
             access_key=env["username"],
             secret_key=env["password"],
             secure=False,
+            http_client=http_client,
         )
 
-        return cls(minio)
+        return cls(
+            minio,
+            http_client,
+            download_workers=env.get("download_workers", 1),
+            part_size=env.get("part_size", 16 * 1024 * 1024),
+            upload_workers=env.get("upload_workers", 3),
+        )
+
+    def pool_stats(self) -> dict[str, int]:
+        """
+        Uso do pool de conexões HTTP somado entre os hosts.
+
+        reused = requests - connections_created; 'exhausted' e 'discarded'
+        crescendo indicam maxsize abaixo da concorrência.
+        """
+        stats = {
+            "maxsize": 0,
+            "in_use": 0,
+            "connections_created": 0,
+            "requests": 0,
+            "reused": 0,
+            "exhausted": 0,
+            "discarded": 0,
+        }
+        if self.http_client is None:
+            return stats
+        for key in list(self.http_client.pools.keys()):
+            pool = self.http_client.pools.get(key)
+            if pool is None or pool.pool is None:
+                continue
+            stats["maxsize"] += pool.pool.maxsize
+            stats["in_use"] += pool.pool.maxsize - pool.pool.qsize()
+            stats["connections_created"] += pool.num_connections
+            stats["requests"] += pool.num_requests
+            stats["exhausted"] += getattr(pool, "exhausted", 0)
+            stats["discarded"] += getattr(pool, "discarded", 0)
+        stats["reused"] = max(0, stats["requests"] - stats["connections_created"])
+        return stats
 
+    @tracing.traced("bucket.delete")
     def delete_object(self, bucket_name: str, object_name: str) -> bool:
         try:
             # Verifica se o bucket existe
             if not self.client.bucket_exists(bucket_name):
-                log.warning(f"Bucket '{bucket_name}' não encontrado.")
+                log.warning("Bucket '%s' não encontrado.", bucket_name)
                 raise error.BucketOperationError(f"Bucket '{bucket_name}' não existe")
 
             # Remove o objeto
             self.client.remove_object(bucket_name, object_name)
-            log.info(
-                f"Objeto '{object_name}' removido com sucesso do bucket '{bucket_name}'."
+            object_log.info(
+                "Objeto '%s' removido com sucesso do bucket '%s'.",
+                object_name,
+                bucket_name,
             )
             return True
 
         except S3Error as exc:
             log.error(
-                f"Erro ao remover objeto '{object_name}' do bucket '{bucket_name}': {exc}"
+                "Erro ao remover objeto '%s' do bucket '%s': %s",
+                object_name,
+                bucket_name,
+                exc,
             )
             if "NoSuchKey" in str(exc) or "Not Found" in str(exc):
                 raise error.BucketOperationError(
@@ -59,72 +229,181 @@ class BucketAdapter(port.IBucketAdapter):
         try:
             if not self.client.bucket_exists(bucket_name):
                 self.client.make_bucket(bucket_name)
-                log.info(f"Bucket '{bucket_name}' created.")
+                log.info("Bucket '%s' created.", bucket_name)
                 return True
             else:
-                log.info(f"Bucket '{bucket_name}' already exists.")
+                log.info("Bucket '%s' already exists.", bucket_name)
                 return True
 
         except S3Error as exc:
-            log.info(f"failed at creating bucket: {exc}")
+            log.info("failed at creating bucket: %s", exc)
             raise error.BucketConnectionError
 
+    @tracing.traced("bucket.put")
     def put_object(
-        self, bucket_name: str, object_name: str, data: bytes | str, content_type: str
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: bytes | bytearray | memoryview | str | IO[bytes] | Iterable[bytes],
+        content_type: str,
+        length: int = -1,
     ):
-        import io
+        """
+        Grava um objeto a partir de dados em memória ou de um fluxo.
 
-        if isinstance(data, str):
-            data = data.encode("utf-8")
-
-        data_stream = io.BytesIO(data)
-
-        result = self.client.put_object(
+        Aceita bytes/memoryview (lidos sem cópia extra), arquivos abertos em
+        modo binário e iteráveis de blocos. Com tamanho desconhecido
+        (length=-1) ou acima de part_size, o upload é multipart, com até
+        upload_workers partes em paralelo e no máximo part_size bytes por
+        parte em memória.
+        """
+        stream, length = as_stream(data, length)
+        self.client.put_object(
             bucket_name=bucket_name,
             object_name=object_name,
-            data=data_stream,
-            length=len(data_stream.getvalue()),
+            data=stream,
+            length=length,
             content_type=content_type,
+            part_size=self.part_size,
+            num_parallel_uploads=self.upload_workers,
         )
 
+    @tracing.traced("bucket.move")
+    def move_object(
+        self,
+        src_bucket: str,
+        src_name: str,
+        dst_bucket: str,
+        dst_name: str,
+    ) -> bool:
+        """
+        Move um objeto entre buckets com cópia no servidor e remoção da origem.
+
+        O conteúdo não trafega pelo processo, ao contrário de put_object
+        seguido de delete_object.
+        """
+        from minio.commonconfig import CopySource
+
+        try:
+            self.client.copy_object(
+                dst_bucket, dst_name, CopySource(src_bucket, src_name)
+            )
+            self.client.remove_object(src_bucket, src_name)
+            object_log.info(
+                "Objeto '%s' movido de '%s' para '%s'.",
+                src_name,
+                src_bucket,
+                dst_bucket,
+            )
+            return True
+        except S3Error as exc:
+            log.error("Erro ao mover objeto '%s': %s", src_name, exc)
+            if "NoSuchKey" in str(exc) or "NoSuchBucket" in str(exc):
+                raise error.BucketOperationError(
+                    f"Objeto '{src_name}' não encontrado no bucket '{src_bucket}'"
+                )
+            raise error.BucketConnectionError(
+                f"Erro de conexão ao mover objeto: {exc}"
+            )
+
     def iter_bucket_by_prefix_key(
-        self, bucket_name: str, prefix: str
+        self, bucket_name: str, prefix: str, failed: list[str] | None = None
     ) -> Iterator[tuple[str, bytes]]:
+        """
+        (nome, conteúdo) de cada objeto sob o prefixo, na ordem da listagem.
+
+        Com 'failed', um objeto que não pôde ser lido entra na lista (pelo
+        nome, como no par entregue) e a listagem continua; sem ela, a
+        primeira falha interrompe a iteração.
+        """
         try:
             objs = self.client.list_objects(bucket_name, prefix, recursive=True)
+            names = (obj.object_name for obj in objs if not obj.is_dir)
 
-            for obj in objs:
-                if obj.is_dir:
-                    continue
+            if self.download_workers > 1:
+                blobs = self._read_concurrently(bucket_name, names, failed)
+            else:
+                blobs = (
+                    (name, self._read_or_collect(bucket_name, name, failed))
+                    for name in names
+                )
 
-                blob_content = self.read_object(bucket_name, obj.object_name)
+            for object_name, blob_content in blobs:
                 if blob_content:
-                    filename = Path(obj.object_name).name
+                    filename = Path(object_name).name
                     yield (filename, blob_content)
         except S3Error as exc:
-            log.error(f"Erro S3 ao listar objetos com prefixo '{prefix}': {exc}")
+            log.error("Erro S3 ao listar objetos com prefixo '%s': %s", prefix, exc)
             raise error.BucketConnectionError
 
+    def _read_or_collect(
+        self, bucket_name: str, object_name: str, failed: list[str] | None
+    ) -> bytes | None:
+        try:
+            return self.read_object(bucket_name, object_name)
+        except Exception as exc:
+            if failed is None:
+                raise
+            log.error("Falha ao ler '%s', segue para o próximo: %s", object_name, exc)
+            failed.append(Path(object_name).name)
+            return None
+
+    def _read_concurrently(
+        self, bucket_name: str, names: Iterator[str], failed: list[str] | None = None
+    ) -> Iterator[tuple[str, bytes]]:
+        # downloads adiantados por download_workers threads, entregues na
+        # ordem da listagem; a janela limita os objetos mantidos em memória
+        window = self.download_workers * 2
+        pending: deque = deque()
+        with ThreadPoolExecutor(
+            max_workers=self.download_workers, thread_name_prefix="bucket-read"
+        ) as executor:
+            try:
+                for name in names:
+                    pending.append(
+                        (
+                            name,
+                            executor.submit(
+                                self._read_or_collect, bucket_name, name, failed
+                            ),
+                        )
+                    )
+                    if len(pending) >= window:
+                        name, future = pending.popleft()
+                        yield name, future.result()
+                while pending:
+                    name, future = pending.popleft()
+                    yield name, future.result()
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+    @tracing.traced("bucket.get")
     def read_object(self, bucket_name: str, object_name: str) -> bytes:
         response = None
         try:
             response = self.client.get_object(bucket_name, object_name)
             data_bytes = response.read()
-            log.info(
-                f"Objeto '{object_name}' lido com sucesso (Tamanho: {len(data_bytes)} bytes)."
+            object_log.info(
+                "Objeto '%s' lido com sucesso (Tamanho: %d bytes).",
+                object_name,
+                len(data_bytes),
             )
             return data_bytes
         except S3Error as exc:
-            response.close()
-            response.release_conn()
-            log.error(f"algo de errado não está certo: {exc}")
+            log.error("algo de errado não está certo: %s", exc)
             raise error.BucketConnectionError
+        finally:
+            # devolve a conexão ao pool em qualquer caminho (sucesso ou erro)
+            if response is not None:
+                response.close()
+                response.release_conn()
 
     def remove_bucket_if_exists(self, bucket_name: str) -> bool:
         try:
             # Verifica se o bucket existe
             if not self.client.bucket_exists(bucket_name):
-                log.info(f"Bucket '{bucket_name}' não existe. Nada a remover.")
+                log.info("Bucket '%s' não existe. Nada a remover.", bucket_name)
                 return False
 
             # Primeiro remove todos os objetos do bucket
@@ -132,20 +411,26 @@ class BucketAdapter(port.IBucketAdapter):
                 objects = self.client.list_objects(bucket_name, recursive=True)
                 for obj in objects:
                     self.client.remove_object(bucket_name, obj.object_name)
-                    log.debug(
-                        f"Objeto '{obj.object_name}' removido do bucket '{bucket_name}'"
+                    object_log.debug(
+                        "Objeto '%s' removido do bucket '%s'",
+                        obj.object_name,
+                        bucket_name,
                     )
             except S3Error as exc:
-                log.warning(f"Erro ao limpar objetos do bucket '{bucket_name}': {exc}")
+                log.warning(
+                    "Erro ao limpar objetos do bucket '%s': %s",
+                    bucket_name,
+                    exc,
+                )
                 # Continua tentando remover o bucket mesmo com erro nos objetos
 
             # Remove o bucket vazio
             self.client.remove_bucket(bucket_name)
-            log.info(f"Bucket '{bucket_name}' removido com sucesso.")
+            log.info("Bucket '%s' removido com sucesso.", bucket_name)
             return True
 
         except S3Error as exc:
-            log.error(f"Erro ao remover bucket '{bucket_name}': {exc}")
+            log.error("Erro ao remover bucket '%s': %s", bucket_name, exc)
             if "BucketNotEmpty" in str(exc):
                 raise error.BucketOperationError(
                     f"Bucket '{bucket_name}' não está vazio"
@@ -154,3 +439,24 @@ class BucketAdapter(port.IBucketAdapter):
                 raise error.BucketConnectionError(
                     f"Erro de conexão ao remover bucket: {exc}"
                 )
+
+
+def from_config(env: dict) -> port.IBucketAdapter:
+    """
+    Adaptador de bucket escolhido em bucket.backend.
+
+    minio (padrão) fala com o servidor S3; filesystem guarda os objetos em
+    arquivos sob bucket.root; memory mantém tudo no processo. Os dois
+    últimos servem a benchmarks e testes sem rede.
+    """
+    backend = env.get("backend", "minio")
+    if backend == "minio":
+        return BucketAdapter.from_minio_client(env)
+
+    from infrastructure import local_bucket
+
+    if backend == "filesystem":
+        return local_bucket.FileSystemBucketAdapter.from_minio_client(env)
+    if backend == "memory":
+        return local_bucket.InMemoryBucketAdapter.from_minio_client(env)
+    raise ValueError(f"Backend de bucket desconhecido: {backend}")
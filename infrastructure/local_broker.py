@@ -0,0 +1,481 @@
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable
+
+from domain import error, port
+from infrastructure import tracing
+from infrastructure.broker import (
+    MAX_DELIVERY_COUNT,
+    AmqpDelivery,
+    retry_delay,
+    retry_queues,
+    retry_tiers,
+)
+from infrastructure.serializer import get_serializer
+
+log = logging.getLogger(__name__)
+
+
+class ManualClock:
+    """
+    Relógio controlado pelo teste/benchmark.
+
+    'sleep' só avança o tempo, então esperas por TTL terminam na hora e o
+    resultado não depende da máquina.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += max(0.0, seconds)
+
+    def advance(self, seconds: float) -> None:
+        self.sleep(seconds)
+
+
+@dataclass
+class _Message:
+    body: bytes
+    routing_key: str
+    headers: dict = field(default_factory=dict)
+    expires_at: float | None = None
+
+
+@dataclass
+class _Queue:
+    name: str
+    ttl: float | None = None  # x-message-ttl, em segundos
+    dead_letter_exchange: str | None = None
+    dead_letter_routing_key: str | None = None
+    messages: deque = field(default_factory=deque)
+
+
+def topic_matches(pattern: str, routing_key: str) -> bool:
+    """Casamento de routing key de exchange topic ('*' = uma palavra, '#' = zero ou mais)."""
+
+    def match(pattern_words: list[str], key_words: list[str]) -> bool:
+        if not pattern_words:
+            return not key_words
+        head, rest = pattern_words[0], pattern_words[1:]
+        if head == "#":
+            return any(match(rest, key_words[i:]) for i in range(len(key_words) + 1))
+        if not key_words:
+            return False
+        return (head == "*" or head == key_words[0]) and match(rest, key_words[1:])
+
+    return match(pattern.split("."), routing_key.split("."))
+
+
+def _expired(message: _Message, now: float) -> bool:
+    return message.expires_at is not None and message.expires_at <= now
+
+
+class InMemoryBrokerAdapter(port.IBrokerAdapter):
+    """
+    Broker no processo com a topologia do BrokerAdapter.
+
+    Reproduz as exchanges topic principal e .dlx, a fila principal (com
+    dead-letter para a DLQ), as filas de retry com TTL fixo que devolvem à
+    exchange principal, o header 'count', prefetch (broker.prefetch, 0 = sem
+    limite) e acks por delivery_tag. Mensagens sem fila de destino são
+    descartadas como no RabbitMQ e contadas em stats()['unroutable'].
+
+    'clock' e 'sleep' permitem tempo determinístico (ManualClock); sem
+    'sleep', a espera usa uma Condition acordada por publish/ack.
+    """
+
+    def __init__(
+        self,
+        env: dict,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] | None = None,
+    ):
+        self.serializer = get_serializer()
+        self.clock = clock
+        self.sleep = sleep
+        self.prefetch = env.get("prefetch", 0)
+        self.rng = random.Random()
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._tags = itertools.count(1)
+        self._unacked: dict[int, tuple[_Queue, _Message]] = {}
+        self._closed = False
+        self._stop_requested = False
+        self._stats = dict.fromkeys(
+            (
+                "published",
+                "delivered",
+                "acked",
+                "dead_lettered",
+                "expired",
+                "unroutable",
+                "retried",
+                "ack_calls",
+            ),
+            0,
+        )
+        self.setup_infrastructure(env)
+
+    def setup_infrastructure(self, env: dict):
+        self.exchange_name = env["exchange"]
+        self.dlq_exchange_name = f"{self.exchange_name}.dlx"
+        self.main_queue = env["queue_name"]
+        self.retry_queue = env["queue_retry"]
+        self.dlq_queue = env["queue_dlq"]
+        self.retry_tiers = retry_tiers(env)
+
+        self._queues = {
+            self.main_queue: _Queue(
+                self.main_queue,
+                dead_letter_exchange=self.dlq_exchange_name,
+                dead_letter_routing_key=self.dlq_queue,
+            ),
+            **{
+                tier_queue: _Queue(
+                    tier_queue,
+                    ttl=delay / 1000,
+                    dead_letter_exchange=self.exchange_name,
+                    dead_letter_routing_key=self.main_queue,
+                )
+                for tier_queue, delay in retry_queues(self.retry_tiers)
+            },
+            self.dlq_queue: _Queue(self.dlq_queue),
+        }
+        # exchange -> [(binding key, fila)]
+        self._bindings: dict[str, list[tuple[str, str]]] = {
+            self.exchange_name: [
+                ("app.*", self.main_queue),
+                (self.main_queue, self.main_queue),
+            ],
+            self.dlq_exchange_name: [
+                *(
+                    (tier_queue, tier_queue)
+                    for tier_queue, _ in retry_queues(self.retry_tiers)
+                ),
+                (self.dlq_queue, self.dlq_queue),
+            ],
+        }
+
+    def _route(self, exchange: str, message: _Message) -> None:
+        # várias ligações para a mesma fila entregam uma cópia só
+        targets = dict.fromkeys(
+            queue_name
+            for binding, queue_name in self._bindings.get(exchange, [])
+            if topic_matches(binding, message.routing_key)
+        )
+        with self._lock:
+            if not targets:
+                self._stats["unroutable"] += 1
+                log.debug(
+                    "Mensagem sem fila de destino em '%s' (%s)",
+                    exchange,
+                    message.routing_key,
+                )
+                return
+            now = self.clock()
+            for queue_name in targets:
+                queue = self._queues[queue_name]
+                expires_at = now + queue.ttl if queue.ttl is not None else None
+                queue.messages.append(
+                    _Message(
+                        message.body, message.routing_key, dict(message.headers), expires_at
+                    )
+                )
+            self._changed.notify_all()
+
+    def _dead_letter(self, queue: _Queue, message: _Message) -> None:
+        if queue.dead_letter_exchange is None:
+            return
+        self._stats["dead_lettered"] += 1
+        self._route(
+            queue.dead_letter_exchange,
+            _Message(
+                message.body,
+                queue.dead_letter_routing_key or message.routing_key,
+                message.headers,
+            ),
+        )
+
+    def _expire(self) -> None:
+        # como no RabbitMQ, só a cabeça da fila expira (TTL por fila mantém a ordem)
+        now = self.clock()
+        for queue in list(self._queues.values()):
+            while queue.messages and _expired(queue.messages[0], now):
+                self._stats["expired"] += 1
+                self._dead_letter(queue, queue.messages.popleft())
+
+    def _next_expiry(self) -> float | None:
+        deadlines = [
+            queue.messages[0].expires_at
+            for queue in self._queues.values()
+            if queue.messages and queue.messages[0].expires_at is not None
+        ]
+        return min(deadlines, default=None)
+
+    def _take(self) -> tuple[int, _Message] | None:
+        queue = self._queues[self.main_queue]
+        if not queue.messages:
+            return None
+        message = queue.messages.popleft()
+        tag = next(self._tags)
+        self._unacked[tag] = (queue, message)
+        self._stats["delivered"] += 1
+        return tag, message
+
+    @tracing.traced("broker.publish")
+    def publish_message(
+        self,
+        routing_key: str,
+        message: str,
+        count: int = 0,
+        headers: dict | None = None,
+    ) -> None:
+        if not isinstance(message, str):
+            raise ValueError("incorrect type ", type(message))
+        with self._lock:
+            self._stats["published"] += 1
+            self._route(
+                self.exchange_name,
+                _Message(
+                    message.encode("utf-8"),
+                    routing_key,
+                    {**(headers or {}), "count": count},
+                ),
+            )
+
+    def consume_sync(self, qtd: int) -> list:
+        messages = []
+        with self._lock:
+            self._expire()
+            for _ in range(qtd):
+                taken = self._take()
+                if taken is None:
+                    break
+                tag, message = taken
+                messages.append(
+                    {
+                        "message": self.serializer.loads(message.body),
+                        "count": message.headers.get("count", 0),
+                        "delivery_tag": tag,
+                    }
+                )
+        return messages
+
+    def consume_blocking(
+        self,
+        callback_default: Callable,
+        callback_dlq: Callable,
+        duration: int | None = None,
+    ):
+        """
+        Entrega as mensagens da fila principal até 'duration' segundos.
+
+        Sem duration, retorna quando não há mais nada a entregar nem a
+        expirar (filas vazias e nenhuma mensagem sem ack), o que permite
+        medir o Consumer até esvaziar o backlog.
+        """
+        deadline = self.clock() + duration if duration is not None else None
+        while True:
+            with self._lock:
+                if self._closed or self._stop_requested:
+                    return
+                self._expire()
+                taken = None
+                if not self.prefetch or len(self._unacked) < self.prefetch:
+                    taken = self._take()
+                if taken is None:
+                    now = self.clock()
+                    if deadline is not None and now >= deadline:
+                        return
+                    wake = self._next_expiry()
+                    if deadline is not None:
+                        wake = deadline if wake is None else min(wake, deadline)
+                    if wake is None and not self._unacked:
+                        return
+                    if self.sleep is None:
+                        # acordada por publish/ack de outra thread
+                        self._changed.wait(None if wake is None else wake - now)
+                        continue
+            if taken is None:
+                if wake is None:
+                    return  # só resta mensagem sem ack e o relógio é manual
+                self.sleep(wake - now)
+                continue
+
+            tag, message = taken
+            try:
+                delivery = AmqpDelivery(
+                    message=self.serializer.loads(message.body),
+                    count=message.headers.get("count", 0),
+                    delivery_tag=tag,
+                    channel=None,
+                    broker_adapter=self,
+                    headers=message.headers,
+                )
+                if delivery.count >= MAX_DELIVERY_COUNT:
+                    callback_dlq(delivery)
+                else:
+                    callback_default(delivery)
+            except Exception as e:
+                log.info("Erro no processamento da mensagem: %s", e)
+                self.nack_message(tag)
+
+    def consume_batch(
+        self, max_messages: int, wait_seconds: float = 0.5
+    ) -> list[AmqpDelivery]:
+        """
+        Até max_messages entregas (limitadas também por broker.prefetch),
+        esperando no máximo wait_seconds para completar o lote.
+        """
+        deadline = self.clock() + wait_seconds
+        taken: list[tuple[int, _Message]] = []
+        while True:
+            with self._lock:
+                self._expire()
+                while len(taken) < max_messages and (
+                    not self.prefetch or len(self._unacked) < self.prefetch
+                ):
+                    item = self._take()
+                    if item is None:
+                        break
+                    taken.append(item)
+                now = self.clock()
+                if (
+                    len(taken) >= max_messages
+                    or self._closed
+                    or self._stop_requested
+                    or now >= deadline
+                ):
+                    break
+                expiry = self._next_expiry()
+                wake = deadline if expiry is None else min(deadline, expiry)
+                if self.sleep is None:
+                    self._changed.wait(wake - now)
+                    continue
+            self.sleep(wake - now)
+
+        deliveries = []
+        for tag, message in taken:
+            try:
+                body = self.serializer.loads(message.body)
+            except Exception as e:
+                log.info("Erro no processamento da mensagem: %s", e)
+                self.nack_message(tag)
+                continue
+            deliveries.append(
+                AmqpDelivery(
+                    message=body,
+                    count=message.headers.get("count", 0),
+                    delivery_tag=tag,
+                    channel=None,
+                    broker_adapter=self,
+                    headers=message.headers,
+                )
+            )
+        return deliveries
+
+    def stop_consuming(self) -> None:
+        """consume_blocking retorna após o callback em curso."""
+        self._stop_requested = True
+        with self._lock:
+            self._changed.notify_all()
+
+    def acknowledge_message(self, delivery_tag: int, multiple: bool = False):
+        with self._lock:
+            tags = [delivery_tag]
+            if multiple:
+                # como no AMQP: todas as pendentes até delivery_tag, inclusive
+                tags = sorted(tag for tag in self._unacked if tag <= delivery_tag)
+                if delivery_tag not in self._unacked:
+                    self._settle(delivery_tag)
+            for tag in tags:
+                self._settle(tag)
+            self._stats["acked"] += len(tags)
+            self._stats["ack_calls"] += 1
+            self._changed.notify_all()
+
+    def nack_message(self, delivery_tag: int, requeue: bool = False) -> None:
+        """basic_nack: devolve à fila ou envia à dead-letter exchange da fila."""
+        with self._lock:
+            queue, message = self._settle(delivery_tag)
+            if requeue:
+                queue.messages.appendleft(message)
+            else:
+                self._dead_letter(queue, message)
+            self._changed.notify_all()
+
+    def _settle(self, delivery_tag: int) -> tuple[_Queue, _Message]:
+        try:
+            return self._unacked.pop(delivery_tag)
+        except KeyError:
+            # no RabbitMQ, PRECONDITION_FAILED fecha o canal
+            raise error.MessageProcessingError(
+                f"delivery_tag desconhecido: {delivery_tag}"
+            )
+
+    def reject_message(
+        self,
+        delivery_tag: int,
+        count: int,
+        message: str,
+        routing_key: str,
+        headers: dict | None = None,
+    ):
+        """Rejeita mensagem e envia ao degrau de retry do count incrementado"""
+        with self._lock:
+            self.retry_message(message, count, headers)
+            self.acknowledge_message(delivery_tag)
+
+    @tracing.traced("broker.retry")
+    def retry_message(
+        self, message: str | dict, count: int, headers: dict | None = None
+    ) -> None:
+        """Publica 'message' no degrau de retry de count + 1, sem ack."""
+        if not isinstance(message, str):
+            message = self.serializer.dumps(message).decode("utf-8")
+        count += 1
+        tier_queue, _ = retry_delay(self.retry_tiers, count, self.rng)
+        with self._lock:
+            self._stats["retried"] += 1
+            self._route(
+                self.dlq_exchange_name,
+                _Message(
+                    message.encode("utf-8"),
+                    tier_queue,
+                    {**(headers or {}), "count": count},
+                ),
+            )
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            # sem ack volta para a frente da fila, na ordem de entrega
+            for tag in sorted(self._unacked, reverse=True):
+                queue, message = self._unacked[tag]
+                queue.messages.appendleft(message)
+            self._unacked.clear()
+            self._changed.notify_all()
+
+    def queue_depth(self, queue_name: str) -> int:
+        with self._lock:
+            return len(self._queues[queue_name].messages)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                **self._stats,
+                "unacked": len(self._unacked),
+                **{
+                    f"depth.{name}": len(queue.messages)
+                    for name, queue in self._queues.items()
+                },
+            }
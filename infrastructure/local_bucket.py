@@ -0,0 +1,328 @@
+import io
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import IO, Iterable, Iterator
+
+from domain import error, port
+from etc.config import log_setup
+from infrastructure import tracing
+from infrastructure.bucket import as_stream
+
+log = logging.getLogger(__name__)
+object_log = log_setup.rate_limited_logger(f"{__name__}.objects")
+
+_COPY_CHUNK = 1024 * 1024
+_EMPTY_STATS = {
+    "maxsize": 0,
+    "in_use": 0,
+    "connections_created": 0,
+    "requests": 0,
+    "reused": 0,
+    "exhausted": 0,
+    "discarded": 0,
+}
+
+
+class FileSystemBucketAdapter(port.IBucketAdapter):
+    """
+    Buckets como diretórios sob 'root' e objetos como arquivos.
+
+    Leituras usam mmap (o memoryview devolvido aponta para o cache de
+    páginas, sem cópia); gravações vão para um temporário no mesmo diretório
+    e entram no lugar com os.replace, e move_object é um rename: quem lista
+    ou lê nunca vê um objeto pela metade.
+    """
+
+    def __init__(self, root: str | os.PathLike):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def from_minio_client(cls, env: dict):
+        return cls(env.get("root", "data/buckets"))
+
+    def pool_stats(self) -> dict[str, int]:
+        return dict(_EMPTY_STATS)
+
+    def _bucket_path(self, bucket_name: str) -> Path:
+        return self.root / bucket_name
+
+    def _object_path(self, bucket_name: str, object_name: str) -> Path:
+        bucket_path = self._bucket_path(bucket_name)
+        path = bucket_path / object_name
+        # um nome absoluto substituiria a raiz no join; '..' sairia dela
+        root, resolved = bucket_path.resolve(), path.resolve()
+        if resolved == root or not resolved.is_relative_to(root):
+            raise error.BucketOperationError(f"Nome de objeto inválido: '{object_name}'")
+        return path
+
+    def _require_bucket(self, bucket_name: str) -> Path:
+        bucket_path = self._bucket_path(bucket_name)
+        if not bucket_path.is_dir():
+            raise error.BucketOperationError(f"Bucket '{bucket_name}' não existe")
+        return bucket_path
+
+    @tracing.traced("bucket.delete")
+    def delete_object(self, bucket_name: str, object_name: str) -> bool:
+        self._require_bucket(bucket_name)
+        # como no S3, remover um objeto inexistente não é erro
+        self._object_path(bucket_name, object_name).unlink(missing_ok=True)
+        object_log.info(
+            "Objeto '%s' removido com sucesso do bucket '%s'.",
+            object_name,
+            bucket_name,
+        )
+        return True
+
+    def create_bucket(self, bucket_name: str) -> bool:
+        self._bucket_path(bucket_name).mkdir(parents=True, exist_ok=True)
+        log.info("Bucket '%s' created.", bucket_name)
+        return True
+
+    @tracing.traced("bucket.put")
+    def put_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: bytes | bytearray | memoryview | str | IO[bytes] | Iterable[bytes],
+        content_type: str,
+        length: int = -1,
+    ):
+        self._require_bucket(bucket_name)
+        path = self._object_path(bucket_name, object_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stream, length = as_stream(data, length)
+
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                _copy_stream(stream, length, tmp)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+    @tracing.traced("bucket.move")
+    def move_object(
+        self,
+        src_bucket: str,
+        src_name: str,
+        dst_bucket: str,
+        dst_name: str,
+    ) -> bool:
+        self._require_bucket(dst_bucket)
+        src = self._object_path(src_bucket, src_name)
+        dst = self._object_path(dst_bucket, dst_name)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            os.replace(src, dst)
+        except FileNotFoundError:
+            raise error.BucketOperationError(
+                f"Objeto '{src_name}' não encontrado no bucket '{src_bucket}'"
+            )
+        object_log.info(
+            "Objeto '%s' movido de '%s' para '%s'.", src_name, src_bucket, dst_bucket
+        )
+        return True
+
+    def iter_bucket_by_prefix_key(
+        self, bucket_name: str, prefix: str, failed: list[str] | None = None
+    ) -> Iterator[tuple[str, bytes]]:
+        bucket_path = self._bucket_path(bucket_name)
+        if not bucket_path.is_dir():
+            log.error("Bucket '%s' não encontrado ao listar '%s'", bucket_name, prefix)
+            raise error.BucketConnectionError
+
+        for object_name in self._list_names(bucket_path, prefix):
+            try:
+                blob_content = self.read_object(bucket_name, object_name)
+            except error.BucketConnectionError:
+                continue  # removido entre a listagem e a leitura
+            except OSError as exc:
+                if failed is None:
+                    raise
+                log.error("Falha ao ler '%s', segue para o próximo: %s", object_name, exc)
+                failed.append(Path(object_name).name)
+                continue
+            if blob_content:
+                yield (Path(object_name).name, blob_content)
+
+    @staticmethod
+    def _list_names(bucket_path: Path, prefix: str) -> list[str]:
+        # mesma ordem da listagem do S3: lexicográfica pela chave completa
+        names = []
+        for dirpath, _, filenames in os.walk(bucket_path):
+            relative = Path(dirpath).relative_to(bucket_path).as_posix()
+            for filename in filenames:
+                if filename.startswith(".tmp-"):
+                    continue
+                name = filename if relative == "." else f"{relative}/{filename}"
+                if name.startswith(prefix):
+                    names.append(name)
+        return sorted(names)
+
+    @tracing.traced("bucket.get")
+    def read_object(self, bucket_name: str, object_name: str) -> bytes:
+        try:
+            with open(self._object_path(bucket_name, object_name), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return b""  # mmap não mapeia arquivos vazios
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, IsADirectoryError) as exc:
+            log.error("algo de errado não está certo: %s", exc)
+            raise error.BucketConnectionError
+        object_log.info(
+            "Objeto '%s' lido com sucesso (Tamanho: %d bytes).", object_name, size
+        )
+        # o mapeamento é desfeito quando o último memoryview for coletado
+        return memoryview(mapped)
+
+    def remove_bucket_if_exists(self, bucket_name: str) -> bool:
+        bucket_path = self._bucket_path(bucket_name)
+        if not bucket_path.is_dir():
+            log.info("Bucket '%s' não existe. Nada a remover.", bucket_name)
+            return False
+        shutil.rmtree(bucket_path)
+        log.info("Bucket '%s' removido com sucesso.", bucket_name)
+        return True
+
+
+class InMemoryBucketAdapter(port.IBucketAdapter):
+    """
+    Buckets em dicionários do processo, com a mesma semântica do BucketAdapter.
+
+    Seguro entre threads; os objetos são guardados como bytes imutáveis, então
+    leituras não copiam.
+    """
+
+    def __init__(self):
+        self._buckets: dict[str, dict[str, bytes]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_minio_client(cls, env: dict):
+        return cls()
+
+    def pool_stats(self) -> dict[str, int]:
+        return dict(_EMPTY_STATS)
+
+    def _require_bucket(self, bucket_name: str) -> dict[str, bytes]:
+        objects = self._buckets.get(bucket_name)
+        if objects is None:
+            raise error.BucketOperationError(f"Bucket '{bucket_name}' não existe")
+        return objects
+
+    @tracing.traced("bucket.delete")
+    def delete_object(self, bucket_name: str, object_name: str) -> bool:
+        with self._lock:
+            self._require_bucket(bucket_name).pop(object_name, None)
+        object_log.info(
+            "Objeto '%s' removido com sucesso do bucket '%s'.",
+            object_name,
+            bucket_name,
+        )
+        return True
+
+    def create_bucket(self, bucket_name: str) -> bool:
+        with self._lock:
+            self._buckets.setdefault(bucket_name, {})
+        log.info("Bucket '%s' created.", bucket_name)
+        return True
+
+    @tracing.traced("bucket.put")
+    def put_object(
+        self,
+        bucket_name: str,
+        object_name: str,
+        data: bytes | bytearray | memoryview | str | IO[bytes] | Iterable[bytes],
+        content_type: str,
+        length: int = -1,
+    ):
+        if isinstance(data, str):
+            blob = data.encode("utf-8")
+        elif isinstance(data, (bytes, bytearray, memoryview)):
+            blob = bytes(data)
+        else:
+            buffer = io.BytesIO()
+            _copy_stream(*as_stream(data, length), target=buffer)
+            blob = buffer.getvalue()
+        with self._lock:
+            self._require_bucket(bucket_name)[object_name] = blob
+
+    @tracing.traced("bucket.move")
+    def move_object(
+        self,
+        src_bucket: str,
+        src_name: str,
+        dst_bucket: str,
+        dst_name: str,
+    ) -> bool:
+        with self._lock:
+            destination = self._require_bucket(dst_bucket)
+            source = self._buckets.get(src_bucket, {})
+            if src_name not in source:
+                raise error.BucketOperationError(
+                    f"Objeto '{src_name}' não encontrado no bucket '{src_bucket}'"
+                )
+            destination[dst_name] = source.pop(src_name)
+        object_log.info(
+            "Objeto '%s' movido de '%s' para '%s'.", src_name, src_bucket, dst_bucket
+        )
+        return True
+
+    def iter_bucket_by_prefix_key(
+        self, bucket_name: str, prefix: str, failed: list[str] | None = None
+    ) -> Iterator[tuple[str, bytes]]:
+        # leituras em memória não falham; 'failed' existe pela porta
+        with self._lock:
+            objects = self._buckets.get(bucket_name)
+            if objects is None:
+                log.error(
+                    "Bucket '%s' não encontrado ao listar '%s'", bucket_name, prefix
+                )
+                raise error.BucketConnectionError
+            names = sorted(name for name in objects if name.startswith(prefix))
+
+        for object_name in names:
+            blob_content = self._buckets.get(bucket_name, {}).get(object_name)
+            if blob_content:
+                yield (Path(object_name).name, blob_content)
+
+    @tracing.traced("bucket.get")
+    def read_object(self, bucket_name: str, object_name: str) -> bytes:
+        blob = self._buckets.get(bucket_name, {}).get(object_name)
+        if blob is None:
+            log.error(
+                "Objeto '%s' não encontrado no bucket '%s'", object_name, bucket_name
+            )
+            raise error.BucketConnectionError
+        object_log.info(
+            "Objeto '%s' lido com sucesso (Tamanho: %d bytes).", object_name, len(blob)
+        )
+        return blob
+
+    def remove_bucket_if_exists(self, bucket_name: str) -> bool:
+        with self._lock:
+            removed = self._buckets.pop(bucket_name, None)
+        if removed is None:
+            log.info("Bucket '%s' não existe. Nada a remover.", bucket_name)
+            return False
+        log.info("Bucket '%s' removido com sucesso.", bucket_name)
+        return True
+
+
+def _copy_stream(source: IO[bytes], length: int, target: IO[bytes]) -> None:
+    # length=-1: até o fim do fluxo, como no put_object do MinIO
+    remaining = length if length >= 0 else float("inf")
+    while remaining > 0:
+        chunk = source.read(int(min(_COPY_CHUNK, remaining)))
+        if not chunk:
+            break
+        target.write(chunk)
+        remaining -= len(chunk)
@@ -0,0 +1,169 @@
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any
+
+from etc.config import loader
+
+log = logging.getLogger(__name__)
+
+
+class SamplingProfiler:
+    """
+    Profiler por amostragem de pilhas, ligado e desligado em tempo de execução.
+
+    Uma thread daemon lê sys._current_frames() a cada 'interval' segundos e
+    conta as pilhas de todas as outras threads; nada é instrumentado, então o
+    custo fica restrito às amostras. A janela é limitada a max_seconds e, ao
+    fim, as pilhas vão para output_dir no formato collapsed
+    ("thread;f1 (a.py);f2 (b.py) N"), aceito por flamegraph.pl e speedscope.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.01,
+        max_seconds: float = 60.0,
+        output_dir: str = "data/profiles",
+    ):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.output_dir = output_dir
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._stacks: Counter = Counter()
+        self._started_at = 0.0
+        self.last_result: dict[str, Any] | None = None
+
+    @classmethod
+    def from_config(cls, env: dict[str, Any]) -> "SamplingProfiler":
+        return cls(
+            interval=env.get("interval_ms", 10) / 1000,
+            max_seconds=env.get("max_seconds", 60),
+            output_dir=env.get("output_dir", "data/profiles"),
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float | None = None) -> bool:
+        """Inicia uma janela de até max_seconds; False se já houver uma em curso."""
+        with self._lock:
+            if self.running:
+                return False
+            window = min(seconds or self.max_seconds, self.max_seconds)
+            self._stop.clear()
+            self._stacks = Counter()
+            self._started_at = time.time()
+            self._thread = threading.Thread(
+                target=self._run, args=(window,), name="profiler", daemon=True
+            )
+            self._thread.start()
+        log.info("Profiler iniciado (janela de %ss, intervalo de %ss)", window, self.interval)
+        return True
+
+    def stop(self, wait: bool = True) -> dict[str, Any] | None:
+        """
+        Encerra a janela corrente; com wait devolve o resultado já gravado.
+
+        Sem janela em curso devolve o resultado da última.
+        """
+        thread = self._thread
+        self._stop.set()
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join()
+        return self.last_result
+
+    def toggle(self) -> None:
+        # chamado por handler de sinal: não espera a gravação do arquivo
+        if self.running:
+            self.stop(wait=False)
+        else:
+            self.start()
+
+    def install_signal_handler(self, signum: int = signal.SIGUSR2) -> bool:
+        """kill -USR2 <pid> liga e desliga o profiler (só na thread principal)."""
+        if threading.current_thread() is not threading.main_thread():
+            return False
+        signal.signal(signum, lambda *_: self.toggle())
+        log.info("Profiler controlado pelo sinal %s no pid %s", signum, os.getpid())
+        return True
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "max_seconds": self.max_seconds,
+            "last": self.last_result,
+        }
+
+    def collapsed(self) -> str:
+        """Pilhas da última janela no formato collapsed."""
+        return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def _run(self, window: float) -> None:
+        own = threading.get_ident()
+        deadline = time.monotonic() + window
+        samples = 0
+        sampling_ns = 0
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            started = time.perf_counter_ns()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident != own:
+                    self._stacks[_collapse(names.get(ident, str(ident)), frame)] += 1
+            samples += 1
+            sampling_ns += time.perf_counter_ns() - started
+            self._stop.wait(self.interval)
+
+        elapsed = time.time() - self._started_at
+        path = self._write()
+        self.last_result = {
+            "path": path,
+            "samples": samples,
+            "stacks": len(self._stacks),
+            "seconds": round(elapsed, 3),
+            # fração do tempo de parede gasta coletando (uma CPU)
+            "overhead": round(sampling_ns / 1e9 / elapsed, 4) if elapsed else 0.0,
+        }
+        log.info("Profiler encerrado: %s", self.last_result)
+
+    def _write(self) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%dT%H%M%S", time.localtime(self._started_at))
+        path = os.path.join(self.output_dir, f"profile_{os.getpid()}_{stamp}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.collapsed())
+        return path
+
+
+def _collapse(thread_name: str, frame) -> str:
+    frames = []
+    while frame is not None:
+        code = frame.f_code
+        frames.append(f"{code.co_qualname} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    frames.append(thread_name)
+    # a raiz primeiro; ';' separa os quadros no formato collapsed
+    return ";".join(reversed(frames))
+
+
+_profiler: SamplingProfiler | None = None
+_profiler_lock = threading.Lock()
+
+
+def get_profiler() -> SamplingProfiler:
+    """Profiler do processo, configurado em profiler.*."""
+    global _profiler
+    if _profiler is None:
+        with _profiler_lock:
+            if _profiler is None:
+                _profiler = SamplingProfiler.from_config(
+                    loader.get_config().get("profiler", {})
+                )
+    return _profiler
@@ -1 +1,4 @@
 DELETE FROM schema_registry;
+DELETE FROM schema_diff;
+DELETE FROM schema_version;
+DELETE FROM schema_body;
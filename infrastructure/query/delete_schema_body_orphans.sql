@@ -0,0 +1,2 @@
+DELETE FROM schema_body
+WHERE fingerprint NOT IN (SELECT fingerprint FROM schema_version);
@@ -0,0 +1 @@
+DELETE FROM schema_diff where namespace = ?;
@@ -0,0 +1 @@
+DELETE FROM schema_version where namespace = ?;
@@ -1,2 +1,5 @@
-INSERT INTO schema_registry (id, namespace, schema_avro)
-VALUES (?, ?, ?);
+INSERT INTO schema_version (id, namespace, version, fingerprint, schema_avro)
+SELECT r.id, r.namespace, r.version, r.fingerprint, r.schema_avro
+FROM (
+    SELECT unnest(from_json(?, '[{"id": "UUID", "namespace": "VARCHAR", "version": "INTEGER", "fingerprint": "VARCHAR", "schema_avro": "VARCHAR"}]')) AS r
+);
@@ -0,0 +1,6 @@
+INSERT INTO schema_body (fingerprint, canonical)
+SELECT r.fingerprint, r.canonical
+FROM (
+    SELECT unnest(from_json(?, '[{"fingerprint": "VARCHAR", "canonical": "VARCHAR"}]')) AS r
+)
+ON CONFLICT (fingerprint) DO NOTHING;
@@ -0,0 +1,5 @@
+INSERT INTO schema_diff (namespace, from_version, to_version, compatibility, diff)
+SELECT r.namespace, r.from_version, r.to_version, r.compatibility, r.diff
+FROM (
+    SELECT unnest(from_json(?, '[{"namespace": "VARCHAR", "from_version": "INTEGER", "to_version": "INTEGER", "compatibility": "VARCHAR", "diff": "VARCHAR"}]')) AS r
+);
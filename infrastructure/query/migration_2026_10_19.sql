@@ -0,0 +1,81 @@
+DROP VIEW IF EXISTS metric;
+DROP TABLE IF EXISTS move_registry;
+DROP TABLE IF EXISTS validation_errors;
+DROP TABLE IF EXISTS schema_diff;
+DROP TABLE IF EXISTS schema_registry;
+DROP TABLE IF EXISTS schema_version;
+DROP TABLE IF EXISTS schema_body;
+
+-- forma canônica dos schemas, armazenada uma única vez por fingerprint; é o
+-- que o validador e a verificação de compatibilidade leem
+CREATE TABLE schema_body (
+    fingerprint VARCHAR(16) PRIMARY KEY,
+    canonical TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT current_timestamp
+);
+
+-- histórico completo: uma linha por versão publicada de cada namespace, com o
+-- schema como foi enviado (doc, aliases, namespace). fingerprint aponta para
+-- schema_body (sem FOREIGN KEY, ver comentário do catálogo)
+CREATE TABLE schema_version (
+    id UUID PRIMARY KEY DEFAULT uuid(),
+    namespace VARCHAR(255) NOT NULL,
+    version INTEGER NOT NULL,
+    fingerprint VARCHAR(16) NOT NULL,
+    schema_avro TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT current_timestamp,
+    UNIQUE (namespace, version)
+);
+
+CREATE INDEX idx_schema_version_namespace ON schema_version (namespace);
+
+-- catálogo: um único ponteiro para a versão corrente de cada namespace.
+-- sem FOREIGN KEY para schema_version: o DuckDB não permite remover a linha
+-- referenciada na mesma transação que removeu a referência.
+CREATE TABLE schema_registry (
+    namespace VARCHAR(255) PRIMARY KEY,
+    schema_fk UUID NOT NULL,
+    version INTEGER NOT NULL,
+    created_at TIMESTAMP DEFAULT current_timestamp,
+    updated_at TIMESTAMP DEFAULT current_timestamp
+);
+
+-- diff por campo pré-computado entre versões consecutivas de um namespace
+CREATE TABLE schema_diff (
+    id UUID PRIMARY KEY DEFAULT uuid(),
+    namespace VARCHAR(255) NOT NULL,
+    from_version INTEGER NOT NULL,
+    to_version INTEGER NOT NULL,
+    compatibility VARCHAR(10) NOT NULL,
+    diff TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT current_timestamp,
+    UNIQUE (namespace, to_version)
+);
+
+CREATE TABLE move_registry (
+    id UUID PRIMARY KEY DEFAULT uuid(),
+    schema_fk UUID,
+    old_bucket VARCHAR(30),
+    new_bucket VARCHAR(30),
+    namespace VARCHAR(300),
+    summary TEXT,
+    created_at TIMESTAMP DEFAULT current_timestamp,
+    FOREIGN KEY (schema_fk) REFERENCES schema_version(id)
+);
+
+create view metric as (
+    select new_bucket, count(*) as total
+    from move_registry
+    group by new_bucket
+);
+
+CREATE TABLE validation_errors (
+    validation_run_id VARCHAR,
+    validation_timestamp TIMESTAMP DEFAULT current_timestamp,
+    failed_field VARCHAR,
+    error_message VARCHAR,
+    expected_type VARCHAR,
+    received_value VARCHAR,
+    raw_record_json VARCHAR,
+    created_at TIMESTAMP DEFAULT current_timestamp
+);
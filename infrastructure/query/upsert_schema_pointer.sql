@@ -0,0 +1,9 @@
+INSERT INTO schema_registry (namespace, schema_fk, version)
+SELECT r.namespace, r.schema_fk, r.version
+FROM (
+    SELECT unnest(from_json(?, '[{"namespace": "VARCHAR", "schema_fk": "UUID", "version": "INTEGER"}]')) AS r
+)
+ON CONFLICT (namespace) DO UPDATE SET
+    schema_fk = excluded.schema_fk,
+    version = excluded.version,
+    updated_at = now();
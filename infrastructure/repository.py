@@ -1,31 +1,42 @@
-import json
+import functools
 import logging
 import os
 import uuid
+from typing import Iterator
 
-from fastapi.encoders import jsonable_encoder
-
-from domain import port
+from domain import error, fingerprint, port
+from infrastructure.serializer import get_serializer
 
 from etc.config import loader
-env = loader.load_env(["./etc/config/root.local.yml"])
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+env = loader.get_config()
 log = logging.getLogger(__name__)
 
+# campos projetáveis do histórico de schemas -> coluna de origem
+SCHEMA_FIELDS = {
+    "id": "v.id",
+    "namespace": "v.namespace",
+    "version": "v.version",
+    "fingerprint": "v.fingerprint",
+    "schema_avro": "v.schema_avro",
+    "created_at": "v.created_at",
+}
+
+
 class QueryWriter:
+    @staticmethod
+    @functools.lru_cache(maxsize=None)
+    def read_sql_file(filename: str) -> str:
+        # os arquivos de query não mudam em tempo de execução: lidos uma vez por processo
+        path = os.path.join(env['app']['query_path'], filename)
+        log.debug(f"reading: {path}")
+        with open(path, "r") as file:
+            return file.read()
+
     @staticmethod
     def run_sql_in_file(
         conn: port.IStorageSession, filename: str, placeholder: list[str]
     ):
-        path = os.path.join(env['app']['query_path'], filename)
-        log.debug(f"reading: {path}")
-        log.info(os.listdir())
-        with open(path, "r") as filename:
-            readed_file = filename.read()
-            conn.execute(readed_file, placeholder)
+        conn.execute(QueryWriter.read_sql_file(filename), placeholder)
 
     @staticmethod
     def run_sql_in_str(
@@ -59,49 +70,221 @@ class MoveRegistry:
             [schema_fk, old_bucket, new_bucket, namespace, summary],
         )
 
+    def insert_metrics(self, conn, rows: list[tuple]):
+        """Várias linhas (schema_fk, old_bucket, new_bucket, namespace, summary) na mesma sessão."""
+        for row in rows:
+            self.insert_metric(conn, *row)
+
     def get_metrics(self, conn):
         rows = self.writter.run_sql_in_str(conn, "select * from metric", [])
         cols = self.writter.run_sql_in_str(conn, "describe metric", [])
         contents = [dict(zip(map(lambda x: x[0], cols), row)) for row in rows]
-
-        contents = jsonable_encoder(contents)
         return contents
 
 
 class SchemaRegistry:
     def __init__(self):
         self.writter = QueryWriter
+        self.serializer = get_serializer()
 
     def get_avro_schema_by_namespace(self, conn: port.IStorageSession, namespace: str):
+        """Histórico de versões do namespace, da mais recente para a mais antiga."""
         rows = self.writter.run_sql_in_str(
             conn,
-            "select id, schema_avro from schema_registry where namespace = ?",
+            """
+            select v.id, v.schema_avro, v.version, v.fingerprint
+            from schema_version v
+            where v.namespace = ?
+            order by v.version desc
+            """,
             [namespace],
         )
-        contents = [{"schema_avro": row[1], "id": row[0]} for row in rows]
+        contents = [
+            {
+                "schema_avro": row[1],
+                "id": row[0],
+                "version": row[2],
+                "fingerprint": row[3],
+            }
+            for row in rows
+        ]
         return contents
 
+    def get_current_schema(self, conn: port.IStorageSession, namespace: str):
+        """Versão corrente do namespace via ponteiro do catálogo (busca pela PK)."""
+        return self.get_current_schemas(conn, [namespace]).get(namespace)
+
+    def get_current_schemas(
+        self, conn: port.IStorageSession, namespaces: list[str]
+    ) -> dict[str, dict]:
+        """
+        Versões correntes de vários namespaces numa única consulta.
+
+        'schema_avro' é o schema como foi enviado; 'canonical', a forma
+        canônica usada pela validação e pela compatibilidade.
+        """
+        rows = self.writter.run_sql_in_str(
+            conn,
+            """
+            select r.namespace, v.id, v.schema_avro, v.version, v.fingerprint, b.canonical
+            from schema_registry r
+            join schema_version v on v.id = r.schema_fk
+            join schema_body b on b.fingerprint = v.fingerprint
+            where r.namespace in (select unnest(from_json(?, '["VARCHAR"]')))
+            """,
+            [self.serializer.dumps_str(namespaces)],
+        )
+        return {
+            row[0]: {
+                "schema_avro": row[2],
+                "id": row[1],
+                "version": row[3],
+                "fingerprint": row[4],
+                "canonical": row[5],
+            }
+            for row in rows
+        }
+
+    def get_namespaces(self, conn: port.IStorageSession) -> list[str]:
+        rows = self.writter.run_sql_in_str(
+            conn, "select namespace from schema_registry", []
+        )
+        return [row[0] for row in rows]
+
     def initialize_schema(
         self,
         conn: port.IStorageSession,
     ):
         self.writter.run_sql_in_file(conn, env['app']['migration'], [])
 
-    def insert_schema(self, conn: port.IStorageSession, schema: str) -> str:
-        uuid_str = str(uuid.uuid4())
+    def insert_schema(
+        self, conn: port.IStorageSession, schema: dict, version: int = 1
+    ) -> dict:
+        """Grava uma nova versão no histórico e move o ponteiro do namespace para ela."""
+        return self.insert_schemas(conn, [(schema, version)])[0]
+
+    def insert_schemas(
+        self, conn: port.IStorageSession, schemas: list[tuple[dict, int]]
+    ) -> list[dict]:
+        """
+        Grava várias versões com um único insert multi-linha por tabela.
+
+        A forma canônica é gravada uma única vez por fingerprint; cada versão
+        guarda o schema como foi enviado e o fingerprint, e o ponteiro de cada
+        namespace vai para a última versão do lote.
+        As linhas seguem como um único parâmetro JSON (from_json + unnest),
+        o que evita um parâmetro por valor. Executa vários comandos; o
+        chamador deve fornecer uma sessão transacional.
+        """
+        bodies: dict[str, str] = {}
+        versions = []
+        pointers: dict[str, dict] = {}
+        created = []
+        for schema, version in schemas:
+            canonical = fingerprint.canonical_form(schema)
+            schema_fingerprint = fingerprint.fingerprint(canonical)
+            if bodies.setdefault(schema_fingerprint, canonical) != canonical:
+                raise error.SchemaVersionConflictError(
+                    f"Colisão de fingerprint {schema_fingerprint} para schemas diferentes"
+                )
+
+            uuid_str = str(uuid.uuid4())
+            versions.append(
+                {
+                    "id": uuid_str,
+                    "namespace": schema["namespace"],
+                    "version": version,
+                    "fingerprint": schema_fingerprint,
+                    "schema_avro": self.serializer.dumps_str(schema),
+                }
+            )
+            pointers[schema["namespace"]] = {
+                "namespace": schema["namespace"],
+                "schema_fk": uuid_str,
+                "version": version,
+            }
+            created.append({"id": uuid_str, "fingerprint": schema_fingerprint})
+
+        if not created:
+            return created
+
         self.writter.run_sql_in_file(
             conn,
-            "insert_schema.sql",
+            "insert_schema_body.sql",
             [
-                uuid_str,
-                schema["namespace"],
-                json.dumps(
-                    schema,
-                    ensure_ascii=False,
-                ),
+                self.serializer.dumps_str(
+                    [
+                        {"fingerprint": key, "canonical": body}
+                        for key, body in bodies.items()
+                    ]
+                )
             ],
         )
-        return uuid_str
+        stored = self.writter.run_sql_in_str(
+            conn,
+            """
+            select fingerprint, canonical from schema_body
+            where fingerprint in (select unnest(from_json(?, '["VARCHAR"]')))
+            """,
+            [self.serializer.dumps_str(list(bodies))],
+        )
+        for schema_fingerprint, body in stored:
+            if bodies[schema_fingerprint] != body:
+                raise error.SchemaVersionConflictError(
+                    f"Colisão de fingerprint {schema_fingerprint} para schemas diferentes"
+                )
+
+        self.writter.run_sql_in_file(
+            conn, "insert_schema.sql", [self.serializer.dumps_str(versions)]
+        )
+        self.writter.run_sql_in_file(
+            conn,
+            "upsert_schema_pointer.sql",
+            [self.serializer.dumps_str(list(pointers.values()))],
+        )
+        return created
+
+    def insert_schema_diff(
+        self,
+        conn: port.IStorageSession,
+        namespace: str,
+        from_version: int,
+        to_version: int,
+        compatibility: str,
+        diff: dict,
+    ):
+        self.insert_schema_diffs(
+            conn,
+            [
+                {
+                    "namespace": namespace,
+                    "from_version": from_version,
+                    "to_version": to_version,
+                    "compatibility": compatibility,
+                    "diff": diff,
+                }
+            ],
+        )
+
+    def insert_schema_diffs(self, conn: port.IStorageSession, diffs: list[dict]):
+        if not diffs:
+            return
+        rows = [
+            {**diff, "diff": self.serializer.dumps_str(diff["diff"])}
+            for diff in diffs
+        ]
+        self.writter.run_sql_in_file(
+            conn, "insert_schema_diff.sql", [self.serializer.dumps_str(rows)]
+        )
+
+    def get_schema_diffs(self, conn: port.IStorageSession, namespace: str):
+        """Diffs do namespace, do passo mais recente para o mais antigo."""
+        rows = self.writter.run_sql_in_str(
+            conn,
+            "select diff from schema_diff where namespace = ? order by to_version desc",
+            [namespace],
+        )
+        return [self.serializer.loads(row[0]) for row in rows]
 
     def delete_schema(
         self, conn: port.IStorageSession, namespace: str | None = None
@@ -109,15 +292,86 @@ class SchemaRegistry:
         uuid_str = str(uuid.uuid4())
         if namespace:
             self.writter.run_sql_in_file(conn, "delete_schema_some.sql", [namespace])
+            self.writter.run_sql_in_file(
+                conn, "delete_schema_diff_some.sql", [namespace]
+            )
+            self.writter.run_sql_in_file(
+                conn, "delete_schema_version_some.sql", [namespace]
+            )
+            # corpos compartilhados com outros namespaces continuam
+            self.writter.run_sql_in_file(conn, "delete_schema_body_orphans.sql", [])
             return uuid_str
 
         self.writter.run_sql_in_file(conn, "delete_schema_all.sql", [])
 
-    def get_all(self, conn: port.IStorageSession):
-        rows = self.writter.run_sql_in_str(conn, "select * from schema_registry", [])
-        columns = self.writter.run_sql_in_str(conn, "DESCRIBE schema_registry", [])
-        cols = [col[0] for col in columns]
+    def get_all(
+        self,
+        conn: port.IStorageSession,
+        fields: list[str] | None = None,
+        after: tuple[str, str] | None = None,
+        limit: int | None = None,
+    ) -> tuple[list[dict], tuple[str, str] | None]:
+        """
+        Página do histórico ordenada por (created_at, id).
+
+        Paginação por chave: 'after' é o (created_at, id) da última linha da
+        página anterior, então cada página custa o mesmo independentemente
+        da posição. Retorna as linhas e a chave para a próxima página (None
+        na última).
+        """
+        query, parameters = self._select_all(fields, after, limit)
+        rows = self.writter.run_sql_in_str(conn, query, parameters)
+        cols = list(fields or SCHEMA_FIELDS)
         contents = [dict(zip(cols, row)) for row in rows]
 
-        contents = jsonable_encoder(contents)
-        return contents
+        next_after = None
+        if limit is not None and len(rows) == limit:
+            created_at, id_ = rows[-1][-2:]
+            next_after = (created_at.isoformat(), str(id_))
+        return contents, next_after
+
+    def iter_all(
+        self,
+        conn: port.IStorageSession,
+        fields: list[str] | None = None,
+        after: tuple[str, str] | None = None,
+        batch_size: int = 1000,
+    ) -> Iterator[dict]:
+        """Percorre o histórico em lotes de 'batch_size' linhas, com memória limitada."""
+        query, parameters = self._select_all(fields, after, None)
+        cursor = conn.execute(query, parameters)
+        cols = list(fields or SCHEMA_FIELDS)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(cols, row))
+
+    def _select_all(
+        self,
+        fields: list[str] | None,
+        after: tuple[str, str] | None,
+        limit: int | None,
+    ) -> tuple[str, list[object]]:
+        fields = list(fields or SCHEMA_FIELDS)
+        unknown = set(fields) - set(SCHEMA_FIELDS)
+        if unknown:
+            raise error.APIValidationError(
+                f"Campos desconhecidos: {', '.join(sorted(unknown))}"
+            )
+
+        # as chaves de paginação vêm sempre por último, fora da projeção
+        columns = [SCHEMA_FIELDS[field] for field in fields]
+        columns += ["v.created_at", "v.id"]
+        query = f"select {', '.join(columns)} from schema_version v"
+
+        parameters: list[object] = []
+        if after is not None:
+            query += " where (v.created_at, v.id) > (?::TIMESTAMP, ?::UUID)"
+            parameters += [after[0], after[1]]
+        query += " order by v.created_at, v.id"
+        if limit is not None:
+            query += " limit ?"
+            parameters.append(limit)
+        return query, parameters
@@ -0,0 +1,84 @@
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class CachedResponse(NamedTuple):
+    etag: str
+    body: bytes
+    headers: dict[str, str]
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Compara o cabeçalho If-None-Match com a ETag (comparação fraca, RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag.removeprefix("W/") for tag in candidates)
+
+
+class ResponseCache:
+    """
+    Cache em processo das respostas de leitura de schema, já serializadas.
+
+    As entradas são invalidadas pelas escritas feitas por este processo
+    (PUT/DELETE de schema); os limites de entradas e de bytes dos corpos
+    seguem política LRU. Um corpo maior que max_bytes não é guardado.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024):
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(
+        self, key: str, etag: str, body: bytes, headers: dict[str, str] | None = None
+    ) -> CachedResponse:
+        entry = CachedResponse(etag, body, headers or {})
+        with self._lock:
+            self._remove(key)
+            if len(body) > self._max_bytes:
+                return entry
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self._max_entries or self._bytes > self._max_bytes:
+                self._remove(next(iter(self._entries)))
+        return entry
+
+    def invalidate(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._remove(key)
+
+    def invalidate_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._entries if key.startswith(prefix)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.body)
+
+    def __len__(self) -> int:
+        return len(self._entries)
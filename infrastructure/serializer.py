@@ -0,0 +1,139 @@
+import datetime
+import decimal
+import functools
+import json
+import logging
+import re
+import uuid
+from typing import Any
+
+from etc.config import loader
+
+try:
+    import orjson
+except ImportError:  # backend opcional: sem ele cai no json da stdlib
+    orjson = None
+
+env = loader.get_config()
+log = logging.getLogger(__name__)
+
+
+class RawJson(bytes):
+    """
+    JSON já codificado, escrito na saída sem decode/encode.
+
+    Serve para textos que já estão em JSON válido, como o schema_avro
+    armazenado.
+    """
+
+
+# marcador de _RawSlots já codificado: o \x00 sai escapado como \u0000
+_RAW_MARKER = re.compile(rb'"\\u0000raw:([0-9a-f]{32}):(\d+)\\u0000"')
+
+
+class _RawSlots:
+    """
+    Troca cada RawJson por um marcador e o substitui depois da codificação.
+
+    A troca é uma única passada sobre a saída, qualquer que seja o número de
+    valores embutidos.
+    """
+
+    def __init__(self):
+        self._nonce = uuid.uuid4().hex
+        self._values: list[bytes] = []
+
+    def __bool__(self) -> bool:
+        return bool(self._values)
+
+    def marker(self, value: bytes) -> str:
+        self._values.append(bytes(value))
+        return f"\x00raw:{self._nonce}:{len(self._values) - 1}\x00"
+
+    def splice(self, encoded: bytes) -> bytes:
+        nonce = self._nonce.encode("ascii")
+
+        def value(match: re.Match) -> bytes:
+            # marcadores de outra chamada (nonce diferente) ficam como estão
+            if match[1] != nonce:
+                return match[0]
+            return self._values[int(match[2])]
+
+        return _RAW_MARKER.sub(value, encoded)
+
+
+class JsonSerializer:
+    """Serializador JSON da stdlib; saída UTF-8 compacta."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        if isinstance(obj, (bytes, bytearray)):
+            return bytes(obj)
+        raw = _RawSlots()
+        encoded = self._encode(obj, functools.partial(self._default, raw))
+        return raw.splice(encoded) if raw else encoded
+
+    def dumps_str(self, obj: Any) -> str:
+        return self.dumps(obj).decode("utf-8")
+
+    def loads(self, data: bytes | memoryview | str) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+
+    def _encode(self, obj: Any, default) -> bytes:
+        return json.dumps(
+            obj, ensure_ascii=False, separators=(",", ":"), default=default
+        ).encode("utf-8")
+
+    @staticmethod
+    def _default(raw: _RawSlots, value: Any) -> Any:
+        if isinstance(value, RawJson):
+            return raw.marker(value)
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            # bytes comuns não são JSON: viram texto
+            return bytes(value).decode("utf-8", errors="replace")
+        if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+            return value.isoformat()
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        if isinstance(value, decimal.Decimal):
+            return float(value)
+        if isinstance(value, (set, frozenset, tuple)):
+            return list(value)
+        raise TypeError(f"Tipo não serializável em JSON: {type(value).__name__}")
+
+
+class OrjsonSerializer(JsonSerializer):
+    """Backend orjson: datetime e UUID são codificados nativamente."""
+
+    name = "orjson"
+
+    def loads(self, data: bytes | memoryview | str) -> Any:
+        return orjson.loads(data)
+
+    def _encode(self, obj: Any, default) -> bytes:
+        return orjson.dumps(obj, default=default)
+
+
+SERIALIZERS: dict[str, type[JsonSerializer]] = {
+    "json": JsonSerializer,
+    "orjson": OrjsonSerializer,
+}
+
+
+@functools.lru_cache(maxsize=None)
+def get_serializer(name: str | None = None) -> JsonSerializer:
+    """
+    Serializador configurado em app.serializer (padrão orjson).
+
+    Sem o orjson instalado, cai para o json da stdlib.
+    """
+    name = name or env.get("app", {}).get("serializer", "orjson")
+    if name not in SERIALIZERS:
+        raise ValueError(f"Serializador desconhecido: {name}")
+    if name == "orjson" and orjson is None:
+        log.warning("orjson não instalado, usando o json da stdlib")
+        name = "json"
+    return SERIALIZERS[name]()
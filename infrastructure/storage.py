@@ -1,12 +1,13 @@
 from domain import port
 from contextlib import contextmanager
-import duckdb
 from typing import Generator
 import os
+import time
 class StorageConnectionAdapter(port.IStorageConnectionAdapter):
     def __init__(self):
         super().__init__()
         self._db_file = None
+        self._lock_timeout = 10.0
 
     @classmethod
     def from_duckdb_memory(cls, env: dict) -> 'StorageConnectionAdapter':
@@ -15,6 +16,7 @@ class StorageConnectionAdapter(port.IStorageConnectionAdapter):
         
         data_dir = '/data'
         instance._db_file = os.path.join(data_dir, db_file)
+        instance._lock_timeout = env.get('lock_timeout_seconds', 10.0)
         
         # Garantir que o diretório existe
         os.makedirs(os.path.dirname(instance._db_file), exist_ok=True)
@@ -24,7 +26,20 @@ class StorageConnectionAdapter(port.IStorageConnectionAdapter):
     def get_connection(self):
         if self._db_file is None:
             raise ValueError("db_file não foi definido")
-        return duckdb.connect(self._db_file)
+        import duckdb  # importado no primeiro uso: encurta a partida da API
+
+        # o arquivo aceita um processo de escrita por vez; com vários
+        # consumers (interfaces.supervisor) e a API, espera o outro fechar
+        deadline = time.monotonic() + self._lock_timeout
+        delay = 0.005
+        while True:
+            try:
+                return duckdb.connect(self._db_file)
+            except duckdb.IOException as err:
+                if "lock" not in str(err) or time.monotonic() >= deadline:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * 2, 0.1)
     
     def close_connection(self):
         pass
@@ -0,0 +1,240 @@
+import contextlib
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Callable, Iterator
+
+from etc.config import loader
+
+log = logging.getLogger(__name__)
+
+# header AMQP que leva o contexto do agendamento até o worker
+TRACE_HEADER = "trace_id"
+PARENT_HEADER = "parent_span_id"
+
+_current: contextvars.ContextVar["Span | None"] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class Span:
+    """Intervalo nomeado dentro de um trace; serializado em formato compacto."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "start_ns", "duration_ns", "attrs")
+
+    def __init__(self, trace_id: str, name: str, parent_id: str | None, attrs: dict):
+        self.trace_id = trace_id
+        self.span_id = new_id()
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start_ns = time.time_ns()
+        self.duration_ns = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        # chaves curtas: um trace por objeto validado gera muitas linhas
+        record = {
+            "t": self.trace_id,
+            "s": self.span_id,
+            "p": self.parent_id,
+            "n": self.name,
+            "ts": self.start_ns // 1000,
+            "d": self.duration_ns // 1000,
+        }
+        if self.attrs:
+            record["a"] = self.attrs
+        return record
+
+
+class InMemoryExporter:
+    def __init__(self):
+        self.spans: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span.to_dict())
+
+    def flush(self) -> None:
+        pass
+
+
+class FileExporter:
+    """Uma linha NDJSON por span, em modo append (vários processos no mesmo arquivo)."""
+
+    def __init__(self, path: str, buffer_size: int = 256):
+        from infrastructure.serializer import get_serializer
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._serializer = get_serializer()
+        self._buffer: list[bytes] = []
+        self._buffer_size = buffer_size
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = self._serializer.dumps(span.to_dict()) + b"\n"
+        with self._lock:
+            self._buffer.append(line)
+            if len(self._buffer) >= self._buffer_size:
+                self._write()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._write()
+
+    def _write(self) -> None:
+        if not self._buffer:
+            return
+        with open(self.path, "ab") as f:
+            f.write(b"".join(self._buffer))
+        self._buffer.clear()
+
+
+class Tracer:
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextlib.contextmanager
+    def start_trace(
+        self,
+        name: str,
+        trace_id: str | None = None,
+        parent_id: str | None = None,
+        **attrs: Any,
+    ) -> Iterator["Span | None"]:
+        """Abre o span raiz de um job (ou continua o trace recebido no header)."""
+        if not self.enabled:
+            yield None
+            return
+        try:
+            with self._open(Span(trace_id or new_id(), name, parent_id, attrs)) as span:
+                yield span
+        finally:
+            # fim do job neste processo: o trace completo vai para o exporter
+            self.exporter.flush()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator["Span | None"]:
+        """Span filho do corrente; fora de um trace não registra nada."""
+        parent = _current.get()
+        if parent is None or not self.enabled:
+            yield None
+            return
+        with self._open(Span(parent.trace_id, name, parent.span_id, attrs)) as span:
+            yield span
+
+    @contextlib.contextmanager
+    def _open(self, span: Span) -> Iterator[Span]:
+        token = _current.set(span)
+        started = time.perf_counter_ns()
+        try:
+            yield span
+        except BaseException as exc:
+            span.attrs["error"] = type(exc).__name__
+            raise
+        finally:
+            span.duration_ns = time.perf_counter_ns() - started
+            _current.reset(token)
+            self.exporter.export(span)
+
+    def flush(self) -> None:
+        if self.exporter is not None:
+            self.exporter.flush()
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def propagation_headers() -> dict[str, str]:
+    """Headers AMQP com o trace corrente (vazio fora de um trace)."""
+    span = _current.get()
+    if span is None:
+        return {}
+    return {TRACE_HEADER: span.trace_id, PARENT_HEADER: span.span_id}
+
+
+_tracer: Tracer | None = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """
+    Tracer configurado em tracing.* (exporter: file | memory | none).
+
+    Com exporter none (padrão sem a seção) os spans viram no-ops.
+    """
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer(_build_exporter(loader.get_config().get("tracing", {})))
+    return _tracer
+
+
+def set_tracer(tracer: Tracer) -> Tracer:
+    """Substitui o tracer do processo (benchmarks e testes); devolve o anterior."""
+    global _tracer
+    with _tracer_lock:
+        previous, _tracer = _tracer, tracer
+    return previous
+
+
+def _build_exporter(env: dict):
+    exporter = env.get("exporter", "none")
+    if exporter == "file":
+        return FileExporter(env.get("path", "data/traces.ndjson"))
+    if exporter == "memory":
+        return InMemoryExporter()
+    if exporter == "none":
+        return None
+    raise ValueError(f"Exporter de tracing desconhecido: {exporter}")
+
+
+def span(name: str, **attrs: Any):
+    return get_tracer().span(name, **attrs)
+
+
+def traced_iter(iterable, name: str, **attrs: Any) -> Iterator:
+    """Itera abrindo um span por next(): mede o tempo de espera por cada item."""
+    iterator = iter(iterable)
+    while True:
+        with span(name, **attrs):
+            item = next(iterator, _END)
+        if item is _END:
+            return
+        yield item
+
+
+_END = object()
+
+
+def traced(name: str) -> Callable:
+    """Decorador: a chamada vira um span filho (adaptadores de bucket/broker/storage)."""
+
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current.get() is None:
+                return func(*args, **kwargs)
+            with get_tracer().span(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,61 +1,250 @@
+import time
+
+_IMPORT_STARTED = time.perf_counter()
+
+import base64
+import binascii
+import datetime
+import hashlib
+import itertools
 import logging
-from typing import Any, Dict
+import threading
+import uuid
+from typing import Any, Callable, Dict
 import fastapi
-import uvicorn
-from etc.config import loader
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from etc.config import loader, log_setup
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 
 from application import usecase
 from domain import dto, error, port
-from infrastructure import repository
-from infrastructure.broker import BrokerAdapter
+from domain.namespace_trie import NamespaceTrie, is_pattern
+from infrastructure import profiler, repository
+from infrastructure.response_cache import ResponseCache, etag_matches
+from infrastructure.serializer import RawJson, get_serializer
 from infrastructure.storage import StorageConnectionAdapter
 
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
+    HTTP_304_NOT_MODIFIED,
+    HTTP_400_BAD_REQUEST,
     HTTP_404_NOT_FOUND,
+    HTTP_409_CONFLICT,
     HTTP_422_UNPROCESSABLE_CONTENT,
     HTTP_500_INTERNAL_SERVER_ERROR,
+    HTTP_503_SERVICE_UNAVAILABLE,
 )
 
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# logging assíncrono (QueueHandler/QueueListener); nível e limites por
+# objeto vêm de logging.* na configuração, aplicados em setup_fastapi
+log_setup.configure_logging()
 log = logging.getLogger(__name__)
 
+# pika (broker) e duckdb (storage) só são importados no primeiro uso
+IMPORT_MS = (time.perf_counter() - _IMPORT_STARTED) * 1000
+
 
 def get_dependencies() -> Dict[str, Any]:
     log.info("Carregando dependências...")
-    env = loader.load_env(["./etc/config/root.local.yml"])
+    env = loader.get_config()
     return env
 
 
+class SerializedJSONResponse(JSONResponse):
+    """JSONResponse codificada pelo serializador configurado em app.serializer."""
+
+    def render(self, content: Any) -> bytes:
+        return get_serializer().dumps(content)
+
+
+def encode_cursor(after: tuple[str, str]) -> str:
+    """Cursor opaco de paginação: (created_at, id) da última linha entregue."""
+    raw = get_serializer().dumps(list(after))
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, id_ = get_serializer().loads(raw)
+        # as duas partes vão para a comparação (?::TIMESTAMP, ?::UUID)
+        return datetime.datetime.fromisoformat(created_at).isoformat(), str(uuid.UUID(id_))
+    except (binascii.Error, ValueError, TypeError, AttributeError) as err:
+        raise error.APIValidationError(f"Cursor inválido: {cursor}") from err
+
+
+def parse_fields(fields: str | None) -> list[str] | None:
+    if not fields:
+        return None
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = set(selected) - set(repository.SCHEMA_FIELDS)
+    if unknown:
+        raise error.APIValidationError(
+            f"Campos desconhecidos: {', '.join(sorted(unknown))}"
+        )
+    return selected
+
+
+def embed_schemas(schemas: list[dict]) -> list[dict]:
+    """Embute o schema_avro armazenado como objeto JSON, sem decodificá-lo."""
+    return [
+        {**row, "schema_avro": RawJson(row["schema_avro"].encode("utf-8"))}
+        if "schema_avro" in row
+        else row
+        for row in schemas
+    ]
+
+
 class RouterBuilder:
     def __init__(self, env: Dict[str, Any] | None = None, prefix: str = ""):
+        started = time.perf_counter()
+        # tempos de partida em ms, expostos em /health/ready
+        self.timings: dict[str, float] = {"import_ms": round(IMPORT_MS, 1)}
         self.env = env or get_dependencies()
         self.prefix = prefix
-        self.router = APIRouter(prefix=prefix)
+        self.router = APIRouter(
+            prefix=prefix, default_response_class=SerializedJSONResponse
+        )
         self._setup_dependencies()
         self._setup_routes()
+        self.timings["build_ms"] = round((time.perf_counter() - started) * 1000, 1)
 
     def _setup_dependencies(self) -> None:
-        self.broker_service: port.IBrokerAdapter = BrokerAdapter(
-            self.env.get("broker", None)
-        )
+        # nenhuma conexão é aberta aqui: a API sobe e serve leituras de schema
+        # mesmo com o RabbitMQ fora do ar
+        self._broker_service: port.IBrokerAdapter | None = None
+        self._broker_lock = threading.Lock()
         self.storage_connection: port.IStorageConnection = (
             StorageConnectionAdapter.from_duckdb_memory(self.env["storage"])
         )
         self.schema_repository = repository.SchemaRegistry()
         self.metric_repository = repository.MoveRegistry()
+        self.serializer = get_serializer()
+        self._namespace_index: NamespaceTrie | None = None
+        # leituras de schema já serializadas; válido enquanto este processo for
+        # o único escritor do registry (as escritas abaixo o invalidam)
+        # limitado também pelo tamanho dos corpos: páginas de /schema/all
+        # chegam a milhares de linhas cada
+        self.response_cache = ResponseCache(
+            max_bytes=self.env["app"].get("schema_cache_max_mb", 64) * 1024 * 1024
+        )
+        self.cache_control = (
+            f"max-age={self.env['app'].get('schema_cache_max_age', 0)}, must-revalidate"
+        )
+
+    @property
+    def broker_service(self) -> port.IBrokerAdapter:
+        # conecta no primeiro agendamento; uma falha não fica memorizada e o
+        # próximo pedido tenta de novo
+        if self._broker_service is None:
+            with self._broker_lock:
+                if self._broker_service is None:
+                    import pika.exceptions
+                    from infrastructure import broker
+
+                    started = time.perf_counter()
+                    try:
+                        self._broker_service = broker.from_config(
+                            self.env.get("broker", None)
+                        )
+                    except pika.exceptions.AMQPError as err:
+                        raise error.ProducerConnectionRefusedError(
+                            f"Broker indisponível: {err!r}"
+                        ) from err
+                    self.timings["broker_connect_ms"] = round(
+                        (time.perf_counter() - started) * 1000, 1
+                    )
+        return self._broker_service
+
+    @property
+    def namespace_index(self) -> NamespaceTrie:
+        # carregado do catálogo na primeira busca por padrão e mantido
+        # pelas escritas feitas por este processo
+        if self._namespace_index is None:
+            self._namespace_index = usecase.load_namespace_index(
+                self.storage_connection, self.schema_repository
+            )
+        return self._namespace_index
+
+    def _invalidate_schema_reads(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            self.response_cache.invalidate_prefix(f"namespace:{namespace}?")
+        self.response_cache.invalidate_prefix("all")
+
+    def _conditional_response(
+        self,
+        request: Request,
+        key: str,
+        load: Callable[[], tuple[str | None, Any, dict[str, str]]],
+    ) -> Response:
+        """
+        Responde leituras com ETag a partir do cache em processo.
+
+        Com a entrada em cache, um If-None-Match igual à ETag devolve 304 sem
+        tocar o storage; 'load' só é chamado quando a entrada não existe e
+        devolve (etag, payload, cabeçalhos extras), com etag None para
+        derivá-la do corpo.
+        """
+        entry = self.response_cache.get(key)
+        if entry is None:
+            etag, payload, extra_headers = load()
+            body = self.serializer.dumps(payload)
+            if etag is None:
+                etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            entry = self.response_cache.put(key, etag, body, extra_headers)
+
+        headers = {
+            **entry.headers,
+            "ETag": entry.etag,
+            "Cache-Control": self.cache_control,
+        }
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(
+            content=entry.body, media_type="application/json", headers=headers
+        )
 
     def _setup_routes(self) -> None:
+        self._setup_health_routes()
         self._setup_test_routes()
         self._setup_schema_routes()
         self._setup_job_routes()
         self._setup_metrics_routes()
+        self._setup_admin_routes()
+
+    def _setup_health_routes(self) -> None:
+        @self.router.get(
+            "/health/ready",
+            summary="Prontidão da API e tempos de partida",
+            tags=["Saúde"],
+        )
+        def ready():
+            started = time.perf_counter()
+            try:
+                with self.storage_connection.connect() as conn:
+                    conn.execute("select 1").fetchall()
+            except Exception as err:
+                log.error("Storage indisponível na verificação de prontidão: %s", err)
+                raise HTTPException(
+                    status_code=HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=f"Storage indisponível: {str(err)}",
+                )
+
+            if "ready_ms" not in self.timings:
+                # da importação do módulo até o primeiro storage respondendo
+                self.timings["storage_connect_ms"] = round(
+                    (time.perf_counter() - started) * 1000, 1
+                )
+                self.timings["ready_ms"] = round(
+                    (time.perf_counter() - _IMPORT_STARTED) * 1000, 1
+                )
+                log.info("API pronta: %s", self.timings)
+            return {
+                "status": "ready",
+                "broker": "connected" if self._broker_service else "lazy",
+                "timings": self.timings,
+            }
 
     def _setup_test_routes(self) -> None:
         @self.router.get("/hello", summary="Endpoint de teste", tags=["Testes"])
@@ -65,7 +254,7 @@ class RouterBuilder:
 
         @self.router.post("/echo", summary="Endpoint de eco", tags=["Testes"])
         async def echo(data: dict):
-            log.info(f"Endpoint /echo acessado com dados: {data}")
+            log.info("Endpoint /echo acessado com dados: %s", data)
             return data
 
     def _setup_schema_routes(self) -> None:
@@ -76,19 +265,21 @@ class RouterBuilder:
                 usecase.delete_all_schema(
                     self.storage_connection, self.schema_repository
                 )
+                self._namespace_index = NamespaceTrie()
+                self.response_cache.clear()
                 log.info("Todos os schemas deletados com sucesso")
-                return JSONResponse(
+                return SerializedJSONResponse(
                     status_code=HTTP_201_CREATED,
                     content={"message": "Todos os schemas deletados com sucesso"},
                 )
             except error.StorageConnectionErr as err:
-                log.error(f"Erro de conexão com storage ao deletar schemas: {err}")
+                log.error("Erro de conexão com storage ao deletar schemas: %s", err)
                 raise HTTPException(
                     status_code=HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Erro de conexão com storage: {str(err)}",
                 )
             except error.SchemaValidationError as err:
-                log.error(f"Erro de validação ao deletar schemas: {err}")
+                log.error("Erro de validação ao deletar schemas: %s", err)
                 raise HTTPException(
                     status_code=HTTP_422_UNPROCESSABLE_CONTENT,
                     detail=f"Schema inválido: {str(err)}",
@@ -97,27 +288,31 @@ class RouterBuilder:
         @self.router.delete("/schema/{namespace}")
         def delete_schema_by_namespace(namespace: str):
             log.info(
-                f"Recebida requisição para deletar schema do namespace: {namespace}"
+                "Recebida requisição para deletar schema do namespace: %s",
+                namespace,
             )
             try:
                 usecase.delete_some_schema(
                     self.storage_connection, self.schema_repository, namespace=namespace
                 )
-                log.info(f"Schema do namespace {namespace} deletado com sucesso")
-                return JSONResponse(
+                if self._namespace_index is not None:
+                    self._namespace_index.discard(namespace)
+                self._invalidate_schema_reads(namespace)
+                log.info("Schema do namespace %s deletado com sucesso", namespace)
+                return SerializedJSONResponse(
                     status_code=HTTP_201_CREATED,
                     content={
                         "message": f"Schema do namespace {namespace} deletado com sucesso"
                     },
                 )
             except error.StorageConnectionErr as err:
-                log.error(f"Erro de conexão ao deletar schema {namespace}: {err}")
+                log.error("Erro de conexão ao deletar schema %s: %s", namespace, err)
                 raise HTTPException(
                     status_code=HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Erro de conexão com storage: {str(err)}",
                 )
             except error.SchemaValidationError as err:
-                log.error(f"Erro de validação ao deletar schema {namespace}: {err}")
+                log.error("Erro de validação ao deletar schema %s: %s", namespace, err)
                 raise HTTPException(
                     status_code=HTTP_422_UNPROCESSABLE_CONTENT,
                     detail=f"Schema inválido: {str(err)}",
@@ -129,50 +324,199 @@ class RouterBuilder:
             tags=["Schemas"],
             responses={
                 201: {"description": "Schema criado com sucesso"},
+                409: {"description": "Schema incompatível com a versão corrente"},
                 500: {"description": "Erro interno do servidor"},
                 422: {"description": "Dados de schema inválidos"},
             },
         )
-        async def create_schema(schema: dto.SchemaCreateDto):
-            log.info(f"Recebida requisição para criar schema: {schema}")
+        async def create_schema(
+            schema: dto.SchemaCreateDto, compatibility: str | None = None
+        ):
+            log.info("Recebida requisição para criar schema de %s", schema.namespace)
+            log.debug("Schema recebido: %s", schema)
             try:
-                usecase.create_schema(
-                    schema, self.storage_connection, self.schema_repository
+                created = usecase.create_schema(
+                    schema,
+                    self.storage_connection,
+                    self.schema_repository,
+                    compatibility or self.env["app"].get("compatibility", "BACKWARD"),
                 )
-                log.info("Schema criado com sucesso")
-                return JSONResponse(
+                if self._namespace_index is not None:
+                    self._namespace_index.add(schema.namespace)
+                self._invalidate_schema_reads(schema.namespace)
+                log.info("Schema criado com sucesso (versão %s)", created["version"])
+                return SerializedJSONResponse(
                     status_code=HTTP_201_CREATED,
-                    content={"message": "Schema criado com sucesso"},
+                    content={
+                        "message": "Schema criado com sucesso",
+                        "version": created["version"],
+                        "fingerprint": created["fingerprint"],
+                    },
+                )
+            except error.SchemaCompatibilityError as err:
+                log.error("Schema incompatível: %s", err)
+                raise HTTPException(
+                    status_code=HTTP_409_CONFLICT,
+                    detail=f"Schema incompatível: {str(err)}",
+                )
+            except error.StorageConnectionErr as err:
+                log.error("Erro de conexão ao criar schema: %s", err)
+                raise HTTPException(
+                    status_code=HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Erro de conexão com storage: {str(err)}",
+                )
+            except error.SchemaValidationError as err:
+                log.error("Erro de validação ao criar schema: %s", err)
+                raise HTTPException(
+                    status_code=HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail=f"Schema inválido: {str(err)}",
+                )
+
+        @self.router.put(
+            "/schema/bulk",
+            summary="Insere vários schemas numa única transação",
+            description=(
+                "Aceita um array JSON de schemas ou NDJSON "
+                "(Content-Type: application/x-ndjson), um schema por linha. "
+                "Retorna o resultado de cada item na ordem recebida."
+            ),
+            tags=["Schemas"],
+        )
+        async def create_schemas_bulk(request: Request, compatibility: str | None = None):
+            body = await request.body()
+            try:
+                if "ndjson" in request.headers.get("content-type", ""):
+                    items = [
+                        self.serializer.loads(line)
+                        for line in body.splitlines()
+                        if line.strip()
+                    ]
+                else:
+                    items = self.serializer.loads(body)
+            except ValueError as err:
+                raise HTTPException(
+                    status_code=HTTP_400_BAD_REQUEST, detail=f"Corpo inválido: {err}"
+                )
+            if not isinstance(items, list):
+                raise HTTPException(
+                    status_code=HTTP_400_BAD_REQUEST,
+                    detail="Esperado um array de schemas ou NDJSON",
+                )
+
+            log.info("Recebida requisição para criar %s schemas em lote", len(items))
+            try:
+                results = usecase.create_schemas(
+                    items,
+                    self.storage_connection,
+                    self.schema_repository,
+                    compatibility or self.env["app"].get("compatibility", "BACKWARD"),
                 )
             except error.StorageConnectionErr as err:
-                log.error(f"Erro de conexão ao criar schema: {err}")
+                log.error("Erro de conexão ao criar schemas em lote: %s", err)
                 raise HTTPException(
                     status_code=HTTP_500_INTERNAL_SERVER_ERROR,
                     detail=f"Erro de conexão com storage: {str(err)}",
                 )
             except error.SchemaValidationError as err:
-                log.error(f"Erro de validação ao criar schema: {err}")
                 raise HTTPException(
                     status_code=HTTP_422_UNPROCESSABLE_CONTENT,
                     detail=f"Schema inválido: {str(err)}",
                 )
 
+            created = [item for item in results if item["status"] == "created"]
+            if self._namespace_index is not None:
+                for item in created:
+                    self._namespace_index.add(item["namespace"])
+            self._invalidate_schema_reads(*{item["namespace"] for item in created})
+            log.info(
+                "Lote processado: %s de %s schemas criados",
+                len(created),
+                len(results),
+            )
+            return {
+                "created": len(created),
+                "failed": len(results) - len(created),
+                "results": results,
+            }
+
         @self.router.get(
-            "/schema/all", summary="Lista todos os schemas", tags=["Schemas"]
+            "/schema/all",
+            summary="Lista todos os schemas",
+            description=(
+                "Paginado por cursor: siga o cabeçalho X-Next-Cursor (ou o Link "
+                "rel=next) até ele não vir mais. 'fields' projeta colunas "
+                "(ex.: namespace,version,fingerprint) e embed_schema=true devolve "
+                "schema_avro como objeto JSON. Com format=ndjson ou "
+                "Accept: application/x-ndjson o histórico é transmitido em "
+                "streaming, um schema por linha, a partir do cursor."
+            ),
+            tags=["Schemas"],
         )
-        async def get_all_schemas():
+        def get_all_schemas(
+            request: Request,
+            limit: int | None = Query(default=None, ge=1),
+            cursor: str | None = None,
+            fields: str | None = None,
+            format: str | None = None,
+            embed_schema: bool = False,
+        ):
             log.info("Recebida requisição para listar todos os schemas")
             try:
-                schemas = usecase.get_all_schemas(
-                    self.storage_connection, self.schema_repository
+                selected = parse_fields(fields)
+                after = decode_cursor(cursor) if cursor else None
+            except error.APIValidationError as err:
+                raise HTTPException(status_code=HTTP_400_BAD_REQUEST, detail=str(err))
+
+            streaming = format == "ndjson" or "application/x-ndjson" in request.headers.get(
+                "accept", ""
+            )
+            if streaming:
+                rows = usecase.iter_all_schemas(
+                    self.storage_connection, self.schema_repository, selected, after
+                )
+                if limit is not None:
+                    rows = itertools.islice(rows, limit)
+                if embed_schema:
+                    rows = (embed_schemas([row])[0] for row in rows)
+                lines = (self.serializer.dumps(row) + b"\n" for row in rows)
+                return StreamingResponse(lines, media_type="application/x-ndjson")
+
+            app = self.env["app"]
+            page_size = min(
+                limit or app.get("schema_page_size", 1000),
+                app.get("schema_page_size_max", 10000),
+            )
+
+            def load():
+                schemas, next_after = usecase.get_all_schemas(
+                    self.storage_connection,
+                    self.schema_repository,
+                    selected,
+                    after,
+                    page_size,
+                )
+                log.info("Retornados %s schemas", len(schemas))
+                if embed_schema:
+                    schemas = embed_schemas(schemas)
+                headers = {}
+                if next_after is not None:
+                    next_cursor = encode_cursor(next_after)
+                    next_url = request.url.include_query_params(
+                        cursor=next_cursor, limit=page_size
+                    )
+                    headers["X-Next-Cursor"] = next_cursor
+                    headers["Link"] = f'<{next_url}>; rel="next"'
+                return None, schemas, headers
+
+            try:
+                return self._conditional_response(
+                    request, f"all?{request.url.query}", load
                 )
-                log.info(f"Retornados {len(schemas)} schemas")
-                return schemas
             except error.StorageConnectionErr as err:
-                log.error(f"Erro de conexão ao listar schemas: {err}")
+                log.error("Erro de conexão ao listar schemas: %s", err)
                 raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR)
             except error.StorageNotFoundErr as err:
-                log.error(f"Storage não encontrado ao listar schemas: {err}")
+                log.error("Storage não encontrado ao listar schemas: %s", err)
                 raise HTTPException(status_code=HTTP_404_NOT_FOUND)
 
         @self.router.get(
@@ -180,26 +524,47 @@ class RouterBuilder:
             summary="Busca schemas por namespace",
             tags=["Schemas"],
         )
-        async def get_schemas_by_namespace(namespace: str):
+        async def get_schemas_by_namespace(
+            namespace: str, request: Request, embed_schema: bool = False
+        ):
             log.info(
-                f"Recebida requisição para buscar schemas do namespace: {namespace}"
+                "Recebida requisição para buscar schemas do namespace: %s",
+                namespace,
             )
-            try:
+
+            def load():
                 schemas = usecase.get_schemas_by_namespace(
                     namespace, self.storage_connection, self.schema_repository
                 )
                 log.info(
-                    f"Retornados {len(schemas)} schemas para namespace {namespace}"
+                    "Retornados %s schemas para namespace %s",
+                    len(schemas),
+                    namespace,
+                )
+                # a versão corrente vem primeiro: fingerprint + versão identificam a resposta
+                if not schemas:
+                    return '"empty"', schemas, {}
+                etag = f'{schemas[0]["fingerprint"]}-{schemas[0]["version"]}'
+                if embed_schema:
+                    return f'"{etag}-embed"', embed_schemas(schemas), {}
+                return f'"{etag}"', schemas, {}
+
+            try:
+                return self._conditional_response(
+                    request, f"namespace:{namespace}?{request.url.query}", load
                 )
-                return schemas
             except error.StorageConnectionErr as err:
                 log.error(
-                    f"Erro de conexão ao buscar schemas por namespace {namespace}: {err}"
+                    "Erro de conexão ao buscar schemas por namespace %s: %s",
+                    namespace,
+                    err,
                 )
                 raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR)
             except error.StorageNotFoundErr as err:
                 log.error(
-                    f"Storage não encontrado ao buscar schemas por namespace {namespace}: {err}"
+                    "Storage não encontrado ao buscar schemas por namespace %s: %s",
+                    namespace,
+                    err,
                 )
                 raise HTTPException(status_code=HTTP_404_NOT_FOUND)
 
@@ -207,28 +572,54 @@ class RouterBuilder:
         @self.router.post(
             "/job/validate/namespace/{namespace}",
             summary="Agenda validação de schema para um bucket",
+            description=(
+                "Aceita um namespace ou um padrão: '*' casa um segmento "
+                "(rfb.2025.05.*) e '**' casa qualquer sufixo (rfb.2025.**)."
+            ),
             tags=["Jobs"],
         )
         async def validate_schema_endpoint(namespace: str):
             log.info(
-                f"Recebida requisição para validar schema do namespace: {namespace}"
+                "Recebida requisição para validar schema do namespace: %s",
+                namespace,
             )
             try:
+                if is_pattern(namespace):
+                    matched = usecase.schedule_schema_validation_by_pattern(
+                        namespace, self.namespace_index, self.broker_service
+                    )
+                    log.info(
+                        "Validação agendada para %s namespaces de %s",
+                        len(matched),
+                        namespace,
+                    )
+                    return {
+                        "message": f"Schema validation scheduled for {len(matched)} namespaces",
+                        "namespaces": matched,
+                    }
+
                 message = usecase.schedule_schema_validation(
                     namespace, self.broker_service
                 )
-                log.info(f"Validação agendada para namespace {namespace}: {message}")
+                log.info("Validação agendada para namespace %s: %s", namespace, message)
                 return {"message": message}
             except error.ProducerConnectionRefusedError as err:
                 log.error(
-                    f"Erro de conexão do producer para namespace {namespace}: {err}"
+                    "Erro de conexão do producer para namespace %s: %s",
+                    namespace,
+                    err,
                 )
                 raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR)
             except error.ProducerSendingError as err:
                 log.error(
-                    f"Erro ao enviar mensagem para namespace {namespace}: {err}"
+                    "Erro ao enviar mensagem para namespace %s: %s",
+                    namespace,
+                    err,
                 )
                 raise HTTPException(status_code=HTTP_404_NOT_FOUND)
+            except error.SchemaNotFound as err:
+                log.error("Nenhum namespace para o padrão %s: %s", namespace, err)
+                raise HTTPException(status_code=HTTP_404_NOT_FOUND, detail=str(err))
 
     def _setup_metrics_routes(self) -> None:
 
@@ -244,32 +635,75 @@ class RouterBuilder:
                 metrics = usecase.get_metrics(
                     self.storage_connection, self.metric_repository
                 )
-                log.info(f"Métricas obtidas: {metrics}")
+                log.info("Métricas obtidas: %s", metrics)
                 return metrics
             except error.StorageConnectionErr as err:
-                log.error(f"Erro de conexão ao obter métricas: {err}")
+                log.error("Erro de conexão ao obter métricas: %s", err)
                 raise HTTPException(status_code=HTTP_500_INTERNAL_SERVER_ERROR)
             except error.StorageNotFoundErr as err:
-                log.error(f"Storage não encontrado ao obter métricas: {err}")
+                log.error("Storage não encontrado ao obter métricas: %s", err)
                 raise HTTPException(status_code=HTTP_404_NOT_FOUND)
 
+    def _setup_admin_routes(self) -> None:
+        @self.router.get(
+            "/admin/profile",
+            summary="Estado do profiler por amostragem",
+            tags=["Admin"],
+        )
+        def profile_status():
+            return profiler.get_profiler().status()
+
+        @self.router.post(
+            "/admin/profile/start",
+            summary="Abre uma janela do profiler por amostragem",
+            tags=["Admin"],
+        )
+        def profile_start(seconds: float | None = Query(None, gt=0)):
+            sampler = profiler.get_profiler()
+            if not sampler.start(seconds):
+                raise HTTPException(
+                    status_code=HTTP_409_CONFLICT, detail="Profiler já em execução"
+                )
+            log.info("Profiler iniciado via API")
+            return sampler.status()
+
+        @self.router.post(
+            "/admin/profile/stop",
+            summary="Encerra o profiler e devolve as pilhas (collapsed)",
+            description=(
+                "Formato aceito por flamegraph.pl e speedscope; o arquivo também "
+                "fica em profiler.output_dir. Sem janela em curso, devolve a última."
+            ),
+            tags=["Admin"],
+            response_class=PlainTextResponse,
+        )
+        def profile_stop():
+            sampler = profiler.get_profiler()
+            if sampler.stop() is None:
+                raise HTTPException(
+                    status_code=HTTP_404_NOT_FOUND, detail="Nenhum perfil coletado"
+                )
+            return PlainTextResponse(sampler.collapsed())
+
     def get_router(self) -> APIRouter:
         return self.router
 
 
 def setup_router(env: Dict[str, Any] | None = None, prefix: str = "") -> APIRouter:
-    log.info(f"Configurando router com prefixo: {prefix}")
+    log.info("Configurando router com prefixo: %s", prefix)
     builder = RouterBuilder(env, prefix)
     return builder.get_router()
 
 
 def setup_fastapi() -> fastapi.FastAPI:
+    log_setup.configure_logging(**loader.get_config().get("logging", {}))
     log.info("Inicializando aplicação FastAPI")
     api_router = setup_router()
     api = fastapi.FastAPI(
         title="API de Validação de Schema",
         description="API para gerenciamento e validação de schemas de dados",
         version="1.0.0",
+        default_response_class=SerializedJSONResponse,
     )
     api.include_router(api_router)
     log.info("Aplicação FastAPI configurada com sucesso")
@@ -277,5 +711,7 @@ def setup_fastapi() -> fastapi.FastAPI:
 
 
 if __name__ == "__main__":
+    import uvicorn
+
     log.info("Iniciando servidor Uvicorn...")
     uvicorn.run(setup_fastapi(), host="127.0.0.1", port=8000, log_level="info")
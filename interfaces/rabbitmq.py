@@ -1,24 +1,25 @@
 import logging
+import signal
 import threading
 import time
+from collections import Counter
 from typing import Any, Dict, Optional
 
-from etc.config import loader
+from etc.config import loader, log_setup
 
 from application import usecase, validator
-from domain import port
-from infrastructure import broker, bucket, repository, storage
+from domain import error, port
+from infrastructure import broker, bucket, profiler, repository, storage, tracing
 
-# Configuração do logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# logging assíncrono (QueueHandler/QueueListener); nível e limites por
+# objeto vêm de logging.* na configuração, aplicados em start_consuming
+log_setup.configure_logging()
 log = logging.getLogger(__name__)
 
 
 def get_dependencies() -> Dict[str, Any]:
     log.info("Carregando dependências...")
-    env = loader.load_env(["./etc/config/root.local.yml"])
+    env = loader.get_config()
     return env
 
 
@@ -29,7 +30,7 @@ class Consumer:
         self.env = env or get_dependencies()
 
         # Inicialização dos adapters
-        self.bucket_adapter = bucket.BucketAdapter.from_minio_client(self.env["bucket"])
+        self.bucket_adapter = bucket.from_config(self.env["bucket"])
         self.storage_connection = storage.StorageConnectionAdapter.from_duckdb_memory(
             self.env["storage"]
         )
@@ -42,25 +43,105 @@ class Consumer:
         self.checker = validator.ValidatorFactory()
 
         # Inicialização do broker
-        self.broker_adapter = broker.BrokerAdapter(self.env["broker"])
+        self.broker_adapter = broker.from_config(self.env["broker"])
+
+        # desligamento gracioso (request_stop) e gravação das métricas em lote
+        self._stop_requested = threading.Event()
+        self._drain_deadline = 0.0
+        self.metric_batch_size = self.env["storage"].get("metric_batch_size", 1)
+
+        # contadores do processo, agregados entre workers por interfaces.supervisor
+        self.metrics: Counter = Counter()
+        self._metrics_lock = threading.Lock()
 
         log.info("Consumer inicializado com sucesso")
 
-    def on_data_received(self, amqp: broker.AmqpDelivery) -> None:
-        log.info(f"Processando mensagem recebida: {amqp.message}")
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._metrics_lock:
+            self.metrics[name] += amount
 
-        try:
-            usecase.avaliate_data(
+    def metrics_snapshot(self) -> dict[str, int]:
+        with self._metrics_lock:
+            return dict(self.metrics)
+
+    def request_stop(self, grace_seconds: Optional[float] = None) -> None:
+        """
+        Para de aceitar entregas; o job em curso tem até grace_seconds
+        (broker.drain_seconds) para terminar antes de parar entre dois
+        objetos e devolver a mensagem à fila.
+
+        Só marca o pedido, então pode ser chamado de um handler de sinal.
+        """
+        if grace_seconds is None:
+            grace_seconds = self.env["broker"].get("drain_seconds", 30)
+        self._drain_deadline = time.monotonic() + grace_seconds
+        self._stop_requested.set()
+        self.broker_adapter.stop_consuming()
+
+    def _should_stop(self) -> bool:
+        return self._stop_requested.is_set() and time.monotonic() >= self._drain_deadline
+
+    def close(self) -> None:
+        self.broker_adapter.close()
+        self.storage_connection.close_connection()
+        tracing.get_tracer().flush()
+
+    def _process(self, amqp: broker.AmqpDelivery) -> None:
+        # continua o trace aberto em schedule_schema_validation
+        with tracing.get_tracer().start_trace(
+            "consumer.job",
+            trace_id=amqp.headers.get(tracing.TRACE_HEADER),
+            parent_id=amqp.headers.get(tracing.PARENT_HEADER),
+            namespace=amqp.body().get("namespace"),
+            count=amqp.count,
+        ):
+            failed = usecase.avaliate_data(
                 amqp.body(),
                 self.storage_connection,
                 self.schema_repository,
                 self.bucket_adapter,
                 self.checker,
                 self.move_registry,
+                should_stop=self._should_stop,
+                metric_batch_size=self.metric_batch_size,
             )
+        self._count("jobs")
+        if failed:
+            self._count("object_failures", len(failed))
+            # só o que falhou volta, um objeto por mensagem; o job é confirmado
+            usecase.schedule_object_retries(
+                amqp.body()["namespace"],
+                failed,
+                self.broker_adapter,
+                amqp.count,
+                amqp.trace_headers(),
+            )
+            log.warning(
+                "%s objetos com falha reagendados individualmente: %s",
+                len(failed),
+                failed,
+            )
+
+    def on_data_received(self, amqp: broker.AmqpDelivery) -> None:
+        if self._stop_requested.is_set():
+            # entrega recebida depois do SIGTERM: não começa um job novo
+            self._count("requeued")
+            amqp.requeue()
+            return
+        log.info("Processando mensagem recebida: %s", amqp.message)
+
+        try:
+            self._process(amqp)
+            amqp.success()
             log.info("Mensagem processada com sucesso")
+            log.info("Pool de conexões do bucket: %s", self.bucket_adapter.pool_stats())
+        except error.ConsumerShutdownError as e:
+            log.warning("%s; mensagem devolvida à fila", e)
+            self._count("requeued")
+            amqp.requeue()
         except Exception as e:
-            log.error(f"Erro ao processar mensagem: {e}")
+            log.error("Erro ao processar mensagem: %s", e)
+            self._count("job_failures")
             # Marca a mensagem como falha para reprocessamento
             amqp.failure()
 
@@ -72,25 +153,122 @@ class Consumer:
         )
         # Aqui você pode adicionar lógica adicional para tratamento de mensagens
         # que falharam repetidamente, como logging especial, notificações, etc.
-        amqp.failure()
+        self._count("dead_lettered")
+        amqp.dead_letter()
+
+    def on_batch_received(self, deliveries: list[broker.AmqpDelivery]) -> None:
+        """
+        Processa um lote de consume_batch e o confirma com um único ack.
+
+        As falhas são resolvidas antes do ack em lote: a nova tentativa é
+        publicada e a original entra no ack; se nem isso for possível, nack
+        com requeue. Se o lote for interrompido (inclusive pelo prazo de
+        request_stop), o que já foi processado é confirmado e o restante
+        volta à fila.
+        """
+        last_tag = None
+        done = 0
+        try:
+            for amqp in deliveries:
+                if self._should_stop():
+                    break
+                if amqp.count >= broker.MAX_DELIVERY_COUNT:
+                    self.on_max_retry_reached(amqp)
+                    done += 1
+                    continue
+                try:
+                    self._process(amqp)
+                except error.ConsumerShutdownError as e:
+                    log.warning("%s; restante do lote devolvido à fila", e)
+                    break
+                except Exception as e:
+                    log.error("Erro ao processar mensagem: %s", e)
+                    self._count("job_failures")
+                    try:
+                        self.broker_adapter.retry_message(
+                            amqp.message, amqp.count, amqp.trace_headers()
+                        )
+                    except Exception as publish_err:
+                        log.error("Retry não publicado, mensagem volta à fila: %s", publish_err)
+                        self.broker_adapter.nack_message(amqp.delivery_tag, requeue=True)
+                        self._count("requeued")
+                        done += 1
+                        continue
+                last_tag = amqp.delivery_tag
+                done += 1
+        finally:
+            if last_tag is not None:
+                self.broker_adapter.acknowledge_message(last_tag, multiple=True)
+            for amqp in deliveries[done:]:
+                self.broker_adapter.nack_message(amqp.delivery_tag, requeue=True)
+            self._count("requeued", len(deliveries) - done)
+            self._count("batches")
+        log.info("Lote de %s mensagens processado", len(deliveries))
+
+    def consume_batches(
+        self,
+        batch_size: int,
+        wait_seconds: float = 0.5,
+        duration: Optional[float] = None,
+        drain: bool = False,
+    ) -> int:
+        """
+        Consome em lotes por até 'duration' segundos ou até request_stop;
+        com drain, para no primeiro lote vazio. Devolve o número de
+        mensagens recebidas.
+        """
+        deadline = None if duration is None else time.monotonic() + duration
+        total = 0
+        while not self._stop_requested.is_set() and (
+            deadline is None or time.monotonic() < deadline
+        ):
+            deliveries = self.broker_adapter.consume_batch(batch_size, wait_seconds)
+            if not deliveries:
+                if drain:
+                    break
+                continue
+            self.on_batch_received(deliveries)
+            total += len(deliveries)
+        return total
 
 
 def start_consuming(
-    env: Optional[Dict[str, Any]] = None, duration: Optional[int] = None
+    env: Optional[Dict[str, Any]] = None,
+    duration: Optional[int] = None,
+    consumer: Optional[Consumer] = None,
 ) -> None:
-    log.info(f"Iniciando consumo de mensagens (duração: {duration}s)")
+    log_setup.configure_logging(**(env or get_dependencies()).get("logging", {}))
+    log.info("Iniciando consumo de mensagens (duração: %ss)", duration)
+
+    # kill -USR2 <pid> abre/fecha uma janela do profiler por amostragem
+    profiler.get_profiler().install_signal_handler()
 
     try:
-        consumer = Consumer(env)
-        consumer.broker_adapter.consume_blocking(
-            consumer.on_data_received, consumer.on_max_retry_reached, duration
-        )
+        consumer = consumer or Consumer(env)
+        if threading.current_thread() is threading.main_thread():
+            # SIGTERM (rolling deploy, autoscaling): termina o job em curso
+            # dentro de broker.drain_seconds e fecha as conexões
+            signal.signal(signal.SIGTERM, lambda *_: consumer.request_stop())
+        batch_size = consumer.env["broker"].get("batch_size", 0)
+        if batch_size:
+            consumer.consume_batches(
+                batch_size,
+                consumer.env["broker"].get("batch_wait_ms", 500) / 1000,
+                duration,
+            )
+        else:
+            consumer.broker_adapter.consume_blocking(
+                consumer.on_data_received, consumer.on_max_retry_reached, duration
+            )
         log.info("Consumo de mensagens finalizado")
     except KeyboardInterrupt:
         log.info("Consumo interrompido pelo usuário")
     except Exception as e:
-        log.error(f"Erro durante o consumo de mensagens: {e}")
+        log.error("Erro durante o consumo de mensagens: %s", e)
         raise
+    finally:
+        if consumer is not None:
+            consumer.close()
 
 
 def main() -> None:
@@ -101,7 +279,7 @@ def main() -> None:
         # Exemplo: start_consuming(duration=3600) para 1 hora
         start_consuming()
     except Exception as e:
-        log.error(f"Erro fatal na aplicação: {e}")
+        log.error("Erro fatal na aplicação: %s", e)
         raise
 
 
@@ -0,0 +1,279 @@
+import json
+import logging
+import os
+import selectors
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+from etc.config import loader, log_setup
+
+from interfaces import rabbitmq
+
+log = logging.getLogger(__name__)
+
+# corpo de cada worker: recebe a função que publica seus contadores e
+# devolve o código de saída do processo
+WorkerTarget = Callable[[Callable[[dict], None]], int]
+
+
+@dataclass
+class _Slot:
+    index: int
+    pid: Optional[int] = None
+    started_at: float = 0.0
+    failures: int = 0
+    restart_at: Optional[float] = None
+    reader: Optional[int] = None
+    buffer: bytes = b""
+    metrics: dict = field(default_factory=dict)
+
+
+class Supervisor:
+    """
+    Pré-fork de N processos consumidores, cada um com suas conexões.
+
+    O pai só carrega módulos e configuração antes do fork; broker, DuckDB e
+    MinIO são abertos em cada filho. Um filho que sai com erro é reiniciado
+    com backoff exponencial (zerado depois de stable_seconds no ar); saída 0
+    (fim de duration) não é reiniciada. SIGTERM/SIGINT são repassados como
+    SIGTERM aos filhos, que drenam o job em curso; quem passar do prazo
+    recebe SIGKILL.
+
+    Cada filho publica seus contadores por um pipe; o agregado (somando os
+    filhos que já saíram) vai para o log e para supervisor.metrics_file.
+    """
+
+    def __init__(
+        self,
+        env: Dict[str, Any],
+        target: Optional[WorkerTarget] = None,
+        workers: Optional[int] = None,
+        duration: Optional[int] = None,
+    ):
+        conf = env.get("supervisor", {})
+        self.env = env
+        self.workers = workers or conf.get("workers") or os.cpu_count() or 1
+        self.backoff = conf.get("restart_backoff_seconds", 1.0)
+        self.backoff_max = conf.get("restart_backoff_max_seconds", 60.0)
+        self.stable_seconds = conf.get("stable_seconds", 60.0)
+        self.report_seconds = conf.get("report_seconds", 10.0)
+        self.metrics_file = conf.get("metrics_file", "data/consumer_metrics.json")
+        self.grace_seconds = env["broker"].get("drain_seconds", 30) + 5
+        self.duration = duration
+        self.target = target or self._consume
+        self.restarts = 0
+        self._slots = [_Slot(index) for index in range(self.workers)]
+        self._selector = selectors.DefaultSelector()
+        self._retired: Counter = Counter()  # contadores de filhos que já saíram
+        self._stop_deadline: Optional[float] = None
+
+    def run(self) -> dict[str, int]:
+        """Supervisiona até todos os filhos saírem; devolve as métricas agregadas."""
+        previous = {
+            signum: signal.signal(signum, self._on_signal)
+            for signum in (signal.SIGTERM, signal.SIGINT)
+        }
+        log.info("Supervisor iniciando %s workers (pid %s)", self.workers, os.getpid())
+        try:
+            for slot in self._slots:
+                self._spawn(slot)
+            next_report = time.monotonic() + self.report_seconds
+            while any(
+                slot.pid is not None or slot.restart_at is not None
+                for slot in self._slots
+            ):
+                self._read_reports(timeout=0.2)
+                self._reap()
+                self._restart_due()
+                self._enforce_grace()
+                if time.monotonic() >= next_report:
+                    self._report()
+                    next_report = time.monotonic() + self.report_seconds
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            self._selector.close()
+        metrics = self._report()
+        log.info("Supervisor encerrado")
+        return metrics
+
+    def metrics(self) -> dict[str, int]:
+        total = Counter(self._retired)
+        for slot in self._slots:
+            total.update(slot.metrics)
+        return {
+            **total,
+            "workers": sum(slot.pid is not None for slot in self._slots),
+            "restarts": self.restarts,
+        }
+
+    def _on_signal(self, signum, frame) -> None:
+        if self._stop_deadline is not None:
+            return
+        log.info("Sinal %s recebido: drenando os workers", signum)
+        self._stop_deadline = time.monotonic() + self.grace_seconds
+        for slot in self._slots:
+            slot.restart_at = None
+            if slot.pid is not None:
+                self._kill(slot.pid, signal.SIGTERM)
+
+    def _spawn(self, slot: _Slot) -> None:
+        reader, writer = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(reader)
+            for other in self._slots:
+                if other.reader is not None:
+                    os.close(other.reader)
+            os._exit(self._child(writer))
+
+        os.close(writer)
+        slot.pid = pid
+        slot.started_at = time.monotonic()
+        slot.restart_at = None
+        slot.reader = reader
+        slot.buffer = b""
+        self._selector.register(reader, selectors.EVENT_READ, slot)
+        log.info("Worker %s iniciado (pid %s)", slot.index, pid)
+
+    def _child(self, writer: int) -> int:
+        # o pai decide quando parar: Ctrl+C no terminal não interrompe um job
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        lock = threading.Lock()
+
+        def report(metrics: dict) -> None:
+            line = json.dumps(metrics).encode("utf-8") + b"\n"
+            with lock:
+                try:
+                    os.write(writer, line)
+                except OSError:
+                    pass  # supervisor já saiu
+
+        try:
+            return self.target(report)
+        except BaseException as err:
+            log.error("Worker encerrado por erro: %s", err)
+            return 1
+        finally:
+            os.close(writer)
+            log_setup.stop_logging()
+
+    def _consume(self, report: Callable[[dict], None]) -> int:
+        consumer = rabbitmq.Consumer(self.env)
+        stop = threading.Event()
+
+        def publish() -> None:
+            while not stop.wait(self.report_seconds):
+                report(consumer.metrics_snapshot())
+
+        reporter = threading.Thread(target=publish, name="metrics-report", daemon=True)
+        reporter.start()
+        try:
+            rabbitmq.start_consuming(self.env, self.duration, consumer=consumer)
+        finally:
+            stop.set()
+            reporter.join()
+            report(consumer.metrics_snapshot())
+        return 0
+
+    def _read_reports(self, timeout: float) -> None:
+        for key, _ in self._selector.select(timeout):
+            self._read(key.data)
+
+    def _read(self, slot: _Slot) -> None:
+        chunk = os.read(slot.reader, 65536)
+        if not chunk:
+            self._selector.unregister(slot.reader)
+            os.close(slot.reader)
+            slot.reader = None
+            return
+        *lines, slot.buffer = (slot.buffer + chunk).split(b"\n")
+        for line in lines:
+            if line:
+                # contadores são cumulativos: vale o último relatório
+                slot.metrics = json.loads(line)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = next((s for s in self._slots if s.pid == pid), None)
+            if slot is None:
+                continue
+            while slot.reader is not None:
+                self._read(slot)  # o que o filho escreveu antes de sair
+            code = os.waitstatus_to_exitcode(status)
+            lifetime = time.monotonic() - slot.started_at
+            self._retired.update(slot.metrics)
+            slot.metrics = {}
+            slot.pid = None
+
+            if self._stop_deadline is not None or code == 0:
+                log.info("Worker %s (pid %s) encerrado com código %s", slot.index, pid, code)
+                continue
+            slot.failures = 1 if lifetime >= self.stable_seconds else slot.failures + 1
+            delay = min(self.backoff_max, self.backoff * 2 ** (slot.failures - 1))
+            slot.restart_at = time.monotonic() + delay
+            log.error(
+                "Worker %s (pid %s) saiu com código %s após %.1fs; reinício em %.1fs",
+                slot.index,
+                pid,
+                code,
+                lifetime,
+                delay,
+            )
+
+    def _restart_due(self) -> None:
+        now = time.monotonic()
+        for slot in self._slots:
+            if slot.restart_at is not None and slot.restart_at <= now:
+                self.restarts += 1
+                self._spawn(slot)
+
+    def _enforce_grace(self) -> None:
+        if self._stop_deadline is None or time.monotonic() < self._stop_deadline:
+            return
+        for slot in self._slots:
+            if slot.pid is not None:
+                log.warning("Worker %s (pid %s) passou do prazo de drenagem", slot.index, slot.pid)
+                self._kill(slot.pid, signal.SIGKILL)
+
+    @staticmethod
+    def _kill(pid: int, signum: int) -> None:
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+    def _report(self) -> dict[str, int]:
+        metrics = self.metrics()
+        log.info("Métricas agregadas dos workers: %s", metrics)
+        directory = os.path.dirname(self.metrics_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp = f"{self.metrics_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(metrics, f)
+        os.replace(tmp, self.metrics_file)
+        return metrics
+
+
+def main() -> None:
+    env = loader.get_config()
+    log_setup.configure_logging(**env.get("logging", {}))
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    Supervisor(env, workers=workers).run()
+
+
+if __name__ == "__main__":
+    main()
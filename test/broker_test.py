@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pika
+
+from infrastructure import broker
+
+ENV = {
+    "username": "admin",
+    "password": "admin",
+    "host": "localhost",
+    "exchange": "defaultEx",
+    "queue_name": "app.main",
+    "queue_retry": "retry_queue",
+    "queue_dlq": "queue_dlq",
+    "queue_ttl_milliseconds": 10000,
+    "prefetch": 3,
+}
+
+
+class FakeChannel:
+    """Registra as chamadas do canal; basic_consume guarda o callback."""
+
+    def __init__(self):
+        self.calls = []
+        self.on_message = None
+
+    def basic_consume(self, queue, on_message_callback, auto_ack):
+        self.on_message = on_message_callback
+        return "ctag"
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, kwargs))
+
+
+class FakeConnection:
+    """Como o pika, despacha de uma vez tudo o que já foi recebido."""
+
+    def __init__(self, parameters):
+        self.chan = FakeChannel()
+        self.received = []
+        self.is_closed = False
+
+    def channel(self):
+        return self.chan
+
+    def process_data_events(self, time_limit=None):
+        received, self.received = self.received, []
+        for tag, body in received:
+            self.chan.on_message(
+                self.chan,
+                SimpleNamespace(delivery_tag=tag),
+                pika.BasicProperties(headers={"count": 0}),
+                body,
+            )
+
+
+def test_deliveries_buffered_after_stop_are_requeued(monkeypatch) -> None:
+    monkeypatch.setattr(broker.pika, "BlockingConnection", FakeConnection)
+    rm = broker.BrokerAdapter(ENV)
+    rm.connection.received = [(tag, b'{"namespace": "a"}') for tag in (1, 2, 3)]
+    handled = []
+
+    def on_message(delivery):
+        handled.append(delivery.delivery_tag)
+        rm.stop_consuming()  # SIGTERM durante o primeiro job
+        delivery.success()
+
+    rm.consume_blocking(on_message, on_message)
+
+    consume_calls = [call for call in rm.channel.calls if call[0].startswith("basic_")]
+    assert handled == [1]
+    assert consume_calls == [
+        ("basic_qos", {"prefetch_count": 3}),
+        ("basic_ack", {"delivery_tag": 1, "multiple": False}),
+        ("basic_nack", {"delivery_tag": 2, "requeue": True}),
+        ("basic_nack", {"delivery_tag": 3, "requeue": True}),
+        ("basic_cancel", {}),
+    ]
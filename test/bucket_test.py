@@ -0,0 +1,94 @@
+import io
+
+import pytest
+
+from infrastructure import bucket
+
+
+class FakeResponse:
+    """Resposta de get_object; read pode falhar no meio do corpo."""
+
+    def __init__(self, body: bytes = b"", fail: Exception | None = None):
+        self.body = body
+        self.fail = fail
+        self.closed = False
+        self.released = False
+
+    def read(self) -> bytes:
+        if self.fail is not None:
+            raise self.fail
+        return self.body
+
+    def close(self) -> None:
+        self.closed = True
+
+    def release_conn(self) -> None:
+        self.released = True
+
+
+class FakeMinio:
+    """Devolve a resposta configurada em get_object e lê o fluxo de put_object."""
+
+    def __init__(self, response: FakeResponse | None = None):
+        self.response = response
+        self.uploads = {}
+
+    def get_object(self, bucket_name, object_name):
+        return self.response
+
+    def put_object(self, bucket_name, object_name, data, length, part_size, **kwargs):
+        # como o minio: tamanho conhecido lê exatamente length; -1 lê partes até o fim
+        if length >= 0:
+            body = data.read(length)
+        else:
+            body = b"".join(iter(lambda: data.read(part_size), b""))
+        self.uploads[(bucket_name, object_name)] = (body, length, kwargs)
+
+
+class TestReadObject:
+    def test_response_released_after_read(self) -> None:
+        response = FakeResponse(b'{"a": 1}')
+        adapter = bucket.BucketAdapter(FakeMinio(response))
+
+        assert adapter.read_object("gold", "x.json") == b'{"a": 1}'
+        assert response.closed and response.released
+
+    def test_response_released_when_read_raises(self) -> None:
+        response = FakeResponse(fail=ConnectionResetError("conexão perdida"))
+        adapter = bucket.BucketAdapter(FakeMinio(response))
+
+        with pytest.raises(ConnectionResetError):
+            adapter.read_object("gold", "x.json")
+        assert response.closed and response.released
+
+
+class TestPutObject:
+    @pytest.mark.parametrize(
+        "data, length",
+        [
+            (io.BytesIO(b'{"id": 1}'), -1),
+            (iter([b'{"id"', ": ", "1}"]), -1),
+            (memoryview(bytearray(b'{"id": 1}')), 9),
+            ('{"id": 1}', 9),
+        ],
+        ids=["file", "chunks", "memoryview", "str"],
+    )
+    def test_accepts_streams_and_buffers(self, data, length) -> None:
+        client = FakeMinio()
+        adapter = bucket.BucketAdapter(client, upload_workers=2)
+
+        adapter.put_object("gold", "x.json", data, "application/json")
+
+        body, sent_length, kwargs = client.uploads[("gold", "x.json")]
+        assert body == b'{"id": 1}'
+        assert sent_length == length
+        assert kwargs == {"content_type": "application/json", "num_parallel_uploads": 2}
+
+    def test_part_size_respects_s3_minimum(self) -> None:
+        client = FakeMinio()
+        adapter = bucket.BucketAdapter(client, part_size=1024)
+
+        adapter.put_object("gold", "x.json", iter([b"a" * 10]), "application/json")
+
+        assert adapter.part_size == bucket.MIN_PART_SIZE
+        assert client.uploads[("gold", "x.json")][0] == b"a" * 10
@@ -0,0 +1,134 @@
+import os
+
+import pytest
+
+from application import compatibility, usecase, validator
+from domain import dto, error
+from etc.config import loader
+from infrastructure import repository
+from infrastructure.storage import StorageConnectionAdapter
+
+
+def schema_creator(fields: list[dict]) -> dict:
+    return {
+        "type": "record",
+        "namespace": "rfb.json",
+        "name": "RegistroUsuario",
+        "fields": fields,
+    }
+
+
+BASE_FIELDS = [
+    {"name": "name", "type": "string"},
+    {"name": "age", "type": "int"},
+]
+
+
+class TestCompatibility:
+    def test_added_optional_field_is_full_compatible(self) -> None:
+        new = schema_creator(
+            BASE_FIELDS + [{"name": "codigo", "type": ["null", "int"], "default": None}]
+        )
+        diff = compatibility.check_compatibility(
+            schema_creator(BASE_FIELDS), new, compatibility.FULL
+        )
+
+        assert [field["name"] for field in diff["added"]] == ["codigo"]
+        assert diff["backward"] and diff["forward"]
+
+    def test_added_required_field_breaks_backward(self) -> None:
+        new = schema_creator(BASE_FIELDS + [{"name": "salary", "type": "double"}])
+
+        with pytest.raises(error.SchemaCompatibilityError):
+            compatibility.check_compatibility(
+                schema_creator(BASE_FIELDS), new, compatibility.BACKWARD
+            )
+
+        diff = compatibility.check_compatibility(
+            schema_creator(BASE_FIELDS), new, compatibility.FORWARD
+        )
+        assert not diff["backward"] and diff["forward"]
+
+    def test_removed_required_field_breaks_forward(self) -> None:
+        new = schema_creator(BASE_FIELDS[:1])
+
+        with pytest.raises(error.SchemaCompatibilityError):
+            compatibility.check_compatibility(
+                schema_creator(BASE_FIELDS), new, compatibility.FORWARD
+            )
+
+        diff = compatibility.check_compatibility(
+            schema_creator(BASE_FIELDS), new, compatibility.BACKWARD
+        )
+        assert [field["name"] for field in diff["removed"]] == ["age"]
+
+    def test_type_promotion(self) -> None:
+        new = schema_creator([BASE_FIELDS[0], {"name": "age", "type": "double"}])
+
+        diff = compatibility.check_compatibility(
+            schema_creator(BASE_FIELDS), new, compatibility.BACKWARD
+        )
+        assert diff["changed"] == [
+            {"name": "age", "old_type": "int", "new_type": "double"}
+        ]
+
+        with pytest.raises(error.SchemaCompatibilityError):
+            compatibility.check_compatibility(
+                schema_creator(BASE_FIELDS), new, compatibility.FULL
+            )
+
+    def test_invalid_mode(self) -> None:
+        with pytest.raises(error.SchemaValidationError):
+            compatibility.parse_mode("SIDEWAYS")
+
+    def test_validator_accepts_data_from_compatible_version(self) -> None:
+        old = schema_creator(BASE_FIELDS)
+        new = schema_creator(BASE_FIELDS[:1])
+        diff = compatibility.check_compatibility(old, new, compatibility.BACKWARD)
+        legacy = compatibility.legacy_fields([diff])
+        checker = validator.JsonValidator()
+
+        record = {"name": "João Silva", "age": 30}
+        assert len(checker.validate_data_against_avro(record, new)) == 1
+        assert checker.validate_data_against_avro(record, new, legacy) == []
+
+        wrong = {"name": "João Silva", "age": "trinta"}
+        assert len(checker.validate_data_against_avro(wrong, new, legacy)) == 1
+
+    def test_legacy_chain_stops_at_incompatible_step(self) -> None:
+        diffs = [
+            {"backward": True, "removed": [{"name": "a", "type": "int"}], "changed": []},
+            {"backward": False, "removed": [{"name": "b", "type": "int"}], "changed": []},
+        ]
+
+        assert compatibility.legacy_fields(diffs) == {"a": ["int"]}
+
+
+def test_reput_of_namespaced_nested_record_is_accepted(tmp_path) -> None:
+    dm = StorageConnectionAdapter.from_duckdb_memory(
+        {"db_file": os.path.join(tmp_path, "compat.duckdb")}
+    )
+    with dm.connect() as conn:
+        repository.QueryWriter.run_sql_in_file(
+            conn, loader.get_config()["app"]["migration"], []
+        )
+    ds = repository.SchemaRegistry()
+    schema = schema_creator(
+        BASE_FIELDS
+        + [
+            {
+                "name": "endereco",
+                "type": {
+                    "type": "record",
+                    "name": "In",
+                    "namespace": "q",
+                    "fields": [{"name": "uf", "type": "string"}],
+                },
+            }
+        ]
+    )
+
+    assert usecase.create_schema(dto.SchemaCreateDto(**schema), dm, ds)["version"] == 1
+    assert usecase.create_schema(dto.SchemaCreateDto(**schema), dm, ds)["version"] == 2
+    results = usecase.create_schemas([schema, schema], dm, ds)
+    assert [result["status"] for result in results] == ["created", "created"]
@@ -14,14 +14,14 @@ def test_client():
 
 @pytest.fixture(scope="session")
 def env():
-    return loader.load_env(["etc/config/root.local.yml"])
+    return loader.get_config()
 
 
 @pytest.fixture(scope="session")
 def bm(env: dict):
     from infrastructure import bucket
 
-    bm = bucket.BucketAdapter.from_minio_client(env["bucket"])
+    bm = bucket.from_config(env["bucket"])
     return bm
 
 
@@ -29,7 +29,7 @@ def bm(env: dict):
 def rm(env: dict):
     from infrastructure import broker
 
-    rm = broker.BrokerAdapter(env["broker"])
+    rm = broker.from_config(env["broker"])
     return rm
 
 
@@ -40,3 +40,23 @@ def storage(env: dict):
     storage_connection = StorageConnectionAdapter.from_duckdb_memory(env["storage"])
     yield storage_connection
     storage_connection.close_connection()
+
+
+@pytest.fixture
+def api_client(tmp_path):
+    """API com um DuckDB próprio do teste, já migrado."""
+    import copy
+    import fastapi as fastapi_lib
+    import os
+
+    from infrastructure import repository
+    from interfaces import fastapi
+
+    env = copy.deepcopy(dict(loader.get_config()))
+    env["storage"] = {**env["storage"], "db_file": os.path.join(tmp_path, "api.duckdb")}
+    builder = fastapi.RouterBuilder(env)
+    with builder.storage_connection.connect() as conn:
+        repository.QueryWriter.run_sql_in_file(conn, env["app"]["migration"], [])
+    api = fastapi_lib.FastAPI(default_response_class=fastapi.SerializedJSONResponse)
+    api.include_router(builder.get_router())
+    return TestClient(api)
@@ -0,0 +1,132 @@
+import copy
+import json
+import os
+
+import pytest
+
+from application import usecase
+from domain import dto
+from etc.config import loader
+from infrastructure import repository
+from infrastructure.local_broker import InMemoryBrokerAdapter, ManualClock
+from interfaces import rabbitmq
+
+SCHEMA = {
+    "type": "record",
+    "namespace": "retry.ns",
+    "name": "Retry",
+    "fields": [{"name": "name", "type": "string"}],
+}
+
+
+@pytest.fixture
+def consumer(tmp_path):
+    env = copy.deepcopy(dict(loader.get_config()))
+    env["storage"] = {"db_file": os.path.join(tmp_path, "retry.duckdb")}
+    env["bucket"] = {"backend": "memory"}
+    env["broker"] = {
+        **env["broker"],
+        "backend": "memory",
+        "retry_tiers_ms": [1000, 10000],
+        "retry_jitter": 0,
+    }
+    consumer = rabbitmq.Consumer(env)
+    clock = ManualClock()
+    consumer.broker_adapter = InMemoryBrokerAdapter(
+        env["broker"], clock=clock, sleep=clock.sleep
+    )
+    with consumer.storage_connection.connect() as conn:
+        repository.QueryWriter.run_sql_in_file(conn, env["app"]["migration"], [])
+    usecase.create_schema(
+        dto.SchemaCreateDto(**SCHEMA),
+        consumer.storage_connection,
+        consumer.schema_repository,
+    )
+    for bucket_name in ("gold", "validated", "quarantine"):
+        consumer.bucket_adapter.create_bucket(bucket_name)
+    yield consumer
+    consumer.storage_connection.close_connection()
+
+
+def test_failed_object_is_retried_alone(consumer) -> None:
+    bm, rm = consumer.bucket_adapter, consumer.broker_adapter
+    for name, blob in (
+        ("a.json", b'{"name": "a"}'),
+        ("broken.json", b"{nao e json"),
+        ("c.json", b'{"name": "c"}'),
+    ):
+        bm.put_object("gold", f"retry/ns/{name}", blob, "application/json")
+    usecase.schedule_schema_validation("retry.ns", rm)
+
+    rm.consume_blocking(consumer.on_data_received, consumer.on_max_retry_reached)
+
+    validated = [name for name, _ in bm.iter_bucket_by_prefix_key("validated", "retry")]
+    gold = [name for name, _ in bm.iter_bucket_by_prefix_key("gold", "retry")]
+    assert validated == ["a.json", "c.json"]
+    assert gold == ["broken.json"]
+
+    # o job foi confirmado; só o objeto quebrado passou pelos degraus até a DLQ
+    stats = rm.stats()
+    assert stats["retried"] == 5
+    assert stats["depth.queue_dlq"] == 1
+    dead = rm._queues["queue_dlq"].messages[0]
+    assert json.loads(dead.body) == {"namespace": "retry.ns", "object": "broken.json"}
+    assert dead.headers["count"] == 5
+
+
+def test_batch_is_acked_once_and_interruption_requeues(consumer, monkeypatch) -> None:
+    bm, rm = consumer.bucket_adapter, consumer.broker_adapter
+    for namespace in ("retry.ns", "retry.ns", "retry.ns"):
+        usecase.schedule_schema_validation(namespace, rm)
+    bm.put_object("gold", "retry/ns/a.json", b'{"name": "a"}', "application/json")
+
+    calls = []
+    process = consumer._process
+
+    def interrupted(amqp):
+        calls.append(amqp.delivery_tag)
+        if len(calls) == 2:
+            raise KeyboardInterrupt
+        process(amqp)
+
+    monkeypatch.setattr(consumer, "_process", interrupted)
+    with pytest.raises(KeyboardInterrupt):
+        consumer.on_batch_received(rm.consume_batch(10, wait_seconds=0))
+
+    # o primeiro foi confirmado; o interrompido e o seguinte voltaram à fila
+    assert rm.stats()["ack_calls"] == 1
+    assert rm.queue_depth(rm.main_queue) == 2
+
+    monkeypatch.setattr(consumer, "_process", process)
+    assert consumer.consume_batches(10, wait_seconds=0, drain=True) == 2
+    assert rm.stats()["ack_calls"] == 2
+    assert rm.stats()["unacked"] == 0
+
+
+def test_stop_request_finishes_current_object_and_requeues(consumer) -> None:
+    bm, rm = consumer.bucket_adapter, consumer.broker_adapter
+    consumer.metric_batch_size = 10
+    for name in ("a.json", "b.json", "c.json"):
+        bm.put_object("gold", f"retry/ns/{name}", b'{"name": "x"}', "application/json")
+    usecase.schedule_schema_validation("retry.ns", rm)
+
+    move_object = bm.move_object
+
+    def move_then_stop(*args):
+        moved = move_object(*args)
+        consumer.request_stop(grace_seconds=0)  # SIGTERM no meio do job
+        return moved
+
+    bm.move_object = move_then_stop
+    rm.consume_blocking(consumer.on_data_received, consumer.on_max_retry_reached)
+
+    validated = [name for name, _ in bm.iter_bucket_by_prefix_key("validated", "retry")]
+    gold = [name for name, _ in bm.iter_bucket_by_prefix_key("gold", "retry")]
+    assert validated == ["a.json"]
+    assert gold == ["b.json", "c.json"]
+    assert rm.queue_depth(rm.main_queue) == 1
+    assert rm.stats()["unacked"] == 0
+
+    # a métrica do objeto movido foi gravada ao interromper
+    with consumer.storage_connection.connect() as conn:
+        assert conn.execute("select count(*) from move_registry").fetchall() == [(1,)]
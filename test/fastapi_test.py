@@ -94,3 +94,197 @@ class TestFastApi:
         
         assert len(namespace_schemas) == 3
 
+
+    def test_ready_without_broker_connection(self, test_client: TestClient) -> None:
+        response = test_client.get("health/ready")
+        body = response.json()
+
+        assert response.status_code == HTTP_200_OK
+        assert body["status"] == "ready"
+        assert {"import_ms", "build_ms", "ready_ms"} <= set(body["timings"])
+
+
+def put_versions(client: TestClient, namespaces: list[str], versions: int) -> None:
+    for _ in range(versions):
+        for namespace in namespaces:
+            response = client.put("schema", json=schema_creator(namespace))
+            assert response.status_code == HTTP_201_CREATED
+
+
+def test_schema_pages_follow_cursor_without_gaps(api_client: TestClient) -> None:
+    put_versions(api_client, [f"page.ns{i}" for i in range(4)], 3)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"limit": 5, "fields": "namespace,version"}
+        if cursor:
+            params["cursor"] = cursor
+        response = api_client.get("schema/all", params=params)
+        assert response.status_code == HTTP_200_OK
+        seen += [(row["namespace"], row["version"]) for row in response.json()]
+        pages += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        assert 'rel="next"' in response.headers["Link"]
+
+    assert pages == 3
+    assert len(seen) == len(set(seen)) == 12
+    assert set(seen) == {(f"page.ns{i}", v) for i in range(4) for v in (1, 2, 3)}
+
+
+def test_schema_listing_fields_and_invalid_cursor(api_client: TestClient) -> None:
+    put_versions(api_client, ["fields.ns"], 1)
+
+    rows = api_client.get("schema/all", params={"fields": "namespace,fingerprint"}).json()
+    assert [set(row) for row in rows] == [{"namespace", "fingerprint"}]
+
+    response = api_client.get("schema/all", params={"fields": "namespace,senha"})
+    assert response.status_code == 400
+    assert "senha" in response.json()["detail"]
+
+    # decodifica como JSON, mas não é (created_at, id)
+    for cursor in ("WyJhIiwiYiJd", "bm90IGpzb24", "eyJhIjoxfQ"):
+        assert api_client.get("schema/all", params={"cursor": cursor}).status_code == 400
+
+
+def test_schema_listing_streams_ndjson(api_client: TestClient) -> None:
+    put_versions(api_client, ["stream.a", "stream.b"], 2)
+
+    response = api_client.get(
+        "schema/all",
+        params={"fields": "namespace,version,schema_avro", "embed_schema": "true"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 4
+    assert all(row["schema_avro"]["name"] == "RegistroUsuario" for row in rows)
+
+    first = api_client.get("schema/all", params={"limit": 1}).headers["X-Next-Cursor"]
+    rest = api_client.get(
+        "schema/all", params={"format": "ndjson", "cursor": first}
+    ).text.splitlines()
+    assert len(rest) == 3
+
+
+def test_schema_is_returned_as_submitted(api_client: TestClient) -> None:
+    schema = {
+        **schema_creator("submitted.ns"),
+        "doc": "cadastro de usuários",
+        "aliases": ["Usuario"],
+    }
+    schema["fields"] = [
+        {"name": "name", "type": {"type": "string"}, "doc": "nome completo"},
+        *schema["fields"][1:],
+    ]
+    assert api_client.put("schema", json=schema).status_code == HTTP_201_CREATED
+
+    stored = api_client.get("schema/namespace/submitted.ns").json()[0]
+    assert json.loads(stored["schema_avro"]) == schema
+
+    # re-PUT idêntico: compatível e com o mesmo fingerprint canônico
+    response = api_client.put("schema", json=schema)
+    assert response.status_code == HTTP_201_CREATED
+    assert response.json()["fingerprint"] == stored["fingerprint"]
+
+
+def test_named_type_without_name_is_a_client_error(api_client: TestClient) -> None:
+    schema = schema_creator("unnamed.ns")
+    schema["fields"].append({"name": "uf", "type": {"type": "enum", "symbols": ["SP"]}})
+
+    response = api_client.put("schema", json=schema)
+
+    assert response.status_code == 422
+    assert "name" in response.json()["detail"]
+
+
+def test_bulk_put_accepts_json_array_and_ndjson(api_client: TestClient) -> None:
+    response = api_client.put(
+        "schema/bulk", json=[schema_creator("bulk.a"), schema_creator("bulk.b")]
+    )
+    assert response.status_code == HTTP_200_OK
+    assert response.json()["created"] == 2
+
+    body = "\n".join(json.dumps(schema_creator(ns)) for ns in ("bulk.c", "bulk.a"))
+    response = api_client.put(
+        "schema/bulk",
+        content=body + "\n",
+        headers={"Content-Type": "application/x-ndjson"},
+    )
+    results = response.json()["results"]
+    assert [(r["namespace"], r["status"], r["version"]) for r in results] == [
+        ("bulk.c", "created", 1),
+        ("bulk.a", "created", 2),
+    ]
+
+
+def test_bulk_put_reports_each_item(api_client: TestClient) -> None:
+    api_client.put("schema", json=schema_creator("bulk.base"))
+    required = schema_creator("bulk.base")
+    required["fields"].append({"name": "novo", "type": "string"})
+    chained = schema_creator("bulk.chain")
+    chained_next = schema_creator("bulk.chain")
+    chained_next["fields"].append({"name": "extra", "type": ["null", "int"], "default": None})
+
+    response = api_client.put(
+        "schema/bulk",
+        json=[{"namespace": "bulk.bad"}, required, chained, chained_next],
+    )
+
+    body = response.json()
+    assert (body["created"], body["failed"]) == (2, 2)
+    results = body["results"]
+    assert results[0]["status"] == "invalid" and "name" in results[0]["error"]
+    # campo obrigatório novo quebra BACKWARD contra a versão gravada
+    assert results[1]["status"] == "incompatible"
+    # dois itens do mesmo namespace no lote encadeiam as versões
+    assert [(r["status"], r["version"]) for r in results[2:]] == [
+        ("created", 1),
+        ("created", 2),
+    ]
+    versions = api_client.get("schema/namespace/bulk.chain").json()
+    assert [row["version"] for row in versions] == [2, 1]
+    assert [row["version"] for row in api_client.get("schema/namespace/bulk.base").json()] == [1]
+
+
+def test_bulk_put_rejects_non_list_body(api_client: TestClient) -> None:
+    response = api_client.put("schema/bulk", json=schema_creator("bulk.single"))
+    assert response.status_code == 400
+
+    response = api_client.put(
+        "schema/bulk", content=b"{nao e json", headers={"Content-Type": "application/json"}
+    )
+    assert response.status_code == 400
+
+
+def test_schema_reads_revalidate_with_etag(api_client: TestClient) -> None:
+    api_client.put("schema", json=schema_creator("etag.ns"))
+
+    for path in ("schema/namespace/etag.ns", "schema/all"):
+        first = api_client.get(path)
+        etag = first.headers["ETag"]
+        assert first.status_code == HTTP_200_OK
+        assert "must-revalidate" in first.headers["Cache-Control"]
+
+        cached = api_client.get(path, headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        assert cached.content == b""
+        assert cached.headers["ETag"] == etag
+
+    # a escrita invalida o cache: nova versão, nova ETag
+    etag = api_client.get("schema/namespace/etag.ns").headers["ETag"]
+    api_client.put("schema", json=schema_creator("etag.ns"))
+    response = api_client.get("schema/namespace/etag.ns", headers={"If-None-Match": etag})
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert len(response.json()) == 2
+
+    etag = response.headers["ETag"]
+    assert api_client.delete("schema/etag.ns").status_code == HTTP_201_CREATED
+    response = api_client.get("schema/namespace/etag.ns", headers={"If-None-Match": etag})
+    assert response.status_code == HTTP_200_OK
+    assert response.headers["ETag"] != etag
+    assert response.json() == []
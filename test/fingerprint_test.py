@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+from application.validator import JsonValidator
+from domain import error, fingerprint
+
+
+def schema_creator(namespace: str) -> dict:
+    return {
+        "type": "record",
+        "namespace": namespace,
+        "name": "RegistroUsuario",
+        "fields": [
+            {"name": "name", "type": {"type": "string"}},
+            {"name": "tags", "type": {"type": "array", "items": "string"}},
+            {"name": "codigo", "type": ["null", "int"], "default": None},
+        ],
+    }
+
+
+class TestFingerprint:
+    def test_rabin_matches_avro_spec_vectors(self) -> None:
+        assert fingerprint.rabin64(b'"int"') == 8247732601305521295
+        assert fingerprint.rabin64(b'"null"') == 7195948357588979594
+
+    def test_canonical_form(self) -> None:
+        canonical = fingerprint.canonical_form(schema_creator("rfb.json"))
+
+        assert canonical == (
+            '{"name":"RegistroUsuario","type":"record","fields":['
+            '{"name":"name","type":"string"},'
+            '{"name":"tags","type":{"type":"array","items":"string"}},'
+            '{"name":"codigo","type":["null","int"],"default":null}]}'
+        )
+
+    def test_same_schema_in_other_namespace_shares_fingerprint(self) -> None:
+        first = fingerprint.canonical_form(schema_creator("rfb.2025.05.03"))
+        second = fingerprint.canonical_form(schema_creator("rfb.2025.05.04"))
+
+        assert fingerprint.fingerprint(first) == fingerprint.fingerprint(second)
+        assert len(fingerprint.fingerprint(first)) == 16
+
+    def test_attribute_order_and_doc_do_not_matter(self) -> None:
+        schema = schema_creator("rfb.json")
+        reordered = {
+            "fields": schema["fields"],
+            "doc": "cadastro de usuários",
+            "name": "RegistroUsuario",
+            "type": "record",
+        }
+
+        assert fingerprint.canonical_form(reordered) == fingerprint.canonical_form(
+            schema
+        )
+
+    def test_default_changes_fingerprint(self) -> None:
+        schema = schema_creator("rfb.json")
+        without_default = schema_creator("rfb.json")
+        del without_default["fields"][2]["default"]
+
+        assert fingerprint.fingerprint(
+            fingerprint.canonical_form(schema)
+        ) != fingerprint.fingerprint(fingerprint.canonical_form(without_default))
+
+    def test_dotted_name_and_nested_namespace(self) -> None:
+        schema = {
+            "type": "record",
+            "name": "com.acme.User",
+            "fields": [
+                {"name": "name", "type": "string"},
+                {"name": "tags", "type": {"type": "array", "items": "string"}},
+                {
+                    "name": "endereco",
+                    "type": [
+                        "null",
+                        {
+                            "type": "record",
+                            "name": "Endereco",
+                            "namespace": "q",
+                            "fields": [
+                                {
+                                    "name": "uf",
+                                    "type": {"type": "enum", "name": "Uf", "symbols": ["SP"]},
+                                }
+                            ],
+                        },
+                    ],
+                },
+            ],
+        }
+
+        canonical = fingerprint.canonical_form(schema)
+
+        assert canonical == (
+            '{"name":"com.acme.User","type":"record","fields":['
+            '{"name":"name","type":"string"},'
+            '{"name":"tags","type":{"type":"array","items":"string"}},'
+            '{"name":"endereco","type":["null",{"name":"q.Endereco","type":"record",'
+            '"fields":[{"name":"uf","type":{"name":"q.Uf","type":"enum","symbols":["SP"]}}]}]}]}'
+        )
+        # o corpo gravado continua validando os mesmos dados
+        errors = JsonValidator().validate_data_against_avro(
+            {"name": "a", "tags": ["x", "y"]}, json.loads(canonical)
+        )
+        assert errors == []
+
+    def test_named_type_without_name_is_rejected(self) -> None:
+        schema = schema_creator("rfb.json")
+        schema["fields"].append(
+            {"name": "uf", "type": {"type": "enum", "symbols": ["SP"]}}
+        )
+
+        with pytest.raises(error.SchemaValidationError):
+            fingerprint.canonical_form(schema)
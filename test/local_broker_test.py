@@ -0,0 +1,164 @@
+import json
+import random
+
+from infrastructure import broker, local_broker
+from infrastructure.local_broker import InMemoryBrokerAdapter, ManualClock, _Message
+
+ENV = {
+    "exchange": "defaultEx",
+    "queue_name": "app.main",
+    "queue_retry": "retry_queue",
+    "queue_dlq": "queue_dlq",
+    "queue_ttl_milliseconds": 10000,
+}
+
+
+def adapter(**env) -> InMemoryBrokerAdapter:
+    clock = ManualClock()
+    return InMemoryBrokerAdapter({**ENV, **env}, clock=clock, sleep=clock.sleep)
+
+
+def test_topic_matches() -> None:
+    assert local_broker.topic_matches("app.*", "app.mauler")
+    assert not local_broker.topic_matches("app.*", "app.a.b")
+    assert local_broker.topic_matches("app.#", "app.a.b")
+    assert not local_broker.topic_matches("app.*", "retry_queue")
+
+
+class TestInMemoryBroker:
+    def test_routes_acks_and_diverts_by_count(self) -> None:
+        rm = adapter()
+        rm.publish_message("app.mauler", json.dumps({"namespace": "a"}))
+        rm.publish_message("app.mauler", json.dumps({"namespace": "b"}), count=5)
+        rm.publish_message("other.key", json.dumps({"namespace": "c"}))
+        default, dlq = [], []
+
+        def on_default(delivery):
+            default.append(delivery.body())
+            delivery.success()
+
+        def on_dlq(delivery):
+            dlq.append(delivery.count)
+            delivery.success()
+
+        rm.consume_blocking(on_default, on_dlq)
+
+        assert default == [{"namespace": "a"}]
+        assert dlq == [5]
+        stats = rm.stats()
+        assert stats["acked"] == 2 and stats["unacked"] == 0
+        assert stats["unroutable"] == 1
+
+    def test_callback_error_dead_letters_to_dlq(self) -> None:
+        rm = adapter()
+        rm.publish_message("app.mauler", "{}")
+
+        def boom(delivery):
+            raise RuntimeError("falhou")
+
+        rm.consume_blocking(boom, boom)
+        assert rm.queue_depth("queue_dlq") == 1
+
+    def test_prefetch_limits_unacked(self) -> None:
+        rm = adapter(prefetch=2)
+        for i in range(5):
+            rm.publish_message("app.mauler", str(i))
+        held = []
+
+        rm.consume_blocking(held.append, held.append)
+        assert [d.body() for d in held] == [0, 1]
+
+        for delivery in held:
+            delivery.success()
+        rm.consume_blocking(lambda d: d.success(), held.append)
+        assert rm.stats()["acked"] == 5
+
+    def test_retry_ttl_redelivers_with_manual_clock(self) -> None:
+        rm = adapter()
+        rm._route(rm.dlq_exchange_name, _Message(b"{}", "retry_queue", {"count": 1}))
+        seen = []
+
+        rm.consume_blocking(lambda d: (seen.append((rm.clock(), d.count)), d.success()), None)
+
+        # expira após queue_ttl_milliseconds e volta pela exchange principal
+        assert seen == [(10.0, 1)]
+        assert rm.stats()["expired"] == 1
+
+    def test_failures_back_off_through_retry_tiers(self) -> None:
+        rm = adapter(retry_tiers_ms=[1000, 10000, 60000])
+        rm.publish_message("app.mauler", json.dumps({"namespace": "a"}))
+        seen, dlq = [], []
+
+        def on_default(delivery):
+            seen.append((rm.clock(), delivery.count))
+            delivery.failure()
+
+        rm.consume_blocking(on_default, lambda d: (dlq.append(rm.clock()), d.success()))
+
+        # a mensagem (dict) volta serializada e o degrau segue o count
+        assert seen == [(0.0, 0), (1.0, 1), (11.0, 2), (71.0, 3), (131.0, 4)]
+        assert dlq == [191.0]
+        assert rm.stats()["retried"] == 5
+
+
+def test_retry_jitter_spreads_over_fixed_ttl_queues() -> None:
+    tiers = broker.retry_tiers(
+        {
+            "queue_retry": "retry_queue",
+            "retry_tiers_ms": [1000, 60000],
+            "retry_jitter": 0.2,
+        }
+    )
+    assert tiers == [
+        [
+            ("retry_queue.1s", 1000),
+            ("retry_queue.933ms", 933),
+            ("retry_queue.867ms", 867),
+            ("retry_queue.800ms", 800),
+        ],
+        [
+            ("retry_queue.1m", 60000),
+            ("retry_queue.56s", 56000),
+            ("retry_queue.52s", 52000),
+            ("retry_queue.48s", 48000),
+        ],
+    ]
+
+    rng = random.Random(7)
+    picks = {broker.retry_delay(tiers, 9, rng) for _ in range(100)}
+    assert picks == set(tiers[-1])
+
+    # sem jitter, uma fila por degrau
+    assert broker.retry_tiers(
+        {"queue_retry": "retry_queue", "retry_tiers_ms": [1000], "retry_jitter": 0}
+    ) == [[("retry_queue.1s", 1000)]]
+
+
+def test_jittered_retries_are_not_held_behind_longer_ones() -> None:
+    rm = adapter(retry_tiers_ms=[10000], retry_jitter=0.5, retry_jitter_queues=2)
+    rm.rng = random.Random(0)
+    for i in range(20):
+        rm.retry_message({"n": i}, 0)
+    seen = []
+
+    rm.consume_blocking(lambda d: (seen.append(rm.clock()), d.success()), None)
+
+    # cada fila tem TTL fixo: metade volta em 5s, o restante em 10s
+    assert sorted(set(seen)) == [5.0, 10.0]
+    assert 0 < seen.count(5.0) < 20
+
+
+def test_consume_batch_acks_with_multiple() -> None:
+    rm = adapter(prefetch=3)
+    for i in range(5):
+        rm.publish_message("app.mauler", str(i))
+
+    batch = rm.consume_batch(10, wait_seconds=1)
+    assert [d.body() for d in batch] == [0, 1, 2]
+    assert rm.clock() == 1.0  # esperou a janela: o prefetch não deixou completar
+
+    rm.nack_message(batch[1].delivery_tag, requeue=True)
+    rm.acknowledge_message(batch[-1].delivery_tag, multiple=True)
+    stats = rm.stats()
+    assert (stats["acked"], stats["ack_calls"], stats["unacked"]) == (2, 1, 0)
+    assert [d.body() for d in rm.consume_batch(10, wait_seconds=0)] == [1, 3, 4]
@@ -0,0 +1,71 @@
+import io
+
+import pytest
+
+from domain import error
+from infrastructure import bucket, local_bucket
+
+
+@pytest.fixture(params=["filesystem", "memory"])
+def adapter(request, tmp_path):
+    bm = bucket.from_config({"backend": request.param, "root": str(tmp_path)})
+    bm.create_bucket("gold")
+    bm.create_bucket("validated")
+    return bm
+
+
+class TestLocalBucketAdapter:
+    def test_put_read_and_list_in_key_order(self, adapter) -> None:
+        adapter.put_object("gold", "a/b/2.json", b'{"id": 2}', "application/json")
+        adapter.put_object("gold", "a/b/1.json", io.BytesIO(b'{"id": 1}'), "application/json")
+        adapter.put_object("gold", "a/c/3.json", iter([b'{"id":', " 3}"]), "application/json")
+        adapter.put_object("gold", "a/b/empty.json", b"", "application/json")
+
+        assert bytes(adapter.read_object("gold", "a/c/3.json")) == b'{"id": 3}'
+        listed = [(name, bytes(blob)) for name, blob in adapter.iter_bucket_by_prefix_key("gold", "a/b")]
+        assert listed == [("1.json", b'{"id": 1}'), ("2.json", b'{"id": 2}')]
+
+    def test_move_replaces_put_and_delete(self, adapter) -> None:
+        adapter.put_object("gold", "ns/x.json", "{}", "application/json")
+        adapter.move_object("gold", "ns/x.json", "validated", "ns/x.json")
+
+        assert list(adapter.iter_bucket_by_prefix_key("gold", "ns")) == []
+        assert bytes(adapter.read_object("validated", "ns/x.json")) == b"{}"
+        with pytest.raises(error.BucketOperationError):
+            adapter.move_object("gold", "ns/x.json", "validated", "ns/x.json")
+
+    def test_errors_match_minio_adapter(self, adapter) -> None:
+        with pytest.raises(error.BucketConnectionError):
+            adapter.read_object("gold", "missing.json")
+        with pytest.raises(error.BucketConnectionError):
+            list(adapter.iter_bucket_by_prefix_key("missing", ""))
+        with pytest.raises(error.BucketOperationError):
+            adapter.delete_object("missing", "x.json")
+        assert adapter.delete_object("gold", "missing.json") is True
+
+        assert adapter.remove_bucket_if_exists("gold") is True
+        assert adapter.remove_bucket_if_exists("gold") is False
+
+
+def test_filesystem_read_is_memory_mapped(tmp_path) -> None:
+    bm = local_bucket.FileSystemBucketAdapter(tmp_path)
+    bm.create_bucket("gold")
+    bm.put_object("gold", "x.json", b'{"a": 1}', "application/json")
+
+    blob = bm.read_object("gold", "x.json")
+    assert isinstance(blob, memoryview)
+    assert [p.name for p in (tmp_path / "gold").iterdir()] == ["x.json"]
+
+
+@pytest.mark.parametrize("object_name", ["/etc/passwd", "../validated/x.json", "a/../../x.json", ""])
+def test_filesystem_rejects_names_outside_bucket(tmp_path, object_name) -> None:
+    bm = local_bucket.FileSystemBucketAdapter(tmp_path)
+    bm.create_bucket("gold")
+
+    with pytest.raises(error.BucketOperationError):
+        bm.put_object("gold", object_name, b"{}", "application/json")
+    with pytest.raises(error.BucketOperationError):
+        bm.read_object("gold", object_name)
+    with pytest.raises(error.BucketOperationError):
+        bm.delete_object("gold", object_name)
+    assert list(tmp_path.rglob("*.json")) == []
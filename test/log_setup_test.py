@@ -0,0 +1,65 @@
+import logging
+
+from etc.config import log_setup
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def record(msg: str, *args: object) -> logging.LogRecord:
+    return logging.LogRecord("bucket.objects", logging.INFO, __file__, 1, msg, args, None)
+
+
+class TestRateLimitFilter:
+    def test_burst_then_rate(self) -> None:
+        clock = FakeClock()
+        rate_filter = log_setup.RateLimitFilter(rate=2, burst=3, clock=clock)
+
+        passed = [rate_filter.filter(record("Objeto '%s' lido", i)) for i in range(10)]
+        assert passed.count(True) == 3
+
+        clock.now = 1.0
+        passed = [rate_filter.filter(record("Objeto '%s' lido", i)) for i in range(10)]
+        assert passed.count(True) == 2
+
+    def test_reports_suppressed_count(self) -> None:
+        clock = FakeClock()
+        rate_filter = log_setup.RateLimitFilter(rate=1, burst=1, clock=clock)
+        for i in range(5):
+            rate_filter.filter(record("Objeto '%s' lido", i))
+
+        clock.now = 1.0
+        allowed = record("Objeto '%s' lido", "x.json")
+        assert rate_filter.filter(allowed)
+        assert allowed.getMessage() == "Objeto 'x.json' lido (+4 semelhantes suprimidas)"
+
+    def test_templates_are_limited_independently(self) -> None:
+        rate_filter = log_setup.RateLimitFilter(rate=0, burst=1, clock=FakeClock())
+
+        assert rate_filter.filter(record("Objeto '%s' lido", 1))
+        assert rate_filter.filter(record("Objeto '%s' removido", 1))
+        assert not rate_filter.filter(record("Objeto '%s' lido", 2))
+
+
+class TestDeferredQueueHandler:
+    def test_immutable_args_are_formatted_later(self) -> None:
+        handler = log_setup._DeferredQueueHandler(None)
+        original = record("Objeto '%s' lido (%d bytes)", "x.json", 10)
+
+        prepared = handler.prepare(original)
+        assert prepared is original
+        assert prepared.args == ("x.json", 10)
+
+    def test_mutable_args_are_formatted_on_the_calling_thread(self) -> None:
+        handler = log_setup._DeferredQueueHandler(None)
+        timings = {"parse": 1}
+        prepared = handler.prepare(record("Tempos: %s", timings))
+        timings["write"] = 2
+
+        assert prepared.getMessage() == "Tempos: {'parse': 1}"
+        assert prepared.args is None
@@ -0,0 +1,62 @@
+from domain.namespace_trie import NamespaceTrie, is_pattern
+
+NAMESPACES = [
+    "rfb.2025.05.03",
+    "rfb.2025.05.04",
+    "rfb.2025.06.01",
+    "rfb.json",
+    "rfb.csv",
+    "ibge.2025.05.03",
+]
+
+
+class TestNamespaceTrie:
+    def test_single_segment_wildcard(self) -> None:
+        trie = NamespaceTrie(NAMESPACES)
+
+        assert trie.match("rfb.2025.05.*") == ["rfb.2025.05.03", "rfb.2025.05.04"]
+        assert trie.match("*.2025.05.03") == ["ibge.2025.05.03", "rfb.2025.05.03"]
+        assert trie.match("rfb.*") == ["rfb.csv", "rfb.json"]
+
+    def test_multi_segment_wildcard(self) -> None:
+        trie = NamespaceTrie(NAMESPACES)
+
+        assert trie.match("rfb.2025.**") == [
+            "rfb.2025.05.03",
+            "rfb.2025.05.04",
+            "rfb.2025.06.01",
+        ]
+        assert trie.match("**.03") == ["ibge.2025.05.03", "rfb.2025.05.03"]
+        assert len(trie.match("**")) == len(NAMESPACES)
+
+    def test_literal_match(self) -> None:
+        trie = NamespaceTrie(NAMESPACES)
+
+        assert trie.match("rfb.json") == ["rfb.json"]
+        assert trie.match("rfb.2025") == []
+        assert not is_pattern("rfb.json")
+        assert is_pattern("rfb.2025.**")
+
+    def test_add_and_discard(self) -> None:
+        trie = NamespaceTrie(NAMESPACES)
+        trie.add("rfb.2025.05.03")
+        assert len(trie) == len(NAMESPACES)
+
+        trie.discard("rfb.2025.06.01")
+        trie.discard("nao.existe")
+
+        assert "rfb.2025.06.01" not in trie
+        assert trie.match("rfb.2025.*.*") == ["rfb.2025.05.03", "rfb.2025.05.04"]
+        assert len(trie) == len(NAMESPACES) - 1
+
+    def test_many_namespaces(self) -> None:
+        trie = NamespaceTrie(
+            f"rfb.{year}.{month:02d}.{day:02d}"
+            for year in range(2000, 2026)
+            for month in range(1, 13)
+            for day in range(1, 29)
+        )
+
+        assert len(trie) == 26 * 12 * 28
+        assert len(trie.match("rfb.2025.05.*")) == 28
+        assert len(trie.match("rfb.2024.**")) == 12 * 28
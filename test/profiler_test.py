@@ -0,0 +1,49 @@
+import threading
+import time
+
+from infrastructure.profiler import SamplingProfiler
+
+
+def busy_worker(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_collapsed_stacks_are_written(tmp_path) -> None:
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_worker, args=(stop,), name="worker")
+    worker.start()
+    sampler = SamplingProfiler(interval=0.001, max_seconds=5, output_dir=str(tmp_path))
+    try:
+        assert sampler.start()
+        assert not sampler.start()
+        time.sleep(0.2)
+        result = sampler.stop()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert result["samples"] > 0
+    with open(result["path"], encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any(
+        line.startswith("worker;") and "busy_worker (profiler_test.py)" in line
+        for line in lines
+    )
+
+
+def test_window_is_bounded(tmp_path) -> None:
+    sampler = SamplingProfiler(interval=0.001, max_seconds=0.05, output_dir=str(tmp_path))
+    sampler.toggle()
+    deadline = time.monotonic() + 2
+    while sampler.running and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert not sampler.running
+    assert sampler.last_result["seconds"] < 1
+    sampler.toggle()
+    sampler.toggle()
+    assert sampler.stop() is not None
+    assert not sampler.running
@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from application import usecase
+from domain import dto
+from etc.config import loader
+from infrastructure import repository
+from infrastructure.storage import StorageConnectionAdapter
+
+
+def schema_creator(namespace: str, extra: int = 0) -> dict:
+    return {
+        "type": "record",
+        "namespace": namespace,
+        "name": "Registro",
+        "fields": [{"name": "name", "type": "string"}]
+        + [
+            {"name": f"extra{i}", "type": ["null", "int"], "default": None}
+            for i in range(extra)
+        ],
+    }
+
+
+@pytest.fixture
+def registry(tmp_path):
+    dm = StorageConnectionAdapter.from_duckdb_memory(
+        {"db_file": os.path.join(tmp_path, "registry.duckdb")}
+    )
+    with dm.connect() as conn:
+        repository.QueryWriter.run_sql_in_file(
+            conn, loader.get_config()["app"]["migration"], []
+        )
+    return dm, repository.SchemaRegistry()
+
+
+def test_repeated_puts_keep_one_pointer_and_full_history(registry) -> None:
+    dm, ds = registry
+    for extra in range(3):
+        usecase.create_schema(dto.SchemaCreateDto(**schema_creator("repo.a", extra)), dm, ds)
+    usecase.create_schema(dto.SchemaCreateDto(**schema_creator("repo.b")), dm, ds)
+
+    with dm.connect() as conn:
+        pointers = conn.execute(
+            "select namespace, version from schema_registry order by namespace"
+        ).fetchall()
+        history = ds.get_avro_schema_by_namespace(conn, "repo.a")
+        current = ds.get_current_schema(conn, "repo.a")
+
+    assert pointers == [("repo.a", 3), ("repo.b", 1)]
+    assert [row["version"] for row in history] == [3, 2, 1]
+    assert len({row["fingerprint"] for row in history}) == 3
+    assert current["id"] == history[0]["id"]
+    assert current["version"] == 3
+
+
+def test_delete_removes_pointer_and_history(registry) -> None:
+    dm, ds = registry
+    for namespace in ("repo.a", "repo.b"):
+        usecase.create_schema(dto.SchemaCreateDto(**schema_creator(namespace)), dm, ds)
+
+    usecase.delete_some_schema(dm, ds, "repo.a")
+
+    with dm.connect() as conn:
+        assert ds.get_current_schema(conn, "repo.a") is None
+        assert ds.get_avro_schema_by_namespace(conn, "repo.a") == []
+        assert ds.get_namespaces(conn) == ["repo.b"]
+        # o corpo continua: repo.b publica o mesmo schema canônico
+        assert conn.execute("select count(*) from schema_body").fetchall() == [(1,)]
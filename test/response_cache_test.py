@@ -0,0 +1,29 @@
+from infrastructure.response_cache import ResponseCache, etag_matches
+
+
+def test_cache_is_bounded_by_body_bytes() -> None:
+    cache = ResponseCache(max_entries=100, max_bytes=10)
+    cache.put("a", '"a"', b"1234")
+    cache.put("b", '"b"', b"1234")
+    cache.get("a")  # "b" passa a ser o menos usado
+    cache.put("c", '"c"', b"1234")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.size_bytes == 8
+
+    # maior que o teto: devolvido, mas não guardado
+    assert cache.put("big", '"big"', b"x" * 11).body == b"x" * 11
+    assert cache.get("big") is None
+    assert cache.size_bytes == 8
+
+    cache.put("a", '"a2"', b"12")
+    cache.invalidate_prefix("c")
+    assert cache.size_bytes == 2
+    assert len(cache) == 1
+
+
+def test_etag_matches_weak_comparison() -> None:
+    assert etag_matches('W/"x", "y"', '"x"')
+    assert etag_matches("*", '"x"')
+    assert not etag_matches(None, '"x"')
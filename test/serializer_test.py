@@ -0,0 +1,68 @@
+import datetime
+import time
+import uuid
+
+import pytest
+
+from infrastructure import serializer
+
+BACKENDS = [
+    name
+    for name in serializer.SERIALIZERS
+    if name != "orjson" or serializer.orjson is not None
+]
+
+
+@pytest.mark.parametrize("name", BACKENDS)
+class TestSerializer:
+    def test_round_trip(self, name: str) -> None:
+        codec = serializer.get_serializer(name)
+        data = {"namespace": "rfb.json", "tags": ["ç", "ã"], "version": 2}
+
+        assert codec.loads(codec.dumps(data)) == data
+        assert codec.dumps_str(data) == '{"namespace":"rfb.json","tags":["ç","ã"],"version":2}'
+
+    def test_storage_types(self, name: str) -> None:
+        codec = serializer.get_serializer(name)
+        id_ = uuid.uuid4()
+        created_at = datetime.datetime(2026, 10, 19, 8, 16, 14, 560457)
+
+        assert codec.loads(codec.dumps({"id": id_, "created_at": created_at})) == {
+            "id": str(id_),
+            "created_at": "2026-10-19T08:16:14.560457",
+        }
+
+    def test_raw_json_passthrough(self, name: str) -> None:
+        codec = serializer.get_serializer(name)
+        schema_avro = '{"name":"R","type":"record","fields":[]}'
+        rows = [
+            {"version": version, "schema_avro": serializer.RawJson(schema_avro.encode())}
+            for version in (1, 2)
+        ]
+
+        encoded = codec.dumps(rows)
+        assert encoded.count(schema_avro.encode()) == 2
+        assert codec.loads(encoded)[1]["schema_avro"]["name"] == "R"
+        assert codec.dumps(b'{"pre":"encoded"}') == b'{"pre":"encoded"}'
+
+    def test_plain_bytes_are_not_spliced_raw(self, name: str) -> None:
+        codec = serializer.get_serializer(name)
+
+        encoded = codec.dumps({"x": b"not json at all"})
+
+        assert codec.loads(encoded) == {"x": "not json at all"}
+
+    def test_many_raw_values_in_one_page(self, name: str) -> None:
+        codec = serializer.get_serializer(name)
+        rows = [
+            {"version": i, "schema_avro": serializer.RawJson(b'{"name":"R%d"}' % i)}
+            for i in range(10000)
+        ]
+
+        started = time.perf_counter()
+        decoded = codec.loads(codec.dumps(rows))
+
+        # uma passada só: a página máxima não pode levar segundos
+        assert time.perf_counter() - started < 2
+        assert [row["schema_avro"]["name"] for row in decoded[:3]] == ["R0", "R1", "R2"]
+        assert decoded[-1]["schema_avro"] == {"name": "R9999"}
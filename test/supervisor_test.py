@@ -0,0 +1,71 @@
+import copy
+import os
+import signal
+import threading
+import time
+
+from etc.config import loader
+from interfaces.supervisor import Supervisor
+
+
+def make_env(tmp_path) -> dict:
+    env = copy.deepcopy(dict(loader.get_config()))
+    env["broker"] = {**env["broker"], "drain_seconds": 1}
+    env["supervisor"] = {
+        "restart_backoff_seconds": 0.05,
+        "restart_backoff_max_seconds": 0.1,
+        "stable_seconds": 60,
+        "report_seconds": 0.05,
+        "metrics_file": os.path.join(tmp_path, "metrics.json"),
+    }
+    return env
+
+
+def test_metrics_are_summed_across_workers(tmp_path) -> None:
+    def target(report) -> int:
+        report({"jobs": 1})
+        report({"jobs": 3, "object_failures": 1})
+        return 0
+
+    metrics = Supervisor(make_env(tmp_path), target=target, workers=2).run()
+
+    assert metrics == {"jobs": 6, "object_failures": 2, "workers": 0, "restarts": 0}
+    assert os.path.exists(os.path.join(tmp_path, "metrics.json"))
+
+
+def test_crashed_worker_is_restarted(tmp_path) -> None:
+    marker = os.path.join(tmp_path, "crashed")
+
+    def target(report) -> int:
+        report({"jobs": 1})
+        if not os.path.exists(marker):
+            open(marker, "w").close()
+            os._exit(3)  # queda sem drenagem
+        return 0
+
+    metrics = Supervisor(make_env(tmp_path), target=target, workers=1).run()
+
+    # os contadores do worker que caiu continuam no agregado
+    assert metrics["restarts"] == 1
+    assert metrics["jobs"] == 2
+
+
+def test_sigterm_is_forwarded_to_workers(tmp_path) -> None:
+    def target(report) -> int:
+        stopped = []
+        signal.signal(signal.SIGTERM, lambda *_: stopped.append(True))
+        while not stopped:
+            time.sleep(0.01)
+        report({"jobs": 1})
+        return 0
+
+    supervisor = Supervisor(make_env(tmp_path), target=target, workers=2)
+    timer = threading.Timer(0.3, os.kill, args=(os.getpid(), signal.SIGTERM))
+    timer.start()
+    started = time.monotonic()
+    metrics = supervisor.run()
+    timer.join()
+
+    assert metrics["jobs"] == 2
+    assert metrics["restarts"] == 0
+    assert time.monotonic() - started < 2
@@ -0,0 +1,67 @@
+import pytest
+
+from application import usecase
+from etc.job import trace_report
+from infrastructure import tracing
+from infrastructure.local_broker import InMemoryBrokerAdapter, ManualClock
+
+BROKER_ENV = {
+    "exchange": "defaultEx",
+    "queue_name": "main_queue",
+    "queue_retry": "retry_queue",
+    "queue_dlq": "queue_dlq",
+    "queue_ttl_milliseconds": 10000,
+}
+
+
+@pytest.fixture
+def exporter():
+    exporter = tracing.InMemoryExporter()
+    previous = tracing.set_tracer(tracing.Tracer(exporter))
+    yield exporter
+    tracing.set_tracer(previous)
+
+
+def test_trace_id_travels_in_amqp_headers(exporter) -> None:
+    clock = ManualClock()
+    rm = InMemoryBrokerAdapter(BROKER_ENV, clock=clock, sleep=clock.sleep)
+    usecase.schedule_schema_validation("rfb.json", rm)
+
+    def on_message(delivery):
+        with tracing.get_tracer().start_trace(
+            "consumer.job",
+            trace_id=delivery.headers[tracing.TRACE_HEADER],
+            parent_id=delivery.headers[tracing.PARENT_HEADER],
+        ):
+            with tracing.span("validate"):
+                pass
+        delivery.success()
+
+    rm.consume_blocking(on_message, on_message)
+
+    spans = {span["n"]: span for span in exporter.spans}
+    assert set(spans) == {"schedule", "broker.publish", "consumer.job", "validate"}
+    assert len({span["t"] for span in exporter.spans}) == 1
+    assert spans["consumer.job"]["p"] == spans["schedule"]["s"]
+    assert spans["validate"]["p"] == spans["consumer.job"]["s"]
+
+
+def test_spans_outside_a_trace_are_noops(exporter) -> None:
+    with tracing.span("orphan") as span:
+        assert span is None
+    assert exporter.spans == []
+    assert tracing.propagation_headers() == {}
+
+
+def test_critical_path_counts_queue_wait() -> None:
+    spans = [
+        {"t": "x", "s": "a", "p": None, "n": "schedule", "ts": 0, "d": 10},
+        {"t": "x", "s": "b", "p": "a", "n": "consumer.job", "ts": 50, "d": 100},
+        {"t": "x", "s": "c", "p": "b", "n": "storage.insert_metric", "ts": 60, "d": 70},
+    ]
+    assert trace_report.critical_path(spans) == {
+        "schedule": 10,
+        trace_report.QUEUE_WAIT: 40,
+        "consumer.job": 30,
+        "storage.insert_metric": 70,
+    }